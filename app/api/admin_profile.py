@@ -10,6 +10,7 @@ from ..models.user import User, UserRole
 from ..schemas.user import AdminProfile, AdminProfileUpdate
 from .auth import get_current_user
 from ..crud import crud_user
+from ..core.cache import dashboard_cache
 
 router = APIRouter()
 
@@ -119,6 +120,7 @@ async def update_admin_profile(
     
     # Update the admin profile
     updated_admin = crud_user.update_user(db, user_id=current_user.id, update_data=update_data)
+    dashboard_cache.invalidate(key=("dashboard_stats", current_user.id))
     
     # Return updated profile
     return await get_admin_profile(current_user=updated_admin, db=db)
@@ -223,6 +225,7 @@ async def upload_profile_photo(
             "updated_at": datetime.utcnow()
         }
         crud_user.update_user(db, user_id=current_user.id, update_data=update_data)
+        dashboard_cache.invalidate(key=("dashboard_stats", current_user.id))
     
     return {
         "message": "Profile photo uploaded successfully",
@@ -230,12 +233,24 @@ async def upload_profile_photo(
     }
 
 @router.get("/dashboard-stats")
-async def get_admin_dashboard_stats(
+def get_admin_dashboard_stats(
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
     """Get dashboard statistics for admin."""
-    
+    # Cached per admin: the stats depend on the caller's department and access level.
+    # A plain def runs on the threadpool, so a miss (sync ORM queries, or waiting on
+    # another request's computation) does not block the event loop.
+    return dashboard_cache.get_or_compute(
+        ("dashboard_stats", current_user.id), lambda: _compute_dashboard_stats(current_user, db)
+    )
+
+@router.get("/cache-stats")
+async def get_cache_stats(current_user: User = Depends(get_current_admin_user)):
+    """Hit/miss counters of the dashboard cache."""
+    return dashboard_cache.stats()
+
+def _compute_dashboard_stats(current_user: User, db: Session) -> dict:
     # Get department-specific stats
     department_stats = {}
     
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt
 
-from .. import schemas
+from .. import models, schemas
 from ..crud import crud_user as crud
 from ..core.security import verify_password, get_password_hash
-from .deps import get_db
+from .deps import get_db, get_async_db
 
 router = APIRouter()
 
@@ -29,22 +30,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _token_subject(token: str) -> str:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except jwt.PyJWTError:
-        raise credentials_exception
-    user = crud.get_user_by_email(db, email=username)
+        raise _credentials_exception()
+    return username
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    user = crud.get_user_by_email(db, email=_token_subject(token))
+    if user is None:
+        raise _credentials_exception()
+    return user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db = Depends(get_async_db)):
+    """``get_current_user`` on the async engine, for async routes"""
+    result = await db.execute(select(models.User).where(models.User.email == _token_subject(token)))
+    user = result.scalars().first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 @router.post("/login")
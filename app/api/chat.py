@@ -1,17 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
+import json
 
-from ..api.auth import get_current_user
+from ..api.auth import get_current_user, get_current_user_async
+from ..config import CHAT_BACKEND
+from ..database import SessionLocal, get_async_sessionmaker
 from ..services.ai_chat_service import AIBankingAssistant
 from ..models.user import User
-from .deps import get_db
+from .deps import get_db, get_async_db
 
 router = APIRouter()
 
 class ChatMessage(BaseModel):
     message: str
+    # next_cursor of the previous transaction history response, to ask for "more"
+    cursor: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
@@ -19,24 +25,89 @@ class ChatResponse(BaseModel):
     data: Optional[Dict[str, Any]] = None
     suggestions: Optional[List[str]] = None
 
-# Initialize AI assistant
-ai_assistant = AIBankingAssistant()
-
-@router.post("/message", response_model=ChatResponse)
-def chat_message(
-    chat_msg: ChatMessage,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Process chat message and return AI response"""
-    try:
-        response = ai_assistant.process_message(chat_msg.message, current_user, db)
-        return ChatResponse(**response)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+# Sent with the event stream so proxies pass events through as they are written
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def _sse(event: str, payload: Dict[str, Any]) -> str:
+    if event == "done":
+        payload = ChatResponse(**payload).model_dump(mode="json")
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def _sse_error(e: Exception) -> str:
+    return _sse("error", {"detail": f"Error processing message: {str(e)}"})
+
+# Initialize AI assistant; CHAT_BACKEND picks the sync or async implementation
+if CHAT_BACKEND == "async":
+    from ..services.async_chat_service import AsyncAIBankingAssistant
+
+    ai_assistant = AsyncAIBankingAssistant()
+    current_chat_user = get_current_user_async
+
+    @router.post("/message", response_model=ChatResponse)
+    async def chat_message(
+        chat_msg: ChatMessage,
+        current_user: User = Depends(get_current_user_async),
+        db=Depends(get_async_db)
+    ):
+        """Process chat message and return AI response"""
+        try:
+            response = await ai_assistant.process_message(chat_msg.message, current_user, db, cursor=chat_msg.cursor)
+            return ChatResponse(**response)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+
+    @router.post("/stream")
+    async def chat_stream(chat_msg: ChatMessage, current_user: User = Depends(get_current_user_async)):
+        """Stream the reply as server-sent events: ``chunk`` events with pieces of
+        the text, then a ``done`` event with the complete ChatResponse"""
+        async def events():
+            # The request's session is closed before the body streams, so use our own
+            async with get_async_sessionmaker()() as db:
+                try:
+                    async for event, payload in ai_assistant.stream_message(
+                        chat_msg.message, current_user, db, cursor=chat_msg.cursor
+                    ):
+                        yield _sse(event, payload)
+                except Exception as e:
+                    yield _sse_error(e)
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+else:
+    ai_assistant = AIBankingAssistant()
+    current_chat_user = get_current_user
+
+    @router.post("/message", response_model=ChatResponse)
+    def chat_message(
+        chat_msg: ChatMessage,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+    ):
+        """Process chat message and return AI response"""
+        try:
+            response = ai_assistant.process_message(chat_msg.message, current_user, db, cursor=chat_msg.cursor)
+            return ChatResponse(**response)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+
+    @router.post("/stream")
+    def chat_stream(chat_msg: ChatMessage, current_user: User = Depends(get_current_user)):
+        """Stream the reply as server-sent events: ``chunk`` events with pieces of
+        the text, then a ``done`` event with the complete ChatResponse"""
+        def events():
+            # The request's session is closed before the body streams, so use our own
+            db = SessionLocal()
+            try:
+                for event, payload in ai_assistant.stream_message(chat_msg.message, current_user, db, cursor=chat_msg.cursor):
+                    yield _sse(event, payload)
+            except Exception as e:
+                yield _sse_error(e)
+            finally:
+                db.close()
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 @router.get("/greeting", response_model=ChatResponse)
-def get_greeting(current_user: User = Depends(get_current_user)):
+def get_greeting(current_user: User = Depends(current_chat_user)):
     """Get a personalized greeting for the user"""
     import random
     
@@ -1,4 +1,4 @@
-from ..database import SessionLocal
+from ..database import SessionLocal, get_async_sessionmaker
 
 def get_db():
     db = SessionLocal()
@@ -7,3 +7,7 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -1,11 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import uuid
+from datetime import datetime, timedelta
 
 from ..api.auth import get_current_user
 from ..services.fraud_detection_service_fixed import FraudDetectionService
+from ..services.fraud_detection_service import FACTOR_CODES, FACTOR_REASONS
 from ..models.user import User
+from ..models.transaction import Transaction
+from ..crud import crud_fraud_alert
+from ..core.cache import dashboard_cache
+from ..services.fraud_scoring_pipeline import fraud_pipeline
+from ..services.micro_batcher import fraud_micro_batcher
+from ..services import fraud_rules
+from ..config import FRAUD_BATCH_MAX_SIZE
 from .deps import get_db
 
 router = APIRouter()
@@ -15,6 +26,12 @@ class FraudAnalysisResponse(BaseModel):
     risk_score: float
     risk_factors: List[str]
     recommendation: str
+    matched_keywords: List[str] = []
+    transaction_id: Optional[str] = None
+    alert_id: Optional[str] = None
+
+class BatchAnalysisRequest(BaseModel):
+    transaction_ids: List[uuid.UUID]
 
 class SampleAlert(BaseModel):
     id: str
@@ -45,8 +62,92 @@ def get_sample_fraud_alerts(
     sample_alerts = fraud_service.generate_sample_fraud_alerts(limit)
     return [SampleAlert(**alert) for alert in sample_alerts]
 
+@router.post("/analyze/batch", response_model=List[FraudAnalysisResponse])
+def analyze_transactions_batch(
+    batch_request: BatchAnalysisRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Score a batch of transactions; results are returned in request order"""
+    # Only admins can run fraud analysis
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(status_code=403, detail="Access denied. Admin role required.")
+    
+    if len(batch_request.transaction_ids) > FRAUD_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch too large. Maximum is {FRAUD_BATCH_MAX_SIZE} transactions.")
+    
+    # Score each transaction once even if it is repeated in the request
+    unique_ids = list(dict.fromkeys(batch_request.transaction_ids))
+    transactions = {}
+    for i in range(0, len(unique_ids), fraud_service.batch_query_chunk_size):
+        chunk = unique_ids[i:i + fraud_service.batch_query_chunk_size]
+        for transaction in db.query(Transaction).filter(Transaction.id.in_(chunk)).all():
+            transactions[transaction.id] = transaction
+    
+    missing = [str(txn_id) for txn_id in unique_ids if txn_id not in transactions]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Transactions not found: {', '.join(missing)}")
+    
+    batch = [transactions[txn_id] for txn_id in unique_ids]
+    results = {
+        txn_id: FraudAnalysisResponse(transaction_id=str(txn_id), **result)
+        for txn_id, result in zip(unique_ids, fraud_service.analyze_transactions(batch, db))
+    }
+    return [results[txn_id] for txn_id in batch_request.transaction_ids]
+
+@router.post("/analyze/{transaction_id}", response_model=FraudAnalysisResponse)
+def analyze_transaction(
+    transaction_id: uuid.UUID,
+    current_user: User = Depends(get_current_user)
+):
+    """Score one transaction in real time.
+    
+    Concurrent requests are coalesced by the micro-batcher, so they share one
+    history fetch and one alert commit.
+    """
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(status_code=403, detail="Access denied. Admin role required.")
+    
+    try:
+        result = fraud_micro_batcher.score(transaction_id, timeout=30)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    except FutureTimeoutError:
+        raise HTTPException(status_code=504, detail="Fraud scoring timed out")
+    return FraudAnalysisResponse(**result)
+
+@router.get("/analyze/metrics")
+def get_micro_batcher_metrics(current_user: User = Depends(get_current_user)):
+    """Batch sizes and p50/p99 latency added by the micro-batching window"""
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(status_code=403, detail="Access denied. Admin role required.")
+    
+    return fraud_micro_batcher.metrics()
+
+@router.get("/rules/metrics")
+def get_rule_metrics(current_user: User = Depends(get_current_user)):
+    """Invocations, hit rate and latency histogram of every scoring rule in this process"""
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(status_code=403, detail="Access denied. Admin role required.")
+    
+    tracer = fraud_rules.fraud_rule_tracer
+    return {
+        "rules": fraud_rules.metrics_snapshot(),
+        "trace": {"path": tracer.path, "sample_rate": tracer.sample_rate, "lines": tracer.lines} if tracer else None
+    }
+
+@router.post("/rules/metrics/reset")
+def reset_rule_metrics(current_user: User = Depends(get_current_user)):
+    """Zero the rule counters, e.g. before measuring a change"""
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(status_code=403, detail="Access denied. Admin role required.")
+    
+    fraud_rules.reset_metrics()
+    return {"message": "Rule metrics reset"}
+
 @router.get("/insights")
 def get_fraud_insights(
+    days: int = 30,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -55,31 +156,37 @@ def get_fraud_insights(
     if current_user.role.value != "ADMIN":
         raise HTTPException(status_code=403, detail="Access denied. Admin role required.")
     
-    # For demo purposes, return mock insights
-    mock_insights = {
-        "total_alerts": 47,
-        "open_alerts": 12,
-        "confirmed_fraud": 8,
-        "dismissed": 27,
-        "accuracy_rate": 85.3,
-        "false_positive_rate": 14.7,
-        "risk_distribution": {
-            "high_risk": 15,
-            "medium_risk": 22,
-            "low_risk": 10
-        },
-        "detection_rate": 94.2,
-        "trends": {
-            "this_week": 12,
-            "last_week": 8,
-            "change_percent": 50.0
-        },
-        "top_risk_factors": [
-            {"factor": "Foreign location", "count": 18},
-            {"factor": "High amount", "count": 15},
-            {"factor": "Off-hours transaction", "count": 12},
-            {"factor": "High-risk merchant", "count": 10}
-        ]
-    }
+    # Shared by every admin; dropped whenever an alert changes status
+    return dashboard_cache.get_or_compute(
+        ("fraud_insights", days), lambda: fraud_service.get_fraud_insights(db, days=days)
+    )
+
+@router.get("/factors/top")
+def get_top_risk_factors(
+    days: int = 90,
+    limit: int = 10,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Most frequent risk factors among alerts created in the last ``days`` days"""
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(status_code=403, detail="Access denied. Admin role required.")
+    
+    reasons = {code: FACTOR_REASONS[factor] for factor, code in FACTOR_CODES.items()}
+    since = datetime.utcnow() - timedelta(days=days)
+    return [
+        {"factor_code": code, "factor": reasons.get(code, code), "count": count}
+        for code, count in crud_fraud_alert.get_top_factors(db, since, limit=limit)
+    ]
+
+@router.get("/pipeline/metrics")
+def get_pipeline_metrics(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Outbox depth and scoring lag of the asynchronous fraud scoring pipeline"""
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(status_code=403, detail="Access denied. Admin role required.")
     
-    return mock_insights
+    # Worker counters only cover this process; run_fraud_pipeline.py prints its own
+    return fraud_pipeline.metrics(db)
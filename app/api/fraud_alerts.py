@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+import uuid
 
 from .. import crud, schemas
+from ..crud import crud_fraud_alert
+from ..models.user import User
+from .auth import get_current_user
 from .deps import get_db
 
 router = APIRouter()
@@ -25,3 +29,21 @@ def read_fraud_alert(fraud_alert_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Fraud alert not found")
     return db_fraud_alert
 
+
+@router.put("/fraud-alerts/{fraud_alert_id}/status", response_model=schemas.FraudAlert)
+def update_fraud_alert_status(
+    fraud_alert_id: uuid.UUID,
+    status_update: schemas.FraudAlertStatusUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Only admins can resolve fraud alerts
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(status_code=403, detail="Access denied. Admin role required.")
+    
+    db_fraud_alert = crud_fraud_alert.get_fraud_alert(db, fraud_alert_id=fraud_alert_id)
+    if db_fraud_alert is None:
+        raise HTTPException(status_code=404, detail="Fraud alert not found")
+    return crud_fraud_alert.update_fraud_alert_status(
+        db, db_fraud_alert, status_update.status, analyst_id=current_user.id
+    )
@@ -0,0 +1,74 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Fraud detection
+FRAUD_BATCH_MAX_SIZE = int(os.getenv("FRAUD_BATCH_MAX_SIZE", "5000"))
+# Versioned merchant/location keyword file; defaults to app/data/fraud_keywords.json
+FRAUD_KEYWORDS_PATH = os.getenv("FRAUD_KEYWORDS_PATH") or None
+
+# In-process velocity counters for the frequency factor.
+# Each API process only sees its own writes: disable when running more than one worker.
+VELOCITY_TRACKER_ENABLED = os.getenv("VELOCITY_TRACKER_ENABLED", "true").lower() == "true"
+VELOCITY_TRACKER_MAX_ACCOUNTS = int(os.getenv("VELOCITY_TRACKER_MAX_ACCOUNTS", "100000"))
+
+# In-process TTL cache for the admin dashboard endpoints (per API process)
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "30"))
+DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "1024"))
+
+# Per-user account snapshots behind the chat assistant (per API process);
+# dropped whenever this process writes to the user's accounts
+CHAT_SNAPSHOT_CACHE_TTL_SECONDS = float(os.getenv("CHAT_SNAPSHOT_CACHE_TTL_SECONDS", "300"))
+CHAT_SNAPSHOT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_SNAPSHOT_CACHE_MAX_ENTRIES", "10000"))
+
+# Chat endpoint implementation: "sync" (ORM on the threadpool) or "async"
+# (AsyncAIBankingAssistant on the async engine, see ASYNC_DATABASE_URL)
+CHAT_BACKEND = os.getenv("CHAT_BACKEND", "sync")
+
+# Asynchronous fraud scoring of new transactions (fraud_scoring_outbox).
+# FRAUD_PIPELINE_WORKERS > 0 starts scoring threads inside the API process;
+# otherwise run run_fraud_pipeline.py next to it.
+FRAUD_PIPELINE_WORKERS = int(os.getenv("FRAUD_PIPELINE_WORKERS", "0"))
+FRAUD_PIPELINE_BATCH_SIZE = int(os.getenv("FRAUD_PIPELINE_BATCH_SIZE", "200"))
+FRAUD_PIPELINE_POLL_SECONDS = float(os.getenv("FRAUD_PIPELINE_POLL_SECONDS", "0.5"))
+FRAUD_PIPELINE_LEASE_SECONDS = float(os.getenv("FRAUD_PIPELINE_LEASE_SECONDS", "60"))
+FRAUD_PIPELINE_MAX_ATTEMPTS = int(os.getenv("FRAUD_PIPELINE_MAX_ATTEMPTS", "5"))
+
+# Micro-batching window for real-time scoring (POST /fraud/analyze/{id}):
+# a batch is scored once it has MAX_ITEMS requests or its oldest has waited MAX_WAIT_MS
+FRAUD_MICROBATCH_MAX_ITEMS = int(os.getenv("FRAUD_MICROBATCH_MAX_ITEMS", "100"))
+FRAUD_MICROBATCH_MAX_WAIT_MS = float(os.getenv("FRAUD_MICROBATCH_MAX_WAIT_MS", "10"))
+
+# Amount factor rule: "mean" flags amounts above 5x the 30-day average;
+# "quantile" flags absolute amounts above the account's 30-day quantile sketch
+FRAUD_AMOUNT_RULE = os.getenv("FRAUD_AMOUNT_RULE", "mean")
+FRAUD_AMOUNT_QUANTILE = float(os.getenv("FRAUD_AMOUNT_QUANTILE", "0.99"))
+FRAUD_AMOUNT_MIN_HISTORY = int(os.getenv("FRAUD_AMOUNT_MIN_HISTORY", "20"))
+
+# Time factor rule: "fixed" flags 23:00-05:59 UTC; "profile" flags hours unusual
+# for the account once it has FRAUD_HOUR_PROFILE_MIN_HISTORY transactions
+FRAUD_TIME_RULE = os.getenv("FRAUD_TIME_RULE", "fixed")
+FRAUD_HOUR_PROFILE_MIN_HISTORY = int(os.getenv("FRAUD_HOUR_PROFILE_MIN_HISTORY", "30"))
+FRAUD_HOUR_PROFILE_MIN_SHARE = float(os.getenv("FRAUD_HOUR_PROFILE_MIN_SHARE", "0.02"))
+
+# Impossible-travel factor: consecutive transactions whose locations (resolved
+# through the gazetteer) imply a speed above GEO_VELOCITY_MAX_KMH. Off by default.
+FRAUD_GEO_VELOCITY_ENABLED = os.getenv("FRAUD_GEO_VELOCITY_ENABLED", "false").lower() == "true"
+# Place names and coordinates; defaults to app/data/gazetteer.json
+FRAUD_GAZETTEER_PATH = os.getenv("FRAUD_GAZETTEER_PATH") or None
+GEO_VELOCITY_MAX_KMH = float(os.getenv("GEO_VELOCITY_MAX_KMH", "900"))
+GEO_VELOCITY_MIN_KM = float(os.getenv("GEO_VELOCITY_MIN_KM", "50"))
+GEO_VELOCITY_MAX_ACCOUNTS = int(os.getenv("GEO_VELOCITY_MAX_ACCOUNTS", "100000"))
+
+# Risk scorer: "classic" sums the hand-tuned factor weights; "model" uses the
+# logistic regression written by train_fraud_model.py (memory-mapped at startup)
+FRAUD_SCORER = os.getenv("FRAUD_SCORER", "classic")
+# Defaults to app/data/fraud_model.bin
+FRAUD_MODEL_PATH = os.getenv("FRAUD_MODEL_PATH") or None
+
+# Per-rule scorer instrumentation: optionally append a sample of rule
+# evaluations (one JSON line per sampled transaction) to a local trace file
+FRAUD_RULE_TRACE_PATH = os.getenv("FRAUD_RULE_TRACE_PATH") or None
+FRAUD_RULE_TRACE_SAMPLE_RATE = float(os.getenv("FRAUD_RULE_TRACE_SAMPLE_RATE", "0.01"))
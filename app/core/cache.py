@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import threading
+import time
+
+from ..config import (
+    DASHBOARD_CACHE_TTL_SECONDS, DASHBOARD_CACHE_MAX_ENTRIES,
+    CHAT_SNAPSHOT_CACHE_TTL_SECONDS, CHAT_SNAPSHOT_CACHE_MAX_ENTRIES
+)
+
+
+class _Flight:
+    """A computation in progress that other callers for the same key wait on"""
+    __slots__ = ("done", "value", "error", "stale")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        # Set when its key is invalidated mid-computation; the result is then not stored
+        self.stale = False
+
+
+class TTLCache:
+    """Thread-safe in-process cache with a TTL and LRU eviction.
+
+    Keys are tuples whose first element is a namespace, so a whole family of
+    entries (e.g. every ``("fraud_insights", days)``) can be invalidated at
+    once. Concurrent misses for the same key are coalesced: one caller
+    computes, the others wait for its result (single-flight).
+
+    The cache is per process; with several API workers each keeps its own
+    entries and invalidation only reaches the process that made the change.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        # Computation other callers for the key can join (get_or_compute only)
+        self._flights: Dict[Tuple, _Flight] = {}
+        # Every computation in progress, per key, so invalidate can mark exactly those stale
+        self._running: Dict[Tuple, List[_Flight]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key: Tuple[Hashable, ...], compute: Callable[[], Any], ttl_seconds: Optional[float] = None) -> Any:
+        """Return the cached value for ``key``, computing it at most once per expiry"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._flights[key] = self._start(key)
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                self._finish(key, flight, ttl, store=flight.error is None)
+            flight.done.set()
+        return flight.value
+
+    async def get_or_compute_async(self, key: Tuple[Hashable, ...], compute: Callable[[], Awaitable[Any]],
+                                   ttl_seconds: Optional[float] = None) -> Any:
+        """``get_or_compute`` for coroutines, for use on the event loop.
+
+        Misses are not coalesced: waiting on another caller's computation
+        would block the loop, so each concurrent miss awaits its own.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+            flight = self._start(key)
+
+        stored = False
+        try:
+            flight.value = await compute()
+            stored = True
+        finally:
+            with self._lock:
+                self._finish(key, flight, ttl, store=stored)
+        return flight.value
+
+    def invalidate(self, namespace: Optional[Hashable] = None, key: Optional[Tuple] = None):
+        """Drop one key, every key in a namespace, or (with no arguments) everything.
+
+        Computations in progress for the dropped keys are not stored when they
+        finish, and later callers start a fresh one; other keys are untouched.
+        """
+        with self._lock:
+            self.invalidations += 1
+            if key is not None:
+                self._entries.pop(key, None)
+                running = [key] if key in self._running else []
+            elif namespace is None:
+                self._entries.clear()
+                running = list(self._running)
+            else:
+                for cached_key in [k for k in self._entries if k[0] == namespace]:
+                    del self._entries[cached_key]
+                running = [k for k in self._running if k[0] == namespace]
+            for running_key in running:
+                for flight in self._running[running_key]:
+                    flight.stale = True
+                self._flights.pop(running_key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.coalesced) / lookups * 100, 2) if lookups else 0
+            }
+
+    def _start(self, key: Tuple) -> _Flight:
+        flight = _Flight()
+        self._running.setdefault(key, []).append(flight)
+        return flight
+
+    def _finish(self, key: Tuple, flight: _Flight, ttl: float, store: bool):
+        running = self._running[key]
+        running.remove(flight)
+        if not running:
+            del self._running[key]
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if store and ttl > 0 and not flight.stale:
+            self._store(key, flight.value, ttl)
+
+    def _store(self, key: Tuple, value: Any, ttl: float):
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+# Shared cache for the admin dashboard endpoints
+
+dashboard_cache = TTLCache(
+    ttl_seconds=DASHBOARD_CACHE_TTL_SECONDS,
+    max_entries=DASHBOARD_CACHE_MAX_ENTRIES
+)
+
+# Per-user account snapshots for the chat assistant, keyed ("chat_snapshot", user_id)
+
+chat_snapshot_cache = TTLCache(
+    ttl_seconds=CHAT_SNAPSHOT_CACHE_TTL_SECONDS,
+    max_entries=CHAT_SNAPSHOT_CACHE_MAX_ENTRIES
+)
+
+
+def invalidate_chat_snapshot(user_id):
+    """Drop a user's chat snapshot; call after committing a change to their accounts"""
+    chat_snapshot_cache.invalidate(key=("chat_snapshot", user_id))
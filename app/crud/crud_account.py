@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from .. import models, schemas
+from ..core.cache import invalidate_chat_snapshot
 import uuid
 
 
@@ -20,5 +21,6 @@ def create_account(db: Session, account: schemas.AccountCreate):
     db.add(db_account)
     db.commit()
     db.refresh(db_account)
+    invalidate_chat_snapshot(db_account.user_id)
     return db_account
 
@@ -0,0 +1,320 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import hashlib
+import math
+import struct
+import uuid
+from .. import models
+from ..services.velocity_tracker import minute_of
+from .crud_account_stats import ACCOUNT_CHUNK_SIZE, to_cents
+from .crud_hour_profile import HOURS, pack_counts, unpack_counts
+
+# Layout version of account_features rows. Bump it whenever a column's
+# meaning or packing changes; rows with another version are recomputed.
+FEATURE_SCHEMA_VERSION = 1
+
+# Velocity: minute stamps (uint32, ascending) of the account's latest
+# transactions. Counts above RECENT_MINUTES_KEPT saturate, which is far
+# above the frequency rule's threshold.
+RECENT_MINUTES_KEPT = 16
+
+# Merchant diversity: HyperLogLog with 64 one-byte registers (~13% error)
+MERCHANT_REGISTERS = 64
+_REGISTER_BITS = 6
+_HLL_ALPHA = 0.709
+
+
+class AccountFeatureSet(NamedTuple):
+    """Decoded ``account_features`` row"""
+    account_id: uuid.UUID
+    txn_count: int
+    amount_sum_cents: int
+    amount_sum_squares: float
+    amount_max_cents: int
+    debit_count: int
+    debit_sum_cents: int
+    recent_minutes: Tuple[int, ...]
+    merchant_registers: bytes
+    hour_counts: Tuple[int, ...]
+    last_transaction_at: Optional[datetime]
+    last_location: Optional[str]
+    last_location_at: Optional[datetime]
+    last_location_transaction_id: Optional[uuid.UUID]
+    previous_location: Optional[str]
+    previous_location_at: Optional[datetime]
+    previous_location_transaction_id: Optional[uuid.UUID]
+
+    @property
+    def amount_mean_cents(self) -> float:
+        return self.amount_sum_cents / self.txn_count if self.txn_count else 0.0
+
+    @property
+    def amount_std(self) -> float:
+        """Population standard deviation of amounts, in currency units"""
+        if not self.txn_count:
+            return 0.0
+        mean = self.amount_sum_cents / 100 / self.txn_count
+        return math.sqrt(max(0.0, self.amount_sum_squares / self.txn_count - mean * mean))
+
+    @property
+    def distinct_merchants(self) -> int:
+        return estimate_distinct(self.merchant_registers)
+
+    def recent_count(self, window_start: datetime) -> int:
+        """Transactions at or after the minute of ``window_start`` (saturates at ``RECENT_MINUTES_KEPT``)"""
+        start = minute_of(window_start)
+        return sum(1 for minute in self.recent_minutes if minute >= start)
+
+
+def _pack_minutes(minutes: Iterable[int]) -> bytes:
+    minutes = list(minutes)
+    return struct.pack(f"<{len(minutes)}I", *minutes)
+
+
+def _unpack_minutes(data: Optional[bytes]) -> Tuple[int, ...]:
+    return struct.unpack(f"<{len(data) // 4}I", data) if data else ()
+
+
+def _merchant_hash(merchant: str) -> int:
+    # blake2b rather than hash(), which is salted per process
+    return int.from_bytes(hashlib.blake2b(merchant.strip().lower().encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def add_merchant(registers: bytearray, merchant: Optional[str]):
+    if not merchant or not merchant.strip():
+        return
+    value = _merchant_hash(merchant)
+    index = value & (MERCHANT_REGISTERS - 1)
+    rest = value >> _REGISTER_BITS
+    rank = 64 - _REGISTER_BITS - rest.bit_length() + 1
+    if rank > registers[index]:
+        registers[index] = rank
+
+
+def merge_registers(registers: Iterable[bytes]) -> bytes:
+    """Registers of the union of several sketches (element-wise maximum)"""
+    merged = bytearray(MERCHANT_REGISTERS)
+    for data in registers:
+        for i, rank in enumerate(data):
+            if rank > merged[i]:
+                merged[i] = rank
+    return bytes(merged)
+
+
+def estimate_distinct(registers: Optional[bytes]) -> int:
+    if not registers:
+        return 0
+    m = MERCHANT_REGISTERS
+    estimate = _HLL_ALPHA * m * m / sum(2.0 ** -r for r in registers)
+    zeros = registers.count(0)
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * math.log(m / zeros)  # Linear counting for small sets
+    return int(round(estimate))
+
+
+def _new_row(account_id: uuid.UUID) -> models.AccountFeatures:
+    return models.AccountFeatures(
+        account_id=account_id,
+        schema_version=FEATURE_SCHEMA_VERSION,
+        txn_count=0,
+        amount_sum_cents=0,
+        amount_sum_squares=0.0,
+        amount_max_cents=0,
+        debit_count=0,
+        debit_sum_cents=0,
+        recent_minutes=b"",
+        merchant_registers=bytes(MERCHANT_REGISTERS),
+        hour_counts=pack_counts([0] * HOURS)
+    )
+
+
+def _location_key(timestamp: Optional[datetime], transaction_id: Optional[uuid.UUID]):
+    return (timestamp or datetime.min, transaction_id.int if transaction_id else -1)
+
+
+def _apply(row: models.AccountFeatures, transaction: models.Transaction):
+    """Fold one transaction into a features row"""
+    cents = to_cents(transaction.amount)
+    timestamp = transaction.timestamp
+    row.txn_count += 1
+    row.amount_sum_cents += cents
+    row.amount_sum_squares += float(transaction.amount) ** 2
+    row.amount_max_cents = max(row.amount_max_cents, abs(cents))
+    if cents < 0:
+        row.debit_count += 1
+        row.debit_sum_cents += cents
+
+    minutes = sorted(_unpack_minutes(row.recent_minutes) + (minute_of(timestamp),))
+    row.recent_minutes = _pack_minutes(minutes[-RECENT_MINUTES_KEPT:])
+
+    registers = bytearray(row.merchant_registers or bytes(MERCHANT_REGISTERS))
+    add_merchant(registers, transaction.merchant)
+    row.merchant_registers = bytes(registers)
+
+    counts = list(unpack_counts(row.hour_counts))
+    counts[timestamp.hour] += 1
+    row.hour_counts = pack_counts(counts)
+
+    if row.last_transaction_at is None or timestamp >= row.last_transaction_at:
+        row.last_transaction_at = timestamp
+    if transaction.location:
+        # Keep the two latest by (timestamp, id), so the result does not depend on write order
+        key = _location_key(timestamp, transaction.id)
+        if key > _location_key(row.last_location_at, row.last_location_transaction_id):
+            row.previous_location = row.last_location
+            row.previous_location_at = row.last_location_at
+            row.previous_location_transaction_id = row.last_location_transaction_id
+            row.last_location = transaction.location
+            row.last_location_at = timestamp
+            row.last_location_transaction_id = transaction.id
+        elif key > _location_key(row.previous_location_at, row.previous_location_transaction_id):
+            row.previous_location = transaction.location
+            row.previous_location_at = timestamp
+            row.previous_location_transaction_id = transaction.id
+    row.updated_at = datetime.utcnow()
+
+
+def record_transaction(db: Session, transaction: models.Transaction):
+    """Fold a transaction into its account's features; the caller commits"""
+    if _update_features(db, transaction):
+        return
+    try:
+        with db.begin_nested():
+            row = _new_row(transaction.account_id)
+            _apply(row, transaction)
+            db.add(row)
+    except IntegrityError:
+        # Another writer created the row first
+        _update_features(db, transaction)
+
+
+def _update_features(db: Session, transaction: models.Transaction) -> bool:
+    features = models.AccountFeatures
+    # Bumping txn_count takes the row lock, so the read-modify-write below is not lost
+    updated = db.query(features).filter(features.account_id == transaction.account_id).update({
+        features.txn_count: features.txn_count + 1
+    }, synchronize_session=False)
+    if not updated:
+        return False
+    row = db.query(features).filter(features.account_id == transaction.account_id).populate_existing().one()
+    if row.schema_version != FEATURE_SCHEMA_VERSION:
+        # Written with an older layout: recompute from the account's transactions
+        # (which already include this one)
+        fresh = _compute_features(db, [transaction.account_id]).get(transaction.account_id)
+        for column in features.__table__.columns:
+            setattr(row, column.key, getattr(fresh, column.key))
+    else:
+        row.txn_count -= 1  # Counted again by _apply
+        _apply(row, transaction)
+    db.flush()
+    return True
+
+
+def _decode(row: models.AccountFeatures) -> AccountFeatureSet:
+    return AccountFeatureSet(
+        account_id=row.account_id,
+        txn_count=row.txn_count,
+        amount_sum_cents=row.amount_sum_cents,
+        amount_sum_squares=row.amount_sum_squares,
+        amount_max_cents=row.amount_max_cents,
+        debit_count=row.debit_count,
+        debit_sum_cents=row.debit_sum_cents,
+        recent_minutes=_unpack_minutes(row.recent_minutes),
+        merchant_registers=row.merchant_registers or bytes(MERCHANT_REGISTERS),
+        hour_counts=unpack_counts(row.hour_counts),
+        last_transaction_at=row.last_transaction_at,
+        last_location=row.last_location,
+        last_location_at=row.last_location_at,
+        last_location_transaction_id=row.last_location_transaction_id,
+        previous_location=row.previous_location,
+        previous_location_at=row.previous_location_at,
+        previous_location_transaction_id=row.previous_location_transaction_id
+    )
+
+
+def get_features(db: Session, account_id: uuid.UUID) -> Optional[AccountFeatureSet]:
+    """Features of one account (a primary-key lookup), or ``None``"""
+    row = db.query(models.AccountFeatures).filter(
+        models.AccountFeatures.account_id == account_id,
+        models.AccountFeatures.schema_version == FEATURE_SCHEMA_VERSION
+    ).first()
+    return _decode(row) if row is not None else None
+
+
+def get_features_many(db: Session, account_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, AccountFeatureSet]:
+    """Bulk loader: ``{account_id: features}`` with one query per ``ACCOUNT_CHUNK_SIZE`` accounts.
+
+    Accounts without current-version features are left out.
+    """
+    features = models.AccountFeatures
+    account_ids = list(dict.fromkeys(account_ids))
+    result = {}
+    for i in range(0, len(account_ids), ACCOUNT_CHUNK_SIZE):
+        rows = db.query(features).filter(
+            features.account_id.in_(account_ids[i:i + ACCOUNT_CHUNK_SIZE]),
+            features.schema_version == FEATURE_SCHEMA_VERSION
+        )
+        for row in rows:
+            result[row.account_id] = _decode(row)
+    return result
+
+
+def _compute_features(db: Session, account_ids: Optional[List[uuid.UUID]] = None) -> Dict[uuid.UUID, models.AccountFeatures]:
+    """Features computed from ``transactions`` (optionally for some accounts only), as detached rows"""
+    txn = models.Transaction
+    query = db.query(txn.id, txn.account_id, txn.amount, txn.timestamp, txn.merchant, txn.location)
+    if account_ids is not None:
+        query = query.filter(txn.account_id.in_(account_ids))
+    rows = {}
+    for transaction in query.order_by(txn.timestamp).yield_per(10000):
+        row = rows.get(transaction.account_id)
+        if row is None:
+            row = rows[transaction.account_id] = _new_row(transaction.account_id)
+        _apply(row, transaction)
+    return rows
+
+
+def rebuild_account_features(db: Session) -> int:
+    """Recompute every account's features from ``transactions``; returns the row count"""
+    rows = _compute_features(db)
+    columns = [column.key for column in models.AccountFeatures.__table__.columns]
+    db.query(models.AccountFeatures).delete(synchronize_session=False)
+    db.bulk_insert_mappings(models.AccountFeatures, [
+        {key: getattr(row, key) for key in columns} for row in rows.values()
+    ])
+    db.commit()
+    return len(rows)
+
+
+def check_account_features(db: Session) -> List[Dict]:
+    """Compare the stored features against ``transactions``; returns the mismatching accounts"""
+    expected = {account_id: _decode(row) for account_id, row in _compute_features(db).items()}
+    actual = {
+        row.account_id: _decode(row)
+        for row in db.query(models.AccountFeatures).yield_per(10000)
+    }
+    stale = {
+        account_id for (account_id,) in db.query(models.AccountFeatures.account_id).filter(
+            models.AccountFeatures.schema_version != FEATURE_SCHEMA_VERSION
+        )
+    }
+
+    mismatches = []
+    for account_id in expected.keys() | actual.keys():
+        want, got = expected.get(account_id), actual.get(account_id)
+        # Sums of squares are floats added in a different order; compare them approximately
+        same = want is not None and got is not None and want._replace(amount_sum_squares=0.0) == got._replace(
+            amount_sum_squares=0.0
+        ) and math.isclose(want.amount_sum_squares, got.amount_sum_squares, rel_tol=1e-9)
+        if account_id in stale or not same:
+            mismatches.append({
+                "account_id": str(account_id),
+                "expected": {"txn_count": want.txn_count if want else 0},
+                "actual": {
+                    "txn_count": got.txn_count if got else 0,
+                    "schema_version": "stale" if account_id in stale else FEATURE_SCHEMA_VERSION
+                }
+            })
+    return mismatches
@@ -0,0 +1,237 @@
+from sqlalchemy import func, and_, or_, false
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+import uuid
+from .. import models
+from ..services.quantile_sketch import QuantileSketch
+
+# Max account ids per IN (...) clause
+ACCOUNT_CHUNK_SIZE = 500
+
+
+def to_cents(amount) -> int:
+    """Convert a money amount to integer cents without float rounding"""
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def record_transaction(db: Session, transaction: models.Transaction):
+    """Add a transaction to its account's daily bucket.
+
+    The caller commits, so the bucket update lands in the same commit as the
+    transaction row.
+    """
+    day = transaction.timestamp.date()
+    cents = to_cents(transaction.amount)
+    square = float(transaction.amount) ** 2
+
+    if _increment_bucket(db, transaction.account_id, day, cents, square):
+        _add_to_sketch(db, transaction.account_id, day, cents)
+        return
+    try:
+        with db.begin_nested():
+            db.add(models.AccountDailyStats(
+                account_id=transaction.account_id,
+                day=day,
+                txn_count=1,
+                amount_sum_cents=cents,
+                amount_sum_squares=square,
+                amount_sketch=QuantileSketch.of([abs(cents)]).to_bytes()
+            ))
+    except IntegrityError:
+        # Another writer created the bucket first
+        _increment_bucket(db, transaction.account_id, day, cents, square)
+        _add_to_sketch(db, transaction.account_id, day, cents)
+
+
+def _increment_bucket(db: Session, account_id: uuid.UUID, day, cents: int, square: float) -> bool:
+    stats = models.AccountDailyStats
+    updated = db.query(stats).filter(
+        stats.account_id == account_id,
+        stats.day == day
+    ).update({
+        stats.txn_count: stats.txn_count + 1,
+        stats.amount_sum_cents: stats.amount_sum_cents + cents,
+        stats.amount_sum_squares: stats.amount_sum_squares + square
+    }, synchronize_session=False)
+    return updated > 0
+
+
+def _add_to_sketch(db: Session, account_id: uuid.UUID, day, cents: int):
+    # The increment above already holds the bucket's row lock, so this
+    # read-modify-write cannot lose a concurrent update
+    stats = models.AccountDailyStats
+    data = db.query(stats.amount_sketch).filter(
+        stats.account_id == account_id,
+        stats.day == day
+    ).scalar()
+    sketch = QuantileSketch.from_bytes(data)
+    sketch.add(abs(cents))
+    db.query(stats).filter(
+        stats.account_id == account_id,
+        stats.day == day
+    ).update({stats.amount_sketch: sketch.to_bytes()}, synchronize_session=False)
+
+
+def _window_filters(start: datetime, end: Optional[datetime]):
+    """Daily-bucket filters and the raw-transaction filter for the partial boundary days"""
+    stats = models.AccountDailyStats
+    txn = models.Transaction
+    start_day = start.date()
+    next_day = datetime.combine(start_day, datetime.min.time()) + timedelta(days=1)
+
+    bucket_filters = [stats.day > start_day]
+    if end is None:
+        boundary = and_(txn.timestamp >= start, txn.timestamp < next_day)
+    elif end.date() == start_day:
+        bucket_filters = [false()]
+        boundary = and_(txn.timestamp >= start, txn.timestamp <= end)
+    else:
+        end_day_start = datetime.combine(end.date(), datetime.min.time())
+        bucket_filters.append(stats.day < end.date())
+        boundary = or_(
+            and_(txn.timestamp >= start, txn.timestamp < next_day),
+            and_(txn.timestamp >= end_day_start, txn.timestamp <= end)
+        )
+    return bucket_filters, boundary
+
+
+def get_window_stats(db: Session, account_ids: Iterable[uuid.UUID], start: datetime,
+                     end: Optional[datetime] = None) -> Dict[uuid.UUID, Tuple[int, int]]:
+    """Return ``{account_id: (count, sum_cents)}`` for transactions in ``[start, end]``.
+
+    Whole days inside the window come from the daily buckets; only the partial
+    days containing ``start`` and ``end`` are read from ``transactions``, so
+    the result matches a raw timestamp range scan exactly. Without ``end`` the
+    window is open-ended.
+    """
+    stats = models.AccountDailyStats
+    txn = models.Transaction
+    bucket_filters, boundary = _window_filters(start, end)
+
+    account_ids = list(account_ids)
+    window = {}
+    for i in range(0, len(account_ids), ACCOUNT_CHUNK_SIZE):
+        chunk = account_ids[i:i + ACCOUNT_CHUNK_SIZE]
+
+        rows = db.query(
+            stats.account_id,
+            func.sum(stats.txn_count),
+            func.sum(stats.amount_sum_cents)
+        ).filter(
+            stats.account_id.in_(chunk),
+            *bucket_filters
+        ).group_by(stats.account_id).all()
+
+        boundary_rows = db.query(
+            txn.account_id,
+            func.count(txn.id),
+            func.sum(txn.amount)
+        ).filter(
+            txn.account_id.in_(chunk),
+            boundary
+        ).group_by(txn.account_id).all()
+
+        for account_id, txn_count, sum_cents in rows:
+            window[account_id] = (int(txn_count or 0), int(sum_cents or 0))
+        for account_id, txn_count, amount_sum in boundary_rows:
+            count, cents = window.get(account_id, (0, 0))
+            window[account_id] = (count + txn_count, cents + to_cents(amount_sum or 0))
+
+    return window
+
+
+def get_window_sketches(db: Session, account_ids: Iterable[uuid.UUID], start: datetime,
+                        end: Optional[datetime] = None) -> Dict[uuid.UUID, QuantileSketch]:
+    """Return ``{account_id: QuantileSketch}`` of absolute amounts in ``[start, end]``.
+
+    Same window semantics as ``get_window_stats``: daily sketches are merged
+    (exactly) with the raw amounts of the partial boundary days.
+    """
+    stats = models.AccountDailyStats
+    txn = models.Transaction
+    bucket_filters, boundary = _window_filters(start, end)
+
+    account_ids = list(account_ids)
+    sketches = {}
+    for i in range(0, len(account_ids), ACCOUNT_CHUNK_SIZE):
+        chunk = account_ids[i:i + ACCOUNT_CHUNK_SIZE]
+
+        rows = db.query(stats.account_id, stats.amount_sketch).filter(
+            stats.account_id.in_(chunk),
+            *bucket_filters
+        )
+        for account_id, data in rows:
+            sketches.setdefault(account_id, QuantileSketch()).merge(QuantileSketch.from_bytes(data))
+
+        boundary_rows = db.query(txn.account_id, txn.amount).filter(
+            txn.account_id.in_(chunk),
+            boundary
+        )
+        for account_id, amount in boundary_rows:
+            sketches.setdefault(account_id, QuantileSketch()).add(abs(to_cents(amount)))
+
+    return sketches
+
+
+def _aggregate_transactions(db: Session) -> Dict[Tuple[uuid.UUID, object], List]:
+    """Aggregate ``transactions`` into ``{(account_id, day): [count, cents, squares, sketch]}``"""
+    txn = models.Transaction
+    buckets = {}
+    rows = db.query(txn.account_id, txn.amount, txn.timestamp).yield_per(10000)
+    for account_id, amount, timestamp in rows:
+        bucket = buckets.get((account_id, timestamp.date()))
+        if bucket is None:
+            bucket = buckets[(account_id, timestamp.date())] = [0, 0, 0.0, QuantileSketch()]
+        cents = to_cents(amount)
+        bucket[0] += 1
+        bucket[1] += cents
+        bucket[2] += float(amount) ** 2
+        bucket[3].add(abs(cents))
+    return buckets
+
+
+def rebuild_account_stats(db: Session) -> int:
+    """Recompute every daily bucket from ``transactions``; returns the bucket count"""
+    buckets = _aggregate_transactions(db)
+    db.query(models.AccountDailyStats).delete(synchronize_session=False)
+    db.bulk_insert_mappings(models.AccountDailyStats, [
+        {
+            "account_id": account_id,
+            "day": day,
+            "txn_count": count,
+            "amount_sum_cents": cents,
+            "amount_sum_squares": squares,
+            "amount_sketch": sketch.to_bytes()
+        }
+        for (account_id, day), (count, cents, squares, sketch) in buckets.items()
+    ])
+    db.commit()
+    return len(buckets)
+
+
+def check_account_stats(db: Session) -> List[Dict]:
+    """Compare the daily buckets against ``transactions``; returns the mismatching buckets"""
+    expected = _aggregate_transactions(db)
+    stats = models.AccountDailyStats
+    actual = {
+        (account_id, day): (txn_count, sum_cents, QuantileSketch.from_bytes(sketch))
+        for account_id, day, txn_count, sum_cents, sketch in db.query(
+            stats.account_id, stats.day, stats.txn_count, stats.amount_sum_cents, stats.amount_sketch
+        )
+    }
+
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        want = (expected[key][0], expected[key][1], expected[key][3]) if key in expected else (0, 0, QuantileSketch())
+        got = actual.get(key, (0, 0, QuantileSketch()))
+        if want != got:
+            mismatches.append({
+                "account_id": str(key[0]),
+                "day": key[1].isoformat(),
+                "expected": {"txn_count": want[0], "amount_sum_cents": want[1], "sketch_count": want[2].count},
+                "actual": {"txn_count": got[0], "amount_sum_cents": got[1], "sketch_count": got[2].count}
+            })
+    return mismatches
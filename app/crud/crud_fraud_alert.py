@@ -1,5 +1,12 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+import uuid
 from .. import models, schemas
+from ..models.fraud_alert import FraudAlertStatus, FraudAlertType
+from ..core.cache import dashboard_cache
+from . import crud_fraud_rollup
 
 
 def get_fraud_alert(db: Session, fraud_alert_id: int):
@@ -13,7 +20,121 @@ def get_fraud_alerts(db: Session, skip: int = 0, limit: int = 100):
 def create_fraud_alert(db: Session, fraud_alert: schemas.FraudAlertCreate):
     db_fraud_alert = models.FraudAlert(**fraud_alert.dict())
     db.add(db_fraud_alert)
+    db.flush()
+    crud_fraud_rollup.record_alerts(db, [db_fraud_alert])
     db.commit()
     db.refresh(db_fraud_alert)
     return db_fraud_alert
 
+
+def update_fraud_alert_status(db: Session, db_fraud_alert: models.FraudAlert, status: FraudAlertStatus,
+                              analyst_id: uuid.UUID = None):
+    # Re-read the status under a row lock: two analysts resolving the same
+    # alert must not both move it out of its old status in the rollup
+    db.refresh(db_fraud_alert, with_for_update=True)
+    if db_fraud_alert.status != status:
+        crud_fraud_rollup.record_status_change(db, db_fraud_alert.created_at, db_fraud_alert.status, status)
+    db_fraud_alert.status = status
+    db_fraud_alert.analyst_id = analyst_id
+    db_fraud_alert.resolved_at = None if status == FraudAlertStatus.OPEN else datetime.utcnow()
+    db.commit()
+    dashboard_cache.invalidate("fraud_insights")
+    db.refresh(db_fraud_alert)
+    return db_fraud_alert
+
+
+
+def get_top_factors(db: Session, start: datetime, limit: int = 10) -> List[Tuple[str, int]]:
+    """Return ``[(factor_code, alert_count)]`` for alerts created since ``start``, most frequent first.
+
+    Served by the (factor_code, created_at) index on ``fraud_alert_factors``.
+    """
+    factor = models.FraudAlertFactor
+    count = func.count(factor.alert_id)
+    return db.query(factor.factor_code, count).filter(
+        factor.created_at >= start
+    ).group_by(factor.factor_code).order_by(count.desc()).limit(limit).all()
+
+
+def backfill_alert_factors(db: Session, reason_codes: Dict[str, str], chunk_size: int = 10000) -> int:
+    """Create factor rows for alerts that have none by parsing their ``reason``.
+
+    Reasons not in ``reason_codes`` (e.g. manually created alerts) are skipped.
+    Returns the number of factor rows inserted.
+    """
+    alert = models.FraudAlert
+    factor = models.FraudAlertFactor
+    has_factors = db.query(factor.alert_id).filter(factor.alert_id == alert.id).exists()
+
+    # Keyset pages by id, so inserts never interleave with an open cursor
+    inserted = 0
+    last_id = None
+    while True:
+        query = db.query(alert.id, alert.reason, alert.created_at).filter(~has_factors)
+        if last_id is not None:
+            query = query.filter(alert.id > last_id)
+        page = query.order_by(alert.id).limit(chunk_size).all()
+        if not page:
+            break
+        last_id = page[-1][0]
+
+        rows = []
+        for alert_id, reason, created_at in page:
+            for code in dict.fromkeys(reason_codes.get(r) for r in (reason or "").split(crud_fraud_rollup.REASON_SEPARATOR)):
+                if code:
+                    rows.append({"alert_id": alert_id, "factor_code": code, "created_at": created_at})
+        db.bulk_insert_mappings(factor, rows)
+        db.commit()
+        inserted += len(rows)
+    return inserted
+
+
+RING_REASON = "Fraud ring across linked accounts"
+RING_FACTOR_CODE = "FRAUD_RING"
+
+
+def get_alerted_rings(db: Session) -> Set[FrozenSet[uuid.UUID]]:
+    """Member sets of every fraud-ring alert raised so far"""
+    member = models.FraudRingMember
+    rings: Dict[uuid.UUID, Set[uuid.UUID]] = {}
+    rows = db.query(member.alert_id, member.account_id).join(
+        models.FraudAlert, models.FraudAlert.id == member.alert_id
+    ).filter(models.FraudAlert.alert_type == FraudAlertType.FRAUD_RING).yield_per(10000)
+    for alert_id, account_id in rows:
+        rings.setdefault(alert_id, set()).add(account_id)
+    return {frozenset(accounts) for accounts in rings.values()}
+
+
+def create_ring_alerts(db: Session, rings: Iterable) -> List[models.FraudAlert]:
+    """Raise one ``FRAUD_RING`` alert per ring not already alerted with the same members.
+
+    ``rings`` are ``FraudRing`` tuples from ``FraudRingDetector``. Each alert
+    points at the ring's most recent linking transaction and lists every
+    member account.
+    """
+    alerted = get_alerted_rings(db)
+    now = datetime.utcnow()
+    created = []
+    for ring in rings:
+        members = frozenset(ring.account_ids)
+        if members in alerted:
+            continue
+        alerted.add(members)
+        alert = models.FraudAlert(
+            transaction_id=ring.anchor_transaction_id,
+            alert_type=FraudAlertType.FRAUD_RING,
+            risk_score=min(1.0, 0.6 + 0.05 * len(members)),
+            reason=RING_REASON,
+            status=FraudAlertStatus.OPEN,
+            created_at=now,
+            factors=[models.FraudAlertFactor(factor_code=RING_FACTOR_CODE, created_at=now)],
+            ring_members=[models.FraudRingMember(account_id=account_id) for account_id in ring.account_ids]
+        )
+        db.add(alert)
+        created.append(alert)
+    if created:
+        db.flush()
+        crud_fraud_rollup.record_alerts(db, created)
+    db.commit()
+    dashboard_cache.invalidate("fraud_insights")
+    return created
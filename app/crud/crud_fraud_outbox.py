@@ -0,0 +1,100 @@
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+import uuid
+from .. import models
+
+
+def enqueue(db: Session, transaction: models.Transaction):
+    """Queue a transaction for scoring; the caller commits with the transaction row"""
+    db.add(models.FraudScoringOutbox(transaction_id=transaction.id, created_at=datetime.utcnow()))
+
+
+def _claimable(now: datetime, lease_seconds: float, max_attempts: int):
+    outbox = models.FraudScoringOutbox
+    return [
+        outbox.attempts < max_attempts,
+        or_(outbox.claimed_by.is_(None), outbox.claimed_at < now - timedelta(seconds=lease_seconds))
+    ]
+
+
+def claim_batch(db: Session, limit: int, lease_seconds: float = 60,
+                max_attempts: int = 5) -> List[models.FraudScoringOutbox]:
+    """Lease up to ``limit`` of the oldest claimable rows.
+
+    The claim is a conditional UPDATE tagged with a fresh token, so concurrent
+    workers never receive the same row, on SQLite and MySQL alike.
+    """
+    outbox = models.FraudScoringOutbox
+    now = datetime.utcnow()
+    candidates = [row_id for (row_id,) in db.query(outbox.id).filter(
+        *_claimable(now, lease_seconds, max_attempts)
+    ).order_by(outbox.id).limit(limit)]
+    if not candidates:
+        db.rollback()
+        return []
+
+    token = str(uuid.uuid4())
+    db.query(outbox).filter(
+        outbox.id.in_(candidates),
+        *_claimable(now, lease_seconds, max_attempts)
+    ).update({
+        outbox.claimed_by: token,
+        outbox.claimed_at: now,
+        outbox.attempts: outbox.attempts + 1
+    }, synchronize_session=False)
+    db.commit()
+    return db.query(outbox).filter(outbox.claimed_by == token).order_by(outbox.id).all()
+
+
+def complete(db: Session, rows: List[models.FraudScoringOutbox]) -> bool:
+    """Delete processed rows; the caller commits together with the scoring results.
+
+    Returns ``False`` if any row's lease was lost to another worker, in which
+    case the caller should roll back instead of committing.
+    """
+    outbox = models.FraudScoringOutbox
+    deleted = 0
+    for token in {row.claimed_by for row in rows}:
+        ids = [row.id for row in rows if row.claimed_by == token]
+        deleted += db.query(outbox).filter(
+            outbox.id.in_(ids),
+            outbox.claimed_by == token
+        ).delete(synchronize_session=False)
+    return deleted == len(rows)
+
+
+def release(db: Session, row_ids: List, claimed_by: str, error: Optional[str] = None):
+    """Return rows to the queue after a failed attempt.
+
+    Only rows still claimed with ``claimed_by`` are released; a row whose
+    lease expired and was claimed again belongs to the new worker. Pass the
+    token captured at claim time: after a rollback the rows reload the
+    current owner.
+    """
+    outbox = models.FraudScoringOutbox
+    db.query(outbox).filter(
+        outbox.id.in_(row_ids),
+        outbox.claimed_by == claimed_by
+    ).update({
+        outbox.claimed_by: None,
+        outbox.claimed_at: None,
+        outbox.last_error: (error or "")[:255] or None
+    }, synchronize_session=False)
+    db.commit()
+
+
+def get_queue_metrics(db: Session, max_attempts: int = 5) -> Dict[str, Any]:
+    """Queue depth, in-flight and dead-lettered rows, and the age of the oldest pending row"""
+    outbox = models.FraudScoringOutbox
+    pending = outbox.attempts < max_attempts
+    depth, oldest = db.query(func.count(outbox.id), func.min(outbox.created_at)).filter(pending).one()
+    in_flight = db.query(func.count(outbox.id)).filter(pending, outbox.claimed_by.isnot(None)).scalar()
+    dead_letters = db.query(func.count(outbox.id)).filter(~pending).scalar()
+    return {
+        "queue_depth": depth,
+        "in_flight": in_flight,
+        "dead_letters": dead_letters,
+        "oldest_pending_seconds": round((datetime.utcnow() - oldest).total_seconds(), 3) if oldest else 0
+    }
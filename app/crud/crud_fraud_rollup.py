@@ -0,0 +1,138 @@
+from sqlalchemy import func, case, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+from .. import models
+from ..models.fraud_alert import FraudAlertStatus
+
+TOTAL = "total"
+STATUS = "status"
+RISK_BAND = "risk_band"
+FACTOR = "factor"
+
+REASON_SEPARATOR = "; "
+
+
+def risk_band(risk_score: float) -> str:
+    if risk_score >= 0.8:
+        return "high_risk"
+    if risk_score >= 0.5:
+        return "medium_risk"
+    return "low_risk"
+
+
+def _status_value(status) -> str:
+    return status.value if isinstance(status, FraudAlertStatus) else str(status)
+
+
+def _alert_keys(created_at: datetime, status, risk_score: float, reason: Optional[str]):
+    day = created_at.date()
+    yield day, TOTAL, ""
+    yield day, STATUS, _status_value(status)
+    yield day, RISK_BAND, risk_band(risk_score)
+    for factor in dict.fromkeys((reason or "").split(REASON_SEPARATOR)):
+        if factor:
+            yield day, FACTOR, factor[:100]
+
+
+def record_alerts(db: Session, alerts: Iterable):
+    """Count new alerts into the rollup.
+
+    ``alerts`` are ``FraudAlert`` objects or mappings with ``created_at``,
+    ``status``, ``risk_score`` and ``reason``. The caller commits.
+    """
+    deltas = Counter()
+    for alert in alerts:
+        if isinstance(alert, dict):
+            fields = (alert["created_at"], alert["status"], alert["risk_score"], alert.get("reason"))
+        else:
+            fields = (alert.created_at, alert.status, alert.risk_score, alert.reason)
+        deltas.update(_alert_keys(*fields))
+    _apply(db, deltas)
+
+
+def record_status_change(db: Session, created_at: datetime, old_status, new_status):
+    """Move an alert between status counts. The caller commits."""
+    if _status_value(old_status) == _status_value(new_status):
+        return
+    day = created_at.date()
+    _apply(db, {
+        (day, STATUS, _status_value(old_status)): -1,
+        (day, STATUS, _status_value(new_status)): 1
+    })
+
+
+def _apply(db: Session, deltas: Dict[Tuple[date, str, str], int]):
+    rollup = models.FraudAlertDailyRollup
+    for (day, dimension, value), delta in deltas.items():
+        key = (rollup.day == day, rollup.dimension == dimension, rollup.value == value)
+        updated = db.query(rollup).filter(*key).update(
+            {rollup.alert_count: rollup.alert_count + delta}, synchronize_session=False
+        )
+        if updated:
+            continue
+        try:
+            with db.begin_nested():
+                db.add(rollup(day=day, dimension=dimension, value=value, alert_count=delta))
+        except IntegrityError:
+            # Another writer created the row first
+            db.query(rollup).filter(*key).update(
+                {rollup.alert_count: rollup.alert_count + delta}, synchronize_session=False
+            )
+
+
+def get_counts(db: Session, start_day: date, end_day: Optional[date] = None) -> Dict[str, Dict[str, int]]:
+    """Sum the rollup over ``[start_day, end_day]`` as ``{dimension: {value: count}}``"""
+    rollup = models.FraudAlertDailyRollup
+    query = db.query(rollup.dimension, rollup.value, func.sum(rollup.alert_count)).filter(rollup.day >= start_day)
+    if end_day is not None:
+        query = query.filter(rollup.day <= end_day)
+
+    counts = {TOTAL: {}, STATUS: {}, RISK_BAND: {}, FACTOR: {}}
+    for dimension, value, alert_count in query.group_by(rollup.dimension, rollup.value):
+        if alert_count:
+            counts.setdefault(dimension, {})[value] = int(alert_count)
+    return counts
+
+
+def scan_counts(db: Session, start: datetime) -> Dict[str, Dict[str, int]]:
+    """Compute the same counts straight from ``fraud_alerts`` (for checks and benchmarks)"""
+    alert = models.FraudAlert
+    counts = {TOTAL: {}, STATUS: {}, RISK_BAND: {}, FACTOR: Counter()}
+    band = case(
+        (alert.risk_score >= 0.8, "high_risk"),
+        (and_(alert.risk_score >= 0.5, alert.risk_score < 0.8), "medium_risk"),
+        else_="low_risk"
+    )
+    rows = db.query(alert.status, band, func.count(alert.id)).filter(
+        alert.created_at >= start
+    ).group_by(alert.status, band).all()
+    for status, band, alert_count in rows:
+        status = _status_value(status)
+        counts[TOTAL][""] = counts[TOTAL].get("", 0) + alert_count
+        counts[STATUS][status] = counts[STATUS].get(status, 0) + alert_count
+        counts[RISK_BAND][band] = counts[RISK_BAND].get(band, 0) + alert_count
+
+    for (reason,) in db.query(alert.reason).filter(alert.created_at >= start).yield_per(10000):
+        counts[FACTOR].update(factor[:100] for factor in dict.fromkeys((reason or "").split(REASON_SEPARATOR)) if factor)
+    counts[FACTOR] = dict(counts[FACTOR])
+    return counts
+
+
+def rebuild_rollup(db: Session) -> int:
+    """Recompute the whole rollup from ``fraud_alerts``; returns the row count"""
+    alert = models.FraudAlert
+    deltas = Counter()
+    rows = db.query(alert.created_at, alert.status, alert.risk_score, alert.reason).yield_per(10000)
+    for created_at, status, risk_score, reason in rows:
+        deltas.update(_alert_keys(created_at, status, risk_score, reason))
+
+    db.query(models.FraudAlertDailyRollup).delete(synchronize_session=False)
+    db.bulk_insert_mappings(models.FraudAlertDailyRollup, [
+        {"day": day, "dimension": dimension, "value": value, "alert_count": alert_count}
+        for (day, dimension, value), alert_count in deltas.items()
+    ])
+    db.commit()
+    return len(deltas)
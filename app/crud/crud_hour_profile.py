@@ -0,0 +1,38 @@
+from sqlalchemy import func, extract
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+import struct
+import uuid
+from .. import models
+from .crud_account_stats import ACCOUNT_CHUNK_SIZE
+
+HOURS = 24
+_COUNTS = struct.Struct("<24I")
+
+HourCounts = Tuple[int, ...]
+
+
+def pack_counts(counts: Iterable[int]) -> bytes:
+    return _COUNTS.pack(*counts)
+
+
+def unpack_counts(data: Optional[bytes]) -> HourCounts:
+    return _COUNTS.unpack(data) if data else (0,) * HOURS
+
+
+def get_profiles_as_of(db: Session, account_ids: Iterable[uuid.UUID], as_of: datetime) -> Dict[uuid.UUID, HourCounts]:
+    """Hour profiles built from transactions up to ``as_of``, for point-in-time scoring"""
+    txn = models.Transaction
+    hour = extract("hour", txn.timestamp)
+    account_ids = list(account_ids)
+    profiles = {}
+    for i in range(0, len(account_ids), ACCOUNT_CHUNK_SIZE):
+        rows = db.query(txn.account_id, hour, func.count(txn.id)).filter(
+            txn.account_id.in_(account_ids[i:i + ACCOUNT_CHUNK_SIZE]),
+            txn.timestamp <= as_of
+        ).group_by(txn.account_id, hour)
+        for account_id, txn_hour, count in rows:
+            counts = profiles.setdefault(account_id, [0] * HOURS)
+            counts[int(txn_hour)] += count
+    return {account_id: tuple(counts) for account_id, counts in profiles.items()}
@@ -1,5 +1,13 @@
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional, Tuple
+import uuid
 from .. import models, schemas
+from ..core.cache import invalidate_chat_snapshot
+from . import crud_account_stats, crud_account_features, crud_fraud_outbox
+from ..services.velocity_tracker import velocity_tracker
+from ..services.geo_velocity import last_position_tracker
 
 
 def get_transaction(db: Session, transaction_id: int):
@@ -10,10 +18,81 @@ def get_transactions(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.Transaction).offset(skip).limit(limit).all()
 
 
+def encode_history_cursor(timestamp: datetime, transaction_id: uuid.UUID) -> str:
+    """Opaque keyset cursor for the history page that starts after this transaction"""
+    return f"{timestamp.isoformat()}_{uuid.UUID(str(transaction_id)).hex}"
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of ``encode_history_cursor``; raises ``ValueError`` on a malformed cursor"""
+    timestamp, _, transaction_id = cursor.rpartition("_")
+    return datetime.fromisoformat(timestamp), uuid.UUID(hex=transaction_id)
+
+
+def user_transaction_page_statement(user_id, limit: int = 10, cursor: Optional[str] = None):
+    """SELECT for one page of a user's transactions, newest first, with one extra row.
+
+    A single query joins the user's accounts and selects only the columns the
+    chat history shows, so no ORM entities are loaded. Pages are keyed on
+    (timestamp, id): each page is an index range scan, however deep it is.
+    Raises ``ValueError`` on a malformed cursor.
+    """
+    statement = select(
+        models.Transaction.id,
+        models.Transaction.amount,
+        models.Transaction.description,
+        models.Transaction.category,
+        models.Transaction.timestamp,
+        models.Account.account_number
+    ).join(models.Account, models.Transaction.account_id == models.Account.id).where(
+        models.Account.user_id == user_id
+    )
+    if cursor is not None:
+        timestamp, transaction_id = decode_history_cursor(cursor)
+        statement = statement.where(or_(
+            models.Transaction.timestamp < timestamp,
+            and_(models.Transaction.timestamp == timestamp, models.Transaction.id < transaction_id)
+        ))
+    # One extra row tells whether there is a next page
+    return statement.order_by(models.Transaction.timestamp.desc(), models.Transaction.id.desc()).limit(limit + 1)
+
+
+def split_transaction_page(rows: List, limit: int) -> Tuple[List, Optional[str]]:
+    """The page's rows and the cursor of the next page (``None`` on the last page)"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_history_cursor(rows[-1].timestamp, rows[-1].id)
+
+
+def get_user_transaction_page(db: Session, user_id, limit: int = 10,
+                              cursor: Optional[str] = None) -> Tuple[List, Optional[str]]:
+    """One page of a user's transactions, newest first, and the cursor of the next page"""
+    rows = db.execute(user_transaction_page_statement(user_id, limit, cursor)).all()
+    return split_transaction_page(rows, limit)
+
+
+async def get_user_transaction_page_async(db, user_id, limit: int = 10,
+                                          cursor: Optional[str] = None) -> Tuple[List, Optional[str]]:
+    """``get_user_transaction_page`` on an ``AsyncSession``"""
+    rows = (await db.execute(user_transaction_page_statement(user_id, limit, cursor))).all()
+    return split_transaction_page(rows, limit)
+
+
 def create_transaction(db: Session, transaction: schemas.TransactionCreate):
     db_transaction = models.Transaction(**transaction.dict())
     db.add(db_transaction)
+    db.flush()
+    crud_account_stats.record_transaction(db, db_transaction)
+    crud_account_features.record_transaction(db, db_transaction)
+    crud_fraud_outbox.enqueue(db, db_transaction)
+    user_id = db.query(models.Account.user_id).filter(models.Account.id == db_transaction.account_id).scalar()
     db.commit()
+    invalidate_chat_snapshot(user_id)
     db.refresh(db_transaction)
+    velocity_tracker.record(db_transaction.account_id, db_transaction.timestamp)
+    last_position_tracker.record_location(
+        db_transaction.account_id, db_transaction.id, db_transaction.timestamp, db_transaction.location
+    )
     return db_transaction
 
@@ -17,13 +17,38 @@ MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "bfsi_ai_assistant")
 
 # URL encode the password to handle special characters
 encoded_password = quote_plus(MYSQL_PASSWORD)
-SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{encoded_password}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+# DATABASE_URL / ASYNC_DATABASE_URL override the MySQL settings, e.g. for a local
+# SQLite file: sqlite:///./bfsi.db and sqlite+aiosqlite:///./bfsi.db
+SQLALCHEMY_DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"mysql+pymysql://{MYSQL_USER}:{encoded_password}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+)
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    f"mysql+aiomysql://{MYSQL_USER}:{encoded_password}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+)
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_sessionmaker = None
+
+def get_async_sessionmaker():
+    """Session factory on the async engine, created on first use.
+
+    Only the async chat backend needs it, so the async driver (aiomysql or
+    aiosqlite) is not required otherwise.
+    """
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+        _async_sessionmaker = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
 Base = declarative_base()
 
 def get_db():
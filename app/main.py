@@ -1,7 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
+from .database import engine, Base, SessionLocal
 from .api.api import api_router
+from .services.velocity_tracker import velocity_tracker
+from .services.fraud_scoring_pipeline import fraud_pipeline
 
 Base.metadata.create_all(bind=engine)
 
@@ -20,6 +22,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def warm_velocity_tracker():
+    # Load the last hour of transactions so the frequency factor can skip SQL
+    db = SessionLocal()
+    try:
+        velocity_tracker.warm(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def start_fraud_pipeline():
+    # Score new transactions from the outbox in background threads
+    if fraud_pipeline.num_workers > 0:
+        fraud_pipeline.start()
+
+@app.on_event("shutdown")
+def stop_fraud_pipeline():
+    fraud_pipeline.stop(timeout=10)
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the BFSI AI Assistant API"}
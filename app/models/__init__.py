@@ -1,6 +1,10 @@
 from .user import User
 from .account import Account
 from .transaction import Transaction
-from .fraud_alert import FraudAlert
+from .fraud_alert import FraudAlert, FraudAlertFactor, FraudRingMember
 from .claim import Claim
 from .claim_document import ClaimDocument
+from .account_stats import AccountDailyStats
+from .fraud_rollup import FraudAlertDailyRollup
+from .fraud_outbox import FraudScoringOutbox
+from .account_features import AccountFeatures
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, ForeignKey, Integer, BigInteger, Float, String, DateTime, LargeBinary
+from ..database import Base
+from .user import GUID
+from datetime import datetime
+
+class AccountFeatures(Base):
+    """Precomputed per-account features, one row per account.
+
+    Maintained incrementally by ``crud_transaction.create_transaction``.
+    ``schema_version`` is the ``crud_account_features`` layout the row was
+    written with; rows from another version are ignored by readers and
+    recomputed on the next write or by ``rebuild_account_stats.py``. The
+    binary columns are packed as described in ``crud_account_features``.
+    """
+    __tablename__ = "account_features"
+
+    account_id = Column(GUID(), ForeignKey("accounts.id"), primary_key=True)
+    schema_version = Column(Integer, nullable=False)
+
+    # Lifetime amount statistics
+    txn_count = Column(Integer, nullable=False, default=0)
+    amount_sum_cents = Column(BigInteger, nullable=False, default=0)
+    amount_sum_squares = Column(Float, nullable=False, default=0.0)
+    amount_max_cents = Column(BigInteger, nullable=False, default=0)  # Largest absolute amount
+    debit_count = Column(Integer, nullable=False, default=0)
+    debit_sum_cents = Column(BigInteger, nullable=False, default=0)
+
+    recent_minutes = Column(LargeBinary(64))  # Velocity: minute stamps of the latest transactions
+    merchant_registers = Column(LargeBinary(64))  # Merchant diversity: HyperLogLog registers
+    hour_counts = Column(LargeBinary(96))  # Hour-of-day profile, read by the profile time rule
+
+    last_transaction_at = Column(DateTime)
+    # Two latest located transactions, so a transaction can find the one before it
+    last_location = Column(String(100))
+    last_location_at = Column(DateTime)
+    last_location_transaction_id = Column(GUID())
+    previous_location = Column(String(100))
+    previous_location_at = Column(DateTime)
+    previous_location_transaction_id = Column(GUID())
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
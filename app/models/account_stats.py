@@ -0,0 +1,20 @@
+from sqlalchemy import Column, ForeignKey, Integer, BigInteger, Float, Date, LargeBinary
+from ..database import Base
+from .user import GUID
+
+class AccountDailyStats(Base):
+    """Per-account, per-day transaction aggregates.
+
+    Maintained incrementally by ``crud_transaction.create_transaction`` so the
+    fraud scorer can read rolling amount statistics without rescanning
+    ``transactions``. ``amount_sketch`` is a serialized ``QuantileSketch`` of
+    the day's absolute amounts in cents.
+    """
+    __tablename__ = "account_daily_stats"
+
+    account_id = Column(GUID(), ForeignKey("accounts.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    txn_count = Column(Integer, nullable=False, default=0)
+    amount_sum_cents = Column(BigInteger, nullable=False, default=0)
+    amount_sum_squares = Column(Float, nullable=False, default=0.0)
+    amount_sketch = Column(LargeBinary)
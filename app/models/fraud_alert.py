@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Enum, ForeignKey, Float, DateTime
+from sqlalchemy import Column, String, Enum, ForeignKey, Float, DateTime, Index
 from sqlalchemy.orm import relationship
 import uuid
 from ..database import Base
@@ -11,11 +11,17 @@ class FraudAlertStatus(str, enum.Enum):
     DISMISSED = "DISMISSED"
     CONFIRMED_FRAUD = "CONFIRMED_FRAUD"
 
+class FraudAlertType(str, enum.Enum):
+    TRANSACTION = "TRANSACTION"
+    FRAUD_RING = "FRAUD_RING"
+
 class FraudAlert(Base):
     __tablename__ = "fraud_alerts"
 
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    # Fraud ring alerts point at the ring's most recent linking transaction
     transaction_id = Column(GUID(), ForeignKey("transactions.id"), nullable=False)
+    alert_type = Column(Enum(FraudAlertType), nullable=False, default=FraudAlertType.TRANSACTION)
     risk_score = Column(Float, nullable=False)
     reason = Column(String(255))
     status = Column(Enum(FraudAlertStatus), nullable=False, default=FraudAlertStatus.OPEN)
@@ -25,4 +31,28 @@ class FraudAlert(Base):
 
     transaction = relationship("Transaction")
     analyst = relationship("User")
+    factors = relationship("FraudAlertFactor", cascade="all, delete-orphan")
+    ring_members = relationship("FraudRingMember", cascade="all, delete-orphan")
+
+class FraudAlertFactor(Base):
+    """One risk factor that contributed to an alert.
+
+    ``created_at`` is copied from the alert so factor analytics over a time
+    window are served by the (factor_code, created_at) index alone.
+    """
+    __tablename__ = "fraud_alert_factors"
+
+    alert_id = Column(GUID(), ForeignKey("fraud_alerts.id"), primary_key=True)
+    factor_code = Column(String(40), primary_key=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_fraud_alert_factors_code_created", "factor_code", "created_at"),
+    )
+
+class FraudRingMember(Base):
+    """An account belonging to a FRAUD_RING alert"""
+    __tablename__ = "fraud_ring_members"
 
+    alert_id = Column(GUID(), ForeignKey("fraud_alerts.id"), primary_key=True)
+    account_id = Column(GUID(), ForeignKey("accounts.id"), primary_key=True, index=True)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, BigInteger, ForeignKey, DateTime
+from ..database import Base
+from .user import GUID
+from datetime import datetime
+
+class FraudScoringOutbox(Base):
+    """Transactions waiting to be fraud scored.
+
+    A row is written in the same commit as its transaction and deleted in the
+    same commit as the resulting alerts, so every transaction is scored once
+    even if a worker dies mid-batch. ``claimed_by``/``claimed_at`` form a
+    lease: rows claimed longer ago than the lease are picked up again.
+    """
+    __tablename__ = "fraud_scoring_outbox"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    transaction_id = Column(GUID(), ForeignKey("transactions.id"), nullable=False, unique=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    claimed_by = Column(String(36), index=True)
+    claimed_at = Column(DateTime)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(255))
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, Date
+from ..database import Base
+
+class FraudAlertDailyRollup(Base):
+    """Alert counts per creation day, broken down by one dimension.
+
+    ``dimension`` is one of ``total``, ``status``, ``risk_band`` or ``factor``
+    and ``value`` is the status, band or factor reason (empty for ``total``).
+    Maintained incrementally when alerts are created or change status.
+    """
+    __tablename__ = "fraud_alert_daily_rollup"
+
+    day = Column(Date, primary_key=True)
+    dimension = Column(String(20), primary_key=True)
+    value = Column(String(100), primary_key=True)
+    alert_count = Column(Integer, nullable=False, default=0)
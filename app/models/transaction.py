@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime
+from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime, Index
 from sqlalchemy.orm import relationship
 import uuid
 from ..database import Base
@@ -19,3 +19,8 @@ class Transaction(Base):
 
     account = relationship("Account")
 
+    __table_args__ = (
+        # Per-account history in time order (fraud history, chat history pages)
+        Index("ix_transactions_account_timestamp", "account_id", "timestamp", "id"),
+    )
+
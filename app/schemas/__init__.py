@@ -1,6 +1,6 @@
 from .user import User, UserCreate
 from .account import Account, AccountCreate
 from .transaction import Transaction, TransactionCreate
-from .fraud_alert import FraudAlert, FraudAlertCreate
+from .fraud_alert import FraudAlert, FraudAlertCreate, FraudAlertStatusUpdate
 from .claim import Claim, ClaimCreate
 from .claim_document import ClaimDocument, ClaimDocumentCreate
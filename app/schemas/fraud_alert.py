@@ -2,7 +2,7 @@ from pydantic import BaseModel, ConfigDict
 import uuid
 from datetime import datetime
 from typing import Optional
-from ..models.fraud_alert import FraudAlertStatus
+from ..models.fraud_alert import FraudAlertStatus, FraudAlertType
 
 # Shared properties
 class FraudAlertBase(BaseModel):
@@ -13,10 +13,15 @@ class FraudAlertBase(BaseModel):
 class FraudAlertCreate(FraudAlertBase):
     transaction_id: uuid.UUID
 
+# Properties to receive on fraud_alert status change
+class FraudAlertStatusUpdate(BaseModel):
+    status: FraudAlertStatus
+
 # Properties to return to client
 class FraudAlert(FraudAlertBase):
     id: uuid.UUID
     transaction_id: uuid.UUID
+    alert_type: FraudAlertType = FraudAlertType.TRANSACTION
     status: FraudAlertStatus
     analyst_id: Optional[uuid.UUID] = None
     created_at: datetime
@@ -1,9 +1,101 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional, Tuple
 import uuid
 from datetime import datetime
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from .. import models
 from ..models.user import User
-from ..crud import crud_account, crud_transaction
+from ..core.cache import chat_snapshot_cache
+from ..crud import crud_transaction, crud_account_features
+from .intent_router import Intent, IntentRouter
+
+# Intent table: keyword or phrase -> weight. Topic words outweigh modifiers
+# such as "last" or "how much", so "last balance" asks for the balance and
+# "how much did I spend" for spending insights. Ties go to the earlier intent.
+INTENTS = [
+    Intent("spending_insights", {"spending": 2.0, "spend": 2.0, "spent": 2.0, "insights": 2.0}),
+    Intent("balance", {"balance": 2.0, "account balance": 3.0, "how much": 1.0, "money": 1.0}),
+    # Phrases only: a bare "more" also appears in "more info" or "more help".
+    # Listed before "transactions" so that "show more transactions" asks for the next page
+    Intent("more_transactions", {
+        "more transactions": 3.0, "show more": 3.0, "next page": 3.0,
+        "older transactions": 3.0, "earlier transactions": 3.0
+    }),
+    Intent("transactions", {"transactions": 2.0, "history": 1.5, "recent": 1.0, "last": 0.5}),
+    Intent("account_info", {"account": 1.0, "info": 1.0, "information": 1.0}),
+    Intent("help", {"help": 2.0, "faq": 2.0, "support": 2.0, "assistance": 2.0})
+]
+
+intent_router = IntentRouter(INTENTS)
+
+# Transactions per history page ("more" continues from the page's next_cursor)
+HISTORY_PAGE_SIZE = 10
+
+
+class AccountSummary(NamedTuple):
+    id: uuid.UUID
+    account_number: str
+    account_type: str
+    balance: float
+    status: str
+    created_at: Optional[datetime]
+
+
+class AccountSnapshot(NamedTuple):
+    """What the balance, account and history intents show, cached per user"""
+    accounts: Tuple[AccountSummary, ...]
+    # First page of crud_transaction.get_user_transaction_page
+    transactions: Tuple
+    next_cursor: Optional[str]
+
+
+def snapshot_accounts_statement(user_id):
+    """SELECT of the account columns kept in an ``AccountSnapshot``"""
+    return select(
+        models.Account.id,
+        models.Account.account_number,
+        models.Account.account_type,
+        models.Account.balance,
+        models.Account.status,
+        models.Account.created_at
+    ).where(models.Account.user_id == user_id)
+
+
+def make_snapshot(account_rows, transactions, next_cursor: Optional[str]) -> AccountSnapshot:
+    accounts = tuple(
+        AccountSummary(row.id, row.account_number, row.account_type.value, float(row.balance),
+                       row.status.value, row.created_at)
+        for row in account_rows
+    )
+    return AccountSnapshot(accounts, tuple(transactions), next_cursor)
+
+
+def history_header(cursor: Optional[str]) -> str:
+    return "Here are your recent transactions:\n" if cursor is None else "Here are your earlier transactions:\n"
+
+
+def transaction_data_of(txn) -> Dict[str, Any]:
+    """Chat payload of one history row"""
+    return {
+        "id": str(txn.id),
+        "amount": float(txn.amount),
+        "description": txn.description or "Transaction",
+        "category": txn.category or "General",
+        "timestamp": txn.timestamp.strftime("%Y-%m-%d %H:%M"),
+        "account_number": txn.account_number
+    }
+
+
+def transaction_line(txn_data: Dict[str, Any]) -> str:
+    return f"• {txn_data['timestamp']} - {txn_data['description']}: ${txn_data['amount']:,.2f}\n"
+
+
+def stream_response(response: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream events of a reply that is already complete: one chunk per line, then ``done``"""
+    for line in response["response"].splitlines(keepends=True):
+        yield "chunk", {"response": line}
+    yield "done", response
+
 
 class AIBankingAssistant:
     def __init__(self):
@@ -12,44 +104,106 @@ class AIBankingAssistant:
             "Hi there! I'm here to help with your banking needs. What can I do for you?",
             "Welcome! I'm your virtual banking assistant. How may I assist you?"
         ]
+        self.handlers = {
+            "spending_insights": self.get_spending_insights,
+            "balance": self.get_account_balance,
+            "transactions": self.get_transaction_history,
+            "account_info": self.get_account_info,
+            "help": lambda user, db: self.get_help_info()
+        }
     
-    def process_message(self, message: str, user: User, db: Session) -> Dict[str, Any]:
-        """Process user message and return appropriate response"""
-        message_lower = message.lower()
-        
-        # Check balance inquiry
-        if any(word in message_lower for word in ['balance', 'account balance', 'how much', 'money']):
-            return self.get_account_balance(user, db)
-        
-        # Transaction history
-        elif any(word in message_lower for word in ['transactions', 'history', 'recent', 'last']):
-            return self.get_transaction_history(user, db)
-        
-        # Account information
-        elif any(word in message_lower for word in ['account', 'accounts', 'info', 'information']):
-            return self.get_account_info(user, db)
+    def process_message(self, message: str, user: User, db: Session, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Process user message and return appropriate response
+
+        ``cursor`` is the ``next_cursor`` of a transaction history response;
+        asking for "more" continues from it.
+        """
+        intent = intent_router.route(message)
+        if intent == "more_transactions":
+            return self.get_transaction_history(user, db, cursor=cursor)
+        handler = self.handlers.get(intent)
+        if handler is not None:
+            return handler(user, db)
+        return self.get_suggestions()
+    
+    def get_suggestions(self) -> Dict[str, Any]:
+        """Default response with suggestions"""
+        return {
+            "response": "I'm here to help! I can assist you with:\n• Checking your account balance\n• Viewing recent transactions\n• Account information\n• General banking questions\n\nWhat would you like to know?",
+            "type": "suggestion",
+            "suggestions": [
+                "Check my balance",
+                "Show recent transactions",
+                "Account information",
+                "Help"
+            ]
+        }
+    
+    def stream_message(self, message: str, user: User, db: Session,
+                       cursor: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Reply to a message as ``(event, payload)`` pairs for server-sent events.
+
+        ``chunk`` events carry pieces of the reply text as they are produced;
+        the last event, ``done``, carries the complete response, ``data``
+        included. Transaction history is streamed row by row from a
+        server-side cursor; other intents are built first, then streamed.
+        """
+        intent = intent_router.route(message)
+        if intent == "transactions":
+            yield from self.stream_transaction_history(user, db)
+        elif intent == "more_transactions":
+            yield from self.stream_transaction_history(user, db, cursor=cursor)
+        else:
+            yield from stream_response(self.process_message(message, user, db, cursor=cursor))
+    
+    def stream_transaction_history(self, user: User, db: Session,
+                                   cursor: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        try:
+            statement = crud_transaction.user_transaction_page_statement(user.id, HISTORY_PAGE_SIZE, cursor)
+        except ValueError:
+            yield from stream_response(self.get_cursor_error())
+            return
         
-        # Help/FAQ
-        elif any(word in message_lower for word in ['help', 'faq', 'support', 'assistance']):
-            return self.get_help_info()
+        rows = []
+        result = db.execute(statement.execution_options(stream_results=True))
+        try:
+            for row in result:
+                rows.append(row)
+                # The extra row only tells whether there is a next page
+                if len(rows) > HISTORY_PAGE_SIZE:
+                    break
+                if len(rows) == 1:
+                    yield "chunk", {"response": history_header(cursor)}
+                yield "chunk", {"response": transaction_line(transaction_data_of(row))}
+        finally:
+            result.close()
         
-        # Default response with suggestions
-        else:
-            return {
-                "response": "I'm here to help! I can assist you with:\n• Checking your account balance\n• Viewing recent transactions\n• Account information\n• General banking questions\n\nWhat would you like to know?",
-                "type": "suggestion",
-                "suggestions": [
-                    "Check my balance",
-                    "Show recent transactions",
-                    "Account information",
-                    "Help"
-                ]
-            }
+        transactions, next_cursor = crud_transaction.split_transaction_page(rows, HISTORY_PAGE_SIZE)
+        if not transactions:
+            accounts = self.get_snapshot(user, db).accounts if cursor is None else ()
+            yield from stream_response(self.format_transaction_history(transactions, None, accounts, cursor=cursor))
+            return
+        yield "done", self.format_transaction_history(transactions, next_cursor, cursor=cursor)
+    
+    def get_snapshot(self, user: User, db: Session) -> AccountSnapshot:
+        """The user's account snapshot, read through ``chat_snapshot_cache``.
+
+        Entries are dropped by ``crud_account.create_account`` and
+        ``crud_transaction.create_transaction`` when they touch the user's
+        accounts, and otherwise expire after the cache TTL.
+        """
+        return chat_snapshot_cache.get_or_compute(("chat_snapshot", user.id), lambda: self._build_snapshot(user, db))
+    
+    def _build_snapshot(self, user: User, db: Session) -> AccountSnapshot:
+        account_rows = db.execute(snapshot_accounts_statement(user.id)).all()
+        transactions, next_cursor = crud_transaction.get_user_transaction_page(db, user.id, limit=HISTORY_PAGE_SIZE)
+        return make_snapshot(account_rows, transactions, next_cursor)
     
     def get_account_balance(self, user: User, db: Session) -> Dict[str, Any]:
         """Get user's account balance"""
-        accounts = crud_account.get_accounts_by_user(db, user.id)
-        
+        return self.format_account_balance(self.get_snapshot(user, db).accounts)
+    
+    def format_account_balance(self, accounts: Tuple[AccountSummary, ...]) -> Dict[str, Any]:
         if not accounts:
             return {
                 "response": "You don't have any accounts set up yet. Would you like to open an account?",
@@ -62,11 +216,11 @@ class AIBankingAssistant:
         for account in accounts:
             balance_info.append({
                 "account_number": account.account_number,
-                "account_type": account.account_type.value,
-                "balance": float(account.balance),
-                "status": account.status.value
+                "account_type": account.account_type,
+                "balance": account.balance,
+                "status": account.status
             })
-            total_balance += float(account.balance)
+            total_balance += account.balance
         
         response = f"Here are your account balances:\n"
         for info in balance_info:
@@ -82,57 +236,129 @@ class AIBankingAssistant:
             }
         }
     
-    def get_transaction_history(self, user: User, db: Session) -> Dict[str, Any]:
-        """Get user's recent transaction history"""
-        from .. import models
-        
-        # Get user's accounts
-        accounts = crud_account.get_accounts_by_user(db, user.id)
-        if not accounts:
-            return {
-                "response": "No accounts found. Please set up an account first.",
-                "type": "info"
-            }
-        
-        # Get recent transactions for all user accounts
-        transactions = db.query(models.Transaction).filter(
-            models.Transaction.account_id.in_([acc.id for acc in accounts])
-        ).order_by(models.Transaction.timestamp.desc()).limit(10).all()
-        
+    def get_transaction_history(self, user: User, db: Session, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get a page of the user's transaction history, newest first"""
+        if cursor is None:
+            # The first page is part of the cached snapshot
+            snapshot = self.get_snapshot(user, db)
+            return self.format_transaction_history(snapshot.transactions, snapshot.next_cursor, snapshot.accounts)
+        try:
+            transactions, next_cursor = crud_transaction.get_user_transaction_page(db, user.id, limit=HISTORY_PAGE_SIZE, cursor=cursor)
+        except ValueError:
+            return self.get_cursor_error()
+        return self.format_transaction_history(transactions, next_cursor, cursor=cursor)
+    
+    def get_cursor_error(self) -> Dict[str, Any]:
+        return {
+            "response": "I couldn't find where your last page of transactions ended. Ask me for your recent transactions to start over.",
+            "type": "info"
+        }
+    
+    def format_transaction_history(self, transactions, next_cursor: Optional[str],
+                                   accounts: Tuple[AccountSummary, ...] = (),
+                                   cursor: Optional[str] = None) -> Dict[str, Any]:
+        """``accounts`` only words an empty first page"""
         if not transactions:
+            if cursor is not None:
+                return {
+                    "response": "That's all of your transactions.",
+                    "type": "info"
+                }
+            if not accounts:
+                return {
+                    "response": "No accounts found. Please set up an account first.",
+                    "type": "info"
+                }
             return {
                 "response": "No recent transactions found.",
                 "type": "info"
             }
         
-        response = "Here are your recent transactions:\n"
+        response = history_header(cursor)
         transaction_data = []
         
         for txn in transactions:
-            txn_data = {
-                "id": str(txn.id),
-                "amount": float(txn.amount),
-                "description": txn.description or "Transaction",
-                "category": txn.category or "General",
-                "timestamp": txn.timestamp.strftime("%Y-%m-%d %H:%M"),
-                "account_number": txn.account.account_number
-            }
+            txn_data = transaction_data_of(txn)
             transaction_data.append(txn_data)
-            
-            response += f"• {txn_data['timestamp']} - {txn_data['description']}: ${txn_data['amount']:,.2f}\n"
+            response += transaction_line(txn_data)
         
-        return {
+        result = {
             "response": response,
             "type": "transactions",
             "data": {
-                "transactions": transaction_data
+                "transactions": transaction_data,
+                "next_cursor": next_cursor
+            }
+        }
+        if next_cursor is not None:
+            result["suggestions"] = ["Show more transactions"]
+        return result
+    
+    def get_spending_insights(self, user: User, db: Session) -> Dict[str, Any]:
+        """Summarize the user's spending from the precomputed account features"""
+        accounts = self.get_snapshot(user, db).accounts
+        # One bulk lookup instead of scanning every transaction
+        features = crud_account_features.get_features_many(db, [acc.id for acc in accounts]) if accounts else {}
+        return self.format_spending_insights(accounts, features)
+    
+    def format_spending_insights(self, accounts: Tuple[AccountSummary, ...],
+                                 features: Dict[uuid.UUID, crud_account_features.AccountFeatureSet]) -> Dict[str, Any]:
+        if not accounts:
+            return {
+                "response": "No accounts found. Please set up an account first.",
+                "type": "info"
+            }
+        
+        if not features:
+            return {
+                "response": "There isn't enough activity on your accounts yet for spending insights.",
+                "type": "info"
             }
+        
+        txn_count = sum(f.txn_count for f in features.values())
+        debit_count = sum(f.debit_count for f in features.values())
+        total_spent = -sum(f.debit_sum_cents for f in features.values()) / 100
+        largest = max(f.amount_max_cents for f in features.values()) / 100
+        hour_counts = [sum(f.hour_counts[hour] for f in features.values()) for hour in range(24)]
+        busiest_hour = max(range(24), key=lambda hour: hour_counts[hour])
+        # Merchants shared between accounts are counted once
+        merchants = crud_account_features.estimate_distinct(
+            crud_account_features.merge_registers(f.merchant_registers for f in features.values())
+        )
+        located = [f for f in features.values() if f.last_location_at is not None]
+        last_location = max(located, key=lambda f: f.last_location_at).last_location if located else None
+        
+        insights = {
+            "transaction_count": txn_count,
+            "purchase_count": debit_count,
+            "total_spent": total_spent,
+            "average_purchase": total_spent / debit_count if debit_count else 0.0,
+            "largest_transaction": largest,
+            "busiest_hour": busiest_hour,
+            "distinct_merchants": merchants,
+            "last_location": last_location
+        }
+        
+        response = "Here are your spending insights:\n"
+        response += f"• Total spent: ${insights['total_spent']:,.2f} across {debit_count} purchases\n"
+        response += f"• Average purchase: ${insights['average_purchase']:,.2f}\n"
+        response += f"• Largest transaction: ${largest:,.2f}\n"
+        response += f"• Most active time: {busiest_hour:02d}:00-{busiest_hour:02d}:59 UTC\n"
+        response += f"• Merchants used: about {merchants}\n"
+        if last_location:
+            response += f"• Last seen location: {last_location}\n"
+        
+        return {
+            "response": response,
+            "type": "spending_insights",
+            "data": insights
         }
     
     def get_account_info(self, user: User, db: Session) -> Dict[str, Any]:
         """Get user's account information"""
-        accounts = crud_account.get_accounts_by_user(db, user.id)
-        
+        return self.format_account_info(user, self.get_snapshot(user, db).accounts)
+    
+    def format_account_info(self, user: User, accounts: Tuple[AccountSummary, ...]) -> Dict[str, Any]:
         if not accounts:
             return {
                 "response": "You don't have any accounts set up yet. Would you like to open an account?",
@@ -145,9 +371,9 @@ class AIBankingAssistant:
         for account in accounts:
             acc_data = {
                 "account_number": account.account_number,
-                "account_type": account.account_type.value,
-                "balance": float(account.balance),
-                "status": account.status.value,
+                "account_type": account.account_type,
+                "balance": account.balance,
+                "status": account.status,
                 "created_at": account.created_at.strftime("%Y-%m-%d")
             }
             account_data.append(acc_data)
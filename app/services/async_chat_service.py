@@ -0,0 +1,122 @@
+from typing import AsyncIterator, Dict, Any, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.user import User
+from ..core.cache import chat_snapshot_cache
+from ..crud import crud_transaction, crud_account_features
+from .ai_chat_service import (
+    AIBankingAssistant, AccountSnapshot, HISTORY_PAGE_SIZE, intent_router, snapshot_accounts_statement, make_snapshot,
+    history_header, transaction_data_of, transaction_line, stream_response
+)
+
+
+class AsyncAIBankingAssistant(AIBankingAssistant):
+    """``AIBankingAssistant`` on an ``AsyncSession``, for the async chat endpoint.
+
+    Queries are awaited on the event loop instead of holding a threadpool
+    worker, so a burst of chat traffic does not starve the sync auth and
+    transaction routes. Intents, snapshot cache and reply wording are the
+    same as the sync assistant's; only the data access is async.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.handlers = {
+            "spending_insights": self.get_spending_insights,
+            "balance": self.get_account_balance,
+            "transactions": self.get_transaction_history,
+            "account_info": self.get_account_info,
+            "help": self._get_help_info
+        }
+
+    async def process_message(self, message: str, user: User, db: AsyncSession,
+                              cursor: Optional[str] = None) -> Dict[str, Any]:
+        intent = intent_router.route(message)
+        if intent == "more_transactions":
+            return await self.get_transaction_history(user, db, cursor=cursor)
+        handler = self.handlers.get(intent)
+        if handler is not None:
+            return await handler(user, db)
+        return self.get_suggestions()
+
+    async def stream_message(self, message: str, user: User, db: AsyncSession,
+                             cursor: Optional[str] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        intent = intent_router.route(message)
+        if intent in ("transactions", "more_transactions"):
+            events = self.stream_transaction_history(user, db, cursor=cursor if intent == "more_transactions" else None)
+            async for event in events:
+                yield event
+        else:
+            for event in stream_response(await self.process_message(message, user, db, cursor=cursor)):
+                yield event
+
+    async def stream_transaction_history(self, user: User, db: AsyncSession,
+                                         cursor: Optional[str] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        try:
+            statement = crud_transaction.user_transaction_page_statement(user.id, HISTORY_PAGE_SIZE, cursor)
+        except ValueError:
+            for event in stream_response(self.get_cursor_error()):
+                yield event
+            return
+
+        rows = []
+        result = await db.stream(statement)
+        try:
+            async for row in result:
+                rows.append(row)
+                if len(rows) > HISTORY_PAGE_SIZE:
+                    break
+                if len(rows) == 1:
+                    yield "chunk", {"response": history_header(cursor)}
+                yield "chunk", {"response": transaction_line(transaction_data_of(row))}
+        finally:
+            await result.close()
+
+        transactions, next_cursor = crud_transaction.split_transaction_page(rows, HISTORY_PAGE_SIZE)
+        if not transactions:
+            accounts = (await self.get_snapshot(user, db)).accounts if cursor is None else ()
+            for event in stream_response(self.format_transaction_history(transactions, None, accounts, cursor=cursor)):
+                yield event
+            return
+        yield "done", self.format_transaction_history(transactions, next_cursor, cursor=cursor)
+
+    async def get_snapshot(self, user: User, db: AsyncSession) -> AccountSnapshot:
+        return await chat_snapshot_cache.get_or_compute_async(
+            ("chat_snapshot", user.id), lambda: self._build_snapshot(user, db)
+        )
+
+    async def _build_snapshot(self, user: User, db: AsyncSession) -> AccountSnapshot:
+        account_rows = (await db.execute(snapshot_accounts_statement(user.id))).all()
+        transactions, next_cursor = await crud_transaction.get_user_transaction_page_async(db, user.id, limit=HISTORY_PAGE_SIZE)
+        return make_snapshot(account_rows, transactions, next_cursor)
+
+    async def get_account_balance(self, user: User, db: AsyncSession) -> Dict[str, Any]:
+        return self.format_account_balance((await self.get_snapshot(user, db)).accounts)
+
+    async def get_transaction_history(self, user: User, db: AsyncSession,
+                                      cursor: Optional[str] = None) -> Dict[str, Any]:
+        if cursor is None:
+            snapshot = await self.get_snapshot(user, db)
+            return self.format_transaction_history(snapshot.transactions, snapshot.next_cursor, snapshot.accounts)
+        try:
+            transactions, next_cursor = await crud_transaction.get_user_transaction_page_async(
+                db, user.id, limit=HISTORY_PAGE_SIZE, cursor=cursor
+            )
+        except ValueError:
+            return self.get_cursor_error()
+        return self.format_transaction_history(transactions, next_cursor, cursor=cursor)
+
+    async def get_spending_insights(self, user: User, db: AsyncSession) -> Dict[str, Any]:
+        accounts = (await self.get_snapshot(user, db)).accounts
+        features = {}
+        if accounts:
+            # Blob decoding lives in the sync CRUD module; run_sync awaits its query on this connection
+            account_ids = [acc.id for acc in accounts]
+            features = await db.run_sync(lambda session: crud_account_features.get_features_many(session, account_ids))
+        return self.format_spending_insights(accounts, features)
+
+    async def get_account_info(self, user: User, db: AsyncSession) -> Dict[str, Any]:
+        return self.format_account_info(user, (await self.get_snapshot(user, db)).accounts)
+
+    async def _get_help_info(self, user: User, db: AsyncSession) -> Dict[str, Any]:
+        return self.get_help_info()
@@ -0,0 +1,136 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+import time
+import uuid
+
+from ..models.transaction import Transaction
+from ..models.fraud_alert import FraudAlert, FraudAlertStatus, FraudAlertType
+from .fraud_detection_service import FraudDetectionService
+
+
+def load_labels(db: Session) -> Dict[uuid.UUID, bool]:
+    """``{transaction_id: is_fraud}`` from analyst-resolved transaction alerts.
+
+    A transaction confirmed by any alert counts as fraud.
+    """
+    labels: Dict[uuid.UUID, bool] = {}
+    rows = db.query(FraudAlert.transaction_id, FraudAlert.status).filter(
+        FraudAlert.alert_type == FraudAlertType.TRANSACTION,
+        FraudAlert.status.in_([FraudAlertStatus.CONFIRMED_FRAUD, FraudAlertStatus.DISMISSED])
+    ).yield_per(10000)
+    for transaction_id, status in rows:
+        labels[transaction_id] = labels.get(transaction_id, False) or status == FraudAlertStatus.CONFIRMED_FRAUD
+    return labels
+
+
+def _latency_summary(values_ns: List[int]) -> Dict[str, float]:
+    """Mean and percentiles in microseconds"""
+    if not values_ns:
+        return {"count": 0, "mean_us": 0, "p50_us": 0, "p99_us": 0, "max_us": 0}
+    values = sorted(values_ns)
+    return {
+        "count": len(values),
+        "mean_us": round(sum(values) / len(values) / 1000, 3),
+        "p50_us": round(values[len(values) // 2] / 1000, 3),
+        "p99_us": round(values[min(len(values) - 1, int(len(values) * 0.99))] / 1000, 3),
+        "max_us": round(values[-1] / 1000, 3)
+    }
+
+
+class FraudBacktest:
+    """Replays historical transactions through ``FraudDetectionService`` without writing alerts.
+
+    Transactions are read in (timestamp, id) order with keyset pages and each
+    one is scored as of its own timestamp, so it only sees the history that
+    existed when it happened. Run it against a snapshot database: the daily
+    stats must be up to date there (see ``rebuild_account_stats.py``). Alerts resolved by analysts serve as
+    ground truth; transactions without a resolved alert are unlabeled and
+    only count towards the flag rate.
+    """
+
+    def __init__(self, service: Optional[FraudDetectionService] = None, page_size: int = 1000):
+        self.service = service or FraudDetectionService()
+        self.page_size = page_size
+
+    def run(self, db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+            limit: Optional[int] = None) -> Dict[str, Any]:
+        labels = load_labels(db)
+        # Rule metrics of this run only, not the process-wide ones
+        live_rules = self.service.rules
+        self.service.rules = self.service.build_rule_registry(metrics={})
+        latencies: List[int] = []
+        confusion = {"tp": 0, "fp": 0, "fn": 0, "tn": 0}
+        flagged = 0
+        scored = 0
+        started = time.perf_counter()
+
+        try:
+            for transaction in self._replay(db, start, end, limit):
+                call_started = time.perf_counter_ns()
+                result = self.service.analyze_transaction(transaction, db, as_of=transaction.timestamp, persist=False)
+                latencies.append(time.perf_counter_ns() - call_started)
+                scored += 1
+
+                predicted = result["is_fraud_risk"]
+                flagged += predicted
+                label = labels.get(transaction.id)
+                if label is not None:
+                    confusion[("t" if predicted == label else "f") + ("p" if predicted else "n")] += 1
+            elapsed = time.perf_counter() - started
+            rule_metrics = self.service.rules.snapshot()
+        finally:
+            self.service.rules = live_rules
+
+        tp, fp, fn, tn = confusion["tp"], confusion["fp"], confusion["fn"], confusion["tn"]
+        return {
+            "transactions": scored,
+            "flagged": flagged,
+            "flag_rate": round(flagged / scored, 4) if scored else 0.0,
+            "labeled": tp + fp + fn + tn,
+            "confusion": confusion,
+            "precision": round(tp / (tp + fp), 4) if tp + fp else None,
+            "recall": round(tp / (tp + fn), 4) if tp + fn else None,
+            "false_positive_rate": round(fp / (fp + tn), 4) if fp + tn else None,
+            "seconds": round(elapsed, 3),
+            "throughput_per_second": round(scored / elapsed, 1) if elapsed else 0.0,
+            "latency": _latency_summary(latencies),
+            "rules": rule_metrics,
+            "config": {
+                "scorer": self.service.scorer,
+                "model_version": self.service.model.version if self.service.model is not None else None,
+                "risk_threshold": self.service.risk_threshold,
+                "amount_rule": self.service.amount_rule,
+                "time_rule": self.service.time_rule,
+                "geo_velocity_enabled": self.service.geo_velocity_enabled
+            }
+        }
+
+    def _replay(self, db: Session, start: Optional[datetime], end: Optional[datetime], limit: Optional[int]):
+        """Yield transactions in (timestamp, id) order, one keyset page at a time"""
+        filters = []
+        if start is not None:
+            filters.append(Transaction.timestamp >= start)
+        if end is not None:
+            filters.append(Transaction.timestamp < end)
+
+        remaining = limit
+        last = None
+        while remaining is None or remaining > 0:
+            query = db.query(Transaction).filter(*filters)
+            if last is not None:
+                query = query.filter(or_(
+                    Transaction.timestamp > last[0],
+                    and_(Transaction.timestamp == last[0], Transaction.id > last[1])
+                ))
+            size = self.page_size if remaining is None else min(self.page_size, remaining)
+            page = query.order_by(Transaction.timestamp, Transaction.id).limit(size).all()
+            if not page:
+                return
+            yield from page
+            last = (page[-1].timestamp, page[-1].id)
+            if remaining is not None:
+                remaining -= len(page)
+            # Scored pages are not needed again; keep the identity map small
+            db.expunge_all()
@@ -1,89 +1,566 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from itertools import groupby
 from datetime import datetime, timedelta
 from decimal import Decimal
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 import random
 import uuid
 
 from ..models.transaction import Transaction
-from ..models.fraud_alert import FraudAlert, FraudAlertStatus
-from ..crud import crud_transaction, crud_fraud_alert
+from ..models.fraud_alert import FraudAlert, FraudAlertFactor, FraudAlertStatus
+from ..crud import crud_transaction, crud_fraud_alert, crud_account_stats, crud_fraud_rollup, crud_hour_profile, crud_account_features
+from .velocity_tracker import velocity_tracker, minute_floor
+from .keyword_matcher import RiskKeywords
+from .quantile_sketch import QuantileSketch
+from .hour_profile import is_unusual_hour
+from .geo_velocity import Gazetteer, Position, MAX_DISTANCE_KM, distance_km, last_position_tracker
+from .fraud_model import FraudModel, FeatureRow, DEFAULT_MODEL_PATH
+from .fraud_rules import RuleRegistry, fraud_rule_tracer
+from ..config import (
+    FRAUD_KEYWORDS_PATH,
+    FRAUD_AMOUNT_RULE,
+    FRAUD_AMOUNT_QUANTILE,
+    FRAUD_AMOUNT_MIN_HISTORY,
+    FRAUD_TIME_RULE,
+    FRAUD_HOUR_PROFILE_MIN_HISTORY,
+    FRAUD_HOUR_PROFILE_MIN_SHARE,
+    FRAUD_GEO_VELOCITY_ENABLED,
+    FRAUD_GAZETTEER_PATH,
+    GEO_VELOCITY_MAX_KMH,
+    GEO_VELOCITY_MIN_KM,
+    FRAUD_SCORER,
+    FRAUD_MODEL_PATH
+)
+
+AMOUNT_WINDOW_DAYS = 30
+HIGH_AMOUNT_MULTIPLIER = 5  # Flag amounts above 5x the window average
+
+NORMAL_HOURS_START = 6  # Transactions before 06:00 or after 22:59 UTC are off-hours
+NORMAL_HOURS_END = 22
+
+
+# Factor 4 window: the current minute and the 59 before it. Minute alignment lets
+# the in-process velocity tracker and the SQL fallback count exactly the same rows.
+FREQUENCY_WINDOW_MINUTES = 60
+HIGH_FREQUENCY_THRESHOLD = 5
+
+# Risk factor weights and reasons, in evaluation order. Shared with the
+# vectorized scorer, which must reproduce the scalar scores exactly.
+# "travel" only fires when the geo-velocity rule is enabled.
+FACTOR_WEIGHTS = {
+    "amount": 0.3,
+    "time": 0.2,
+    "location": 0.4,
+    "frequency": 0.25,
+    "merchant": 0.3,
+    "travel": 0.4
+}
+FACTOR_REASONS = {
+    "amount": "Unusually high transaction amount",
+    "time": "Transaction outside normal hours",
+    "location": "Foreign location transaction",
+    "frequency": "High transaction frequency",
+    "merchant": "High-risk merchant category",
+    "travel": "Impossible travel between locations"
+}
+# Stable codes stored in fraud_alert_factors; reasons may be reworded, codes may not
+FACTOR_CODES = {
+    "amount": "HIGH_AMOUNT",
+    "time": "OFF_HOURS",
+    "location": "FOREIGN_LOCATION",
+    "frequency": "HIGH_FREQUENCY",
+    "merchant": "HIGH_RISK_MERCHANT",
+    "travel": "IMPOSSIBLE_TRAVEL"
+}
+REASON_CODES = {FACTOR_REASONS[factor]: code for factor, code in FACTOR_CODES.items()}
+REASON_FACTORS = {reason: factor for factor, reason in FACTOR_REASONS.items()}
+REASON_MAX_LENGTH = 255  # FraudAlert.reason column size
+
+
+class AccountHistory(NamedTuple):
+    """What the rules know about an account when scoring one of its transactions"""
+    txn_count: int = 0  # Amount window
+    sum_cents: int = 0
+    recent_transactions: int = 0  # Frequency window
+    amount_sketch: Optional[QuantileSketch] = None  # Quantile amount rule only
+    hour_counts: Optional[Tuple[int, ...]] = None  # Hour profile time rule only
+
+
+def format_reason(risk_factors: List[str]) -> str:
+    """Join factor reasons for ``FraudAlert.reason``.
+
+    Reasons that would overflow the column are dropped whole rather than cut
+    mid-word; the complete list is always in ``fraud_alert_factors``.
+    """
+    reason = ""
+    for factor in risk_factors:
+        candidate = f"{reason}; {factor}" if reason else factor
+        if len(candidate) > REASON_MAX_LENGTH:
+            break
+        reason = candidate
+    return reason
 
 class FraudDetectionService:
-    def __init__(self):
+    def __init__(self, keywords_path: Optional[str] = None, gazetteer_path: Optional[str] = None,
+                 model_path: Optional[str] = None, scorer: Optional[str] = None):
         self.risk_threshold = 0.7  # Risk score threshold for flagging
+        self.batch_query_chunk_size = 500  # Max account ids per IN (...) history query
+        # Merchant and location keywords, compiled once from the versioned keyword file
+        self.risk_keywords = RiskKeywords.load(keywords_path or FRAUD_KEYWORDS_PATH)
+        # Amount factor: "mean" (5x the window average) or "quantile" (above the window's sketch quantile)
+        if FRAUD_AMOUNT_RULE not in ("mean", "quantile"):
+            raise ValueError(f"Unknown FRAUD_AMOUNT_RULE {FRAUD_AMOUNT_RULE!r}")
+        self.amount_rule = FRAUD_AMOUNT_RULE
+        self.amount_quantile = FRAUD_AMOUNT_QUANTILE
+        self.amount_min_history = FRAUD_AMOUNT_MIN_HISTORY
+        # Time factor: "fixed" (outside 06:00-22:59 UTC) or "profile" (unusual hour for the account)
+        if FRAUD_TIME_RULE not in ("fixed", "profile"):
+            raise ValueError(f"Unknown FRAUD_TIME_RULE {FRAUD_TIME_RULE!r}")
+        self.time_rule = FRAUD_TIME_RULE
+        self.hour_profile_min_history = FRAUD_HOUR_PROFILE_MIN_HISTORY
+        self.hour_profile_min_share = FRAUD_HOUR_PROFILE_MIN_SHARE
+        # Impossible travel: place index for free-text locations plus speed limits
+        self.geo_velocity_enabled = FRAUD_GEO_VELOCITY_ENABLED
+        self.gazetteer = Gazetteer.load(gazetteer_path or FRAUD_GAZETTEER_PATH)
+        self.max_travel_kmh = GEO_VELOCITY_MAX_KMH
+        self.min_travel_km = GEO_VELOCITY_MIN_KM
+        # Risk score: "classic" (sum of factor weights) or "model" (offline-trained logistic regression);
+        # ``scorer`` overrides FRAUD_SCORER, e.g. for training, which must not need a model file
+        scorer = scorer or FRAUD_SCORER
+        if scorer not in ("classic", "model"):
+            raise ValueError(f"Unknown FRAUD_SCORER {scorer!r}")
+        self.scorer = scorer
+        self.model = None
+        if self.scorer == "model":
+            self.model = FraudModel.load(model_path or FRAUD_MODEL_PATH or DEFAULT_MODEL_PATH)
+            self.risk_threshold = self.model.threshold
+        # Risk factors in evaluation order, instrumented per rule
+        self.rules = self.build_rule_registry(tracer=fraud_rule_tracer)
         
-    def analyze_transaction(self, transaction: Transaction, db: Session) -> Dict[str, Any]:
-        """Analyze a transaction for fraud risk"""
-        risk_score = 0.0
-        risk_factors = []
-        
-        # Get user's transaction history
-        user_transactions = db.query(Transaction).filter(
-            Transaction.account_id == transaction.account_id,
-            Transaction.timestamp >= datetime.utcnow() - timedelta(days=30)
-        ).all()
-        
-        # Factor 1: Amount Analysis
-        if user_transactions:
-            avg_amount = sum(float(t.amount) for t in user_transactions) / len(user_transactions)
-            if float(transaction.amount) > avg_amount * 5:  # 5x normal spending
-                risk_score += 0.3
-                risk_factors.append("Unusually high transaction amount")
+    def build_rule_registry(self, metrics: Optional[Dict[str, Any]] = None, tracer=None) -> RuleRegistry:
+        """Register the risk factors; ``metrics`` defaults to the process-wide rule metrics"""
+        registry = RuleRegistry(metrics=metrics, tracer=tracer)
+        checks = {
+            "amount": self._is_high_amount,
+            "time": self._is_unusual_time,
+            "location": self._match_location,
+            "frequency": self._is_high_frequency,
+            "merchant": self._match_merchant,
+            "travel": self._is_impossible_travel
+        }
+        for factor, check in checks.items():
+            registry.register(factor, check, FACTOR_WEIGHTS[factor], FACTOR_REASONS[factor])
+        return registry
+    
+    def analyze_transaction(self, transaction: Transaction, db: Session,
+                            as_of: Optional[datetime] = None, persist: bool = True) -> Dict[str, Any]:
+        """Analyze a transaction for fraud risk.
         
-        # Factor 2: Time-based Analysis
-        hour = transaction.timestamp.hour
-        if hour < 6 or hour > 22:  # Late night/early morning transactions
-            risk_score += 0.2
-            risk_factors.append("Transaction outside normal hours")
-        
-        # Factor 3: Location Analysis (simulated)
-        if transaction.location and "foreign" in transaction.location.lower():
-            risk_score += 0.4
-            risk_factors.append("Foreign location transaction")
-        
-        # Factor 4: Frequency Analysis
-        recent_transactions = db.query(Transaction).filter(
-            Transaction.account_id == transaction.account_id,
-            Transaction.timestamp >= datetime.utcnow() - timedelta(hours=1)
-        ).count()
-        
-        if recent_transactions > 5:  # More than 5 transactions in 1 hour
-            risk_score += 0.25
-            risk_factors.append("High transaction frequency")
-        
-        # Factor 5: Merchant Analysis (simulated)
-        high_risk_merchants = ["casino", "gambling", "bitcoin", "crypto"]
-        if transaction.merchant and any(risk in transaction.merchant.lower() for risk in high_risk_merchants):
-            risk_score += 0.3
-            risk_factors.append("High-risk merchant category")
+        ``as_of`` scores the transaction against the history visible at that
+        moment (used for backfills); by default history up to now is used.
+        With ``persist=False`` no alert is written (used by backtests).
+        """
+        features = self._get_features(db, [transaction.account_id], as_of)
+        history = self._get_history(db, [transaction.account_id], as_of, features)
+        positions = self._get_previous_positions(db, [transaction], as_of, features)
         
-        # Cap risk score at 1.0
-        risk_score = min(risk_score, 1.0)
+        risk_score, risk_factors, matched_keywords = self._score_batch([transaction], history, positions)[0]
         
         # Create fraud alert if risk score exceeds threshold
         if risk_score >= self.risk_threshold:
-            fraud_alert = FraudAlert(
-                transaction_id=transaction.id,
-                risk_score=risk_score,
-                reason="; ".join(risk_factors),
-                status=FraudAlertStatus.OPEN
-            )
+            if not persist:
+                return self._build_result(risk_score, risk_factors, matched_keywords, flagged=True)
+            fraud_alert = self._build_alert(transaction, risk_score, risk_factors)
             db.add(fraud_alert)
+            crud_fraud_rollup.record_alerts(db, [fraud_alert])
+            db.commit()
+            return self._build_result(risk_score, risk_factors, matched_keywords, fraud_alert)
+        
+        return self._build_result(risk_score, risk_factors, matched_keywords)
+    
+    def analyze_transactions(self, batch: List[Transaction], db: Session,
+                             as_of: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Analyze a batch of transactions for fraud risk.
+        
+        History for every account in the batch is fetched with grouped
+        queries, all transactions are scored in memory and every resulting
+        alert is inserted in a single commit. Results are returned in the
+        same order as ``batch``.
+        """
+        if not batch:
+            return []
+        
+        account_ids = {t.account_id for t in batch}
+        features = self._get_features(db, account_ids, as_of)
+        history = self._get_history(db, account_ids, as_of, features)
+        positions = self._get_previous_positions(db, batch, as_of, features)
+        
+        results = []
+        fraud_alerts = []
+        for transaction, (risk_score, risk_factors, matched_keywords) in zip(
+            batch, self._score_batch(batch, history, positions)
+        ):
+            if risk_score >= self.risk_threshold:
+                fraud_alert = self._build_alert(transaction, risk_score, risk_factors)
+                fraud_alerts.append(fraud_alert)
+                results.append(self._build_result(risk_score, risk_factors, matched_keywords, fraud_alert))
+            else:
+                results.append(self._build_result(risk_score, risk_factors, matched_keywords))
+        
+        if fraud_alerts:
+            db.add_all(fraud_alerts)
+            crud_fraud_rollup.record_alerts(db, fraud_alerts)
             db.commit()
-            
-            return {
+        
+        return results
+    
+    def _get_features(self, db: Session, account_ids, as_of: Optional[datetime]) -> Dict[Any, Any]:
+        """Feature-store rows for live scoring; point-in-time scoring reads raw history instead"""
+        if as_of is not None:
+            return {}
+        return crud_account_features.get_features_many(db, account_ids)
+    
+    def _get_history(self, db: Session, account_ids, as_of: Optional[datetime],
+                     features: Optional[Dict[Any, Any]] = None) -> Dict[Any, AccountHistory]:
+        """Return ``{account_id: AccountHistory}``, fetching only what the configured rules use.
+        
+        Live scoring takes the frequency count and the hour profile from the
+        feature-store rows. The amount rules read ``account_daily_stats``
+        instead: they need the exact trailing 30-day window (and, for the
+        quantile rule, its merged daily sketches), while a feature row only
+        holds lifetime totals. Both are grouped queries per chunk of accounts.
+        """
+        account_ids = list(account_ids)
+        now = as_of or datetime.utcnow()
+        window_start = now - timedelta(days=AMOUNT_WINDOW_DAYS)
+        window = crud_account_stats.get_window_stats(db, account_ids, window_start, end=as_of)
+        recent = self._get_recent_counts(db, account_ids, now, live=as_of is None, features=features)
+        
+        sketches = {}
+        if self.amount_rule == "quantile":
+            sketches = crud_account_stats.get_window_sketches(db, account_ids, window_start, end=as_of)
+        
+        hour_profiles = {}
+        if self.time_rule == "profile":
+            hour_profiles = self._get_hour_profiles(db, account_ids, now, live=as_of is None, features=features)
+        
+        return {
+            account_id: AccountHistory(
+                *window.get(account_id, (0, 0)),
+                recent_transactions=recent.get(account_id, 0),
+                amount_sketch=sketches.get(account_id),
+                hour_counts=hour_profiles.get(account_id)
+            )
+            for account_id in account_ids
+        }
+    
+    def _get_hour_profiles(self, db: Session, account_ids, now: datetime, live: bool = True,
+                           features: Optional[Dict[Any, Any]] = None) -> Dict[Any, Tuple[int, ...]]:
+        """Return ``{account_id: hour_counts}``; live scoring reads them from the feature store"""
+        features = features or {}
+        profiles = {}
+        missing = []
+        for account_id in account_ids:
+            if live and account_id in features:
+                profiles[account_id] = features[account_id].hour_counts
+            else:
+                missing.append(account_id)
+        if missing:
+            profiles.update(crud_hour_profile.get_profiles_as_of(db, missing, now))
+        return profiles
+    
+    def _get_previous_positions(self, db: Session, transactions: List[Transaction], as_of: Optional[datetime],
+                                features: Optional[Dict[Any, Any]] = None) -> Dict[Any, Position]:
+        """Return ``{transaction_id: Position}`` of each transaction's previous resolvable location.
+        
+        Live scoring asks the in-process tracker first, then the account's
+        feature-store row; the rest (and every ``as_of`` lookup) are read
+        from SQL for the whole batch at once.
+        """
+        if not self.geo_velocity_enabled:
+            return {}
+        features = features or {}
+        positions = {}
+        missing = []
+        for transaction in transactions:
+            if self.gazetteer.resolve(transaction.location) is None:
+                continue
+            position = None
+            if as_of is None:
+                position = last_position_tracker.previous(transaction.account_id, transaction.id, transaction.timestamp)
+                if position is None and transaction.account_id in features:
+                    position = self._feature_position(transaction, features[transaction.account_id])
+            if position is None:
+                missing.append(transaction)
+            else:
+                positions[transaction.id] = position
+        positions.update(self._load_previous_positions(db, missing, record=as_of is None))
+        return positions
+    
+    def _travel_horizon(self) -> Optional[timedelta]:
+        """Age beyond which a previous position can never imply impossible travel"""
+        if self.max_travel_kmh <= 0:
+            return None
+        return timedelta(hours=MAX_DISTANCE_KM / self.max_travel_kmh)
+    
+    def _load_previous_positions(self, db: Session, transactions: List[Transaction],
+                                 record: bool = False) -> Dict[Any, Position]:
+        """Previous resolvable positions from SQL, one query per chunk of accounts.
+        
+        Each query reads the accounts' located transactions from the earliest
+        scored timestamp minus the travel horizon up to the latest one, in
+        time order, and sweeps every account once. Older positions are left
+        out: they cannot make the travel factor fire.
+        """
+        by_account: Dict[Any, List[Transaction]] = {}
+        for transaction in transactions:
+            by_account.setdefault(transaction.account_id, []).append(transaction)
+        horizon = self._travel_horizon()
+        positions = {}
+        account_ids = list(by_account)
+        for i in range(0, len(account_ids), self.batch_query_chunk_size):
+            chunk = account_ids[i:i + self.batch_query_chunk_size]
+            timestamps = [transaction.timestamp for account_id in chunk for transaction in by_account[account_id]]
+            filters = [
+                Transaction.account_id.in_(chunk),
+                Transaction.location.isnot(None),
+                Transaction.timestamp <= max(timestamps)
+            ]
+            if horizon is not None:
+                filters.append(Transaction.timestamp >= min(timestamps) - horizon)
+            rows = db.query(
+                Transaction.account_id, Transaction.id, Transaction.timestamp, Transaction.location
+            ).filter(*filters).order_by(Transaction.account_id, Transaction.timestamp, Transaction.id)
+            for account_id, account_rows in groupby(rows, key=lambda row: row[0]):
+                positions.update(self._sweep_positions(by_account[account_id], account_rows, record))
+        return positions
+    
+    def _sweep_positions(self, transactions: List[Transaction], rows, record: bool) -> Dict[Any, Position]:
+        """Match one account's scored transactions with its located rows (both in time order)"""
+        pending = sorted(transactions, key=lambda transaction: transaction.timestamp)
+        positions = {}
+        # The two latest resolvable positions so far: a transaction skips its own row
+        latest: List[Position] = []
+        
+        def settle(transaction):
+            for position in reversed(latest):
+                if position.transaction_id != transaction.id:
+                    positions[transaction.id] = position
+                    if record:
+                        last_position_tracker.record(transaction.account_id, position)
+                    return
+        
+        k = 0
+        for account_id, txn_id, timestamp, location in rows:
+            while k < len(pending) and pending[k].timestamp < timestamp:
+                settle(pending[k])
+                k += 1
+            place = self.gazetteer.resolve(location)
+            if place is not None:
+                latest = latest[-1:] + [Position(timestamp, txn_id, place)]
+        for transaction in pending[k:]:
+            settle(transaction)
+        return positions
+    
+    def _feature_position(self, transaction: Transaction, features) -> Optional[Position]:
+        """Previous position from the two latest locations kept in the feature store"""
+        slots = [
+            (features.last_location_transaction_id, features.last_location_at, features.last_location),
+            (features.previous_location_transaction_id, features.previous_location_at, features.previous_location)
+        ]
+        for txn_id, timestamp, location in slots:
+            if txn_id is None or txn_id == transaction.id or timestamp > transaction.timestamp:
+                continue
+            place = self.gazetteer.resolve(location)
+            # An unresolvable location may hide an older resolvable one; let SQL decide
+            return Position(timestamp, txn_id, place) if place is not None else None
+        return None
+    
+    def _frequency_window_start(self, now: datetime) -> datetime:
+        return minute_floor(now) - timedelta(minutes=FREQUENCY_WINDOW_MINUTES - 1)
+    
+    def _get_recent_counts(self, db: Session, account_ids, now: datetime, live: bool = True,
+                           features: Optional[Dict[Any, Any]] = None) -> Dict[Any, int]:
+        """Return ``{account_id: count}`` of transactions in the frequency window.
+        
+        For live scoring, accounts the velocity tracker or the feature store
+        can answer for are served without a scan; the rest are counted with
+        one grouped query per chunk.
+        """
+        features = features or {}
+        window_start = self._frequency_window_start(now)
+        counts = {}
+        missing = []
+        for account_id in account_ids:
+            count = velocity_tracker.count_recent(account_id, FREQUENCY_WINDOW_MINUTES, now) if live else None
+            if count is None and live and account_id in features:
+                count = features[account_id].recent_count(window_start)
+            if count is None:
+                missing.append(account_id)
+            else:
+                counts[account_id] = count
+        
+        filters = [Transaction.timestamp >= window_start]
+        if not live:
+            filters.append(Transaction.timestamp <= now)
+        for i in range(0, len(missing), self.batch_query_chunk_size):
+            rows = db.query(
+                Transaction.account_id,
+                func.count(Transaction.id)
+            ).filter(
+                Transaction.account_id.in_(missing[i:i + self.batch_query_chunk_size]),
+                *filters
+            ).group_by(Transaction.account_id).all()
+            counts.update(rows)
+        return counts
+    
+    def _score_batch(self, transactions: List[Transaction], history: Dict[Any, AccountHistory],
+                     positions: Dict[Any, Position]) -> List[Tuple[float, List[str], List[str]]]:
+        """Score transactions with the configured scorer.
+        
+        The rules always run, since their reasons explain the alert. With the
+        model scorer the score is the model's fraud probability instead of the
+        factor weight sum, computed for the whole batch in one dot product.
+        """
+        scored = [
+            self._score_transaction(transaction, history[transaction.account_id], positions.get(transaction.id))
+            for transaction in transactions
+        ]
+        if self.model is None:
+            return scored
+        
+        probabilities = self.model.predict_rows([
+            self.feature_row(transaction, history[transaction.account_id], risk_factors)
+            for transaction, (_, risk_factors, _) in zip(transactions, scored)
+        ])
+        return [
+            (float(probability), risk_factors, matched_keywords)
+            for probability, (_, risk_factors, matched_keywords) in zip(probabilities, scored)
+        ]
+    
+    def feature_row(self, transaction: Transaction, history: AccountHistory, risk_factors: List[str]) -> FeatureRow:
+        """Model inputs for a transaction, given the reasons its rules produced"""
+        return FeatureRow(
+            amount_cents=crud_account_stats.to_cents(transaction.amount),
+            window_count=history.txn_count,
+            window_cents=history.sum_cents,
+            recent_count=history.recent_transactions,
+            hour=transaction.timestamp.hour,
+            category=transaction.category,
+            factors=frozenset(REASON_FACTORS[reason] for reason in risk_factors)
+        )
+    
+    def _score_transaction(self, transaction: Transaction, history: AccountHistory,
+                           previous_position: Optional[Position] = None) -> Tuple[float, List[str], List[str]]:
+        """Apply the risk factors to a transaction given its account history.
+        
+        Returns the capped score, the factor reasons and the matched risk keywords.
+        """
+        risk_score = 0.0
+        risk_factors = []
+        matched_keywords = []
+        
+        # Rules run in registration order, so the float sum matches the vectorized scorer
+        for rule, result in self.rules.evaluate(transaction, history, previous_position):
+            risk_score += rule.weight
+            risk_factors.append(rule.reason)
+            if isinstance(result, list):
+                matched_keywords.extend(result)
+        
+        # Cap risk score at 1.0
+        return min(risk_score, 1.0), risk_factors, matched_keywords
+    
+    # Rule checks: (transaction, history, previous_position) -> truthy when the factor fires
+    
+    def _is_high_amount(self, transaction: Transaction, history: AccountHistory,
+                        previous_position: Optional[Position] = None) -> bool:
+        cents = crud_account_stats.to_cents(transaction.amount)
+        if self.amount_rule == "quantile":
+            # Above the window's p99 (by default) of absolute amounts; one large
+            # deposit moves a high quantile far less than it moves the mean
+            sketch = history.amount_sketch
+            if sketch is None or sketch.count < self.amount_min_history:
+                return False
+            return abs(cents) > sketch.quantile(self.amount_quantile)
+        # amount > 5 * (sum / count), compared in integer cents to stay exact
+        return bool(history.txn_count) and cents * history.txn_count > history.sum_cents * HIGH_AMOUNT_MULTIPLIER
+    
+    def _is_unusual_time(self, transaction: Transaction, history: AccountHistory,
+                         previous_position: Optional[Position] = None) -> bool:
+        hour = transaction.timestamp.hour
+        counts = history.hour_counts
+        if self.time_rule == "profile" and counts is not None:
+            # Both the live and the as_of profile already count the transaction
+            # being scored; judge it against the account's other transactions
+            counts = list(counts)
+            counts[hour] = max(counts[hour] - 1, 0)
+            if sum(counts) >= self.hour_profile_min_history:
+                return is_unusual_hour(counts, hour, self.hour_profile_min_share)
+        # Late night/early morning transactions; also the fallback for thin profiles
+        return hour < NORMAL_HOURS_START or hour > NORMAL_HOURS_END
+    
+    def _match_location(self, transaction: Transaction, history: AccountHistory,
+                        previous_position: Optional[Position] = None) -> List[str]:
+        return self.risk_keywords.match_location(transaction.location)
+    
+    def _is_high_frequency(self, transaction: Transaction, history: AccountHistory,
+                           previous_position: Optional[Position] = None) -> bool:
+        return history.recent_transactions > HIGH_FREQUENCY_THRESHOLD  # More than 5 transactions in 1 hour
+    
+    def _match_merchant(self, transaction: Transaction, history: AccountHistory,
+                        previous_position: Optional[Position] = None) -> List[str]:
+        return self.risk_keywords.match_merchant(transaction.merchant)
+    
+    def _is_impossible_travel(self, transaction: Transaction, history: AccountHistory,
+                              previous: Optional[Position] = None) -> bool:
+        # Impossible travel since the previous located transaction
+        if previous is None:
+            return False
+        place = self.gazetteer.resolve(transaction.location)
+        if place is None:
+            return False
+        distance = distance_km(previous.place, place)
+        if distance <= self.min_travel_km:
+            return False
+        hours = abs((transaction.timestamp - previous.timestamp).total_seconds()) / 3600
+        return hours == 0 or distance / hours > self.max_travel_kmh
+    
+    def _build_alert(self, transaction: Transaction, risk_score: float, risk_factors: List[str]) -> FraudAlert:
+        # The id is assigned up front so results can be built without a refresh after commit
+        created_at = datetime.utcnow()
+        return FraudAlert(
+            id=uuid.uuid4(),
+            transaction_id=transaction.id,
+            risk_score=risk_score,
+            reason=format_reason(risk_factors),
+            status=FraudAlertStatus.OPEN,
+            created_at=created_at,
+            factors=[
+                FraudAlertFactor(factor_code=REASON_CODES[reason], created_at=created_at)
+                for reason in risk_factors
+            ]
+        )
+    
+    def _build_result(self, risk_score: float, risk_factors: List[str], matched_keywords: List[str],
+                      fraud_alert: Optional[FraudAlert] = None, flagged: bool = False) -> Dict[str, Any]:
+        if fraud_alert is not None or flagged:
+            result = {
                 "is_fraud_risk": True,
                 "risk_score": risk_score,
                 "risk_factors": risk_factors,
-                "alert_id": str(fraud_alert.id),
+                "matched_keywords": matched_keywords,
                 "recommendation": "Transaction flagged for manual review"
             }
+            if fraud_alert is not None:
+                result["alert_id"] = str(fraud_alert.id)
+            return result
         
         return {
             "is_fraud_risk": False,
             "risk_score": risk_score,
             "risk_factors": risk_factors,
+            "matched_keywords": matched_keywords,
             "recommendation": "Transaction appears normal"
         }
     
@@ -149,17 +626,18 @@ class FraudDetectionService:
         return sample_alerts
     
     def get_fraud_insights(self, db: Session, days: int = 30) -> Dict[str, Any]:
-        """Get fraud detection insights and statistics"""
-        # Get alerts from the last N days
-        start_date = datetime.utcnow() - timedelta(days=days)
-        alerts = db.query(FraudAlert).filter(
-            FraudAlert.created_at >= start_date
-        ).all()
-        
-        total_alerts = len(alerts)
-        open_alerts = len([a for a in alerts if a.status == FraudAlertStatus.OPEN])
-        confirmed_fraud = len([a for a in alerts if a.status == FraudAlertStatus.CONFIRMED_FRAUD])
-        dismissed = len([a for a in alerts if a.status == FraudAlertStatus.DISMISSED])
+        """Get fraud detection insights and statistics.
+        
+        Reads only the daily alert rollup, so the cost does not grow with the
+        number of alerts. Windows are whole days.
+        """
+        today = datetime.utcnow().date()
+        counts = crud_fraud_rollup.get_counts(db, today - timedelta(days=days))
+        
+        total_alerts = counts["total"].get("", 0)
+        open_alerts = counts["status"].get(FraudAlertStatus.OPEN.value, 0)
+        confirmed_fraud = counts["status"].get(FraudAlertStatus.CONFIRMED_FRAUD.value, 0)
+        dismissed = counts["status"].get(FraudAlertStatus.DISMISSED.value, 0)
         
         if total_alerts > 0:
             accuracy_rate = (confirmed_fraud / total_alerts) * 100
@@ -168,10 +646,14 @@ class FraudDetectionService:
             accuracy_rate = 0
             false_positive_rate = 0
         
-        # Risk score distribution
-        high_risk = len([a for a in alerts if a.risk_score >= 0.8])
-        medium_risk = len([a for a in alerts if 0.5 <= a.risk_score < 0.8])
-        low_risk = len([a for a in alerts if a.risk_score < 0.5])
+        # Week-over-week alert volume
+        this_week = crud_fraud_rollup.get_counts(db, today - timedelta(days=6))["total"].get("", 0)
+        last_week = crud_fraud_rollup.get_counts(
+            db, today - timedelta(days=13), today - timedelta(days=7)
+        )["total"].get("", 0)
+        change_percent = ((this_week - last_week) / last_week) * 100 if last_week else 0
+        
+        top_risk_factors = sorted(counts["factor"].items(), key=lambda item: item[1], reverse=True)[:5]
         
         return {
             "total_alerts": total_alerts,
@@ -181,9 +663,17 @@ class FraudDetectionService:
             "accuracy_rate": round(accuracy_rate, 2),
             "false_positive_rate": round(false_positive_rate, 2),
             "risk_distribution": {
-                "high_risk": high_risk,
-                "medium_risk": medium_risk,
-                "low_risk": low_risk
+                "high_risk": counts["risk_band"].get("high_risk", 0),
+                "medium_risk": counts["risk_band"].get("medium_risk", 0),
+                "low_risk": counts["risk_band"].get("low_risk", 0)
             },
-            "detection_rate": round((total_alerts / max(1, total_alerts + 100)) * 100, 2)  # Simulated
-        }
\ No newline at end of file
+            "detection_rate": round((total_alerts / max(1, total_alerts + 100)) * 100, 2),  # Simulated
+            "trends": {
+                "this_week": this_week,
+                "last_week": last_week,
+                "change_percent": round(change_percent, 1)
+            },
+            "top_risk_factors": [
+                {"factor": factor, "count": count} for factor, count in top_risk_factors
+            ]
+        }
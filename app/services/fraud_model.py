@@ -0,0 +1,245 @@
+from typing import Dict, Any, FrozenSet, List, NamedTuple, Optional, Sequence
+import json
+import math
+import os
+import struct
+
+from sqlalchemy.orm import Session
+import numpy as np
+
+from ..models.fraud_alert import FraudAlert, FraudAlertStatus, FraudAlertType
+from ..models.transaction import Transaction
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "fraud_model.bin")
+
+# Binary model file: MAGIC, then little-endian uint32 format version and
+# header length, the JSON header (feature encoding tables and training
+# metadata) padded to 8 bytes, then one float64 weight per feature.
+MAGIC = b"BFSIFRLR"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<8sII")
+
+MAX_RATIO = 1000.0  # Amount-to-average ratios above this are clipped
+
+
+class FeatureRow(NamedTuple):
+    """Raw inputs for one transaction, as seen by the rules at scoring time"""
+    amount_cents: int
+    window_count: int  # Transactions in the amount window
+    window_cents: int  # Their summed amount
+    recent_count: int  # Transactions in the frequency window
+    hour: int
+    category: Optional[str]
+    factors: FrozenSet[str]  # Rule factors that fired
+
+
+class FeatureEncoder:
+    """Turns ``FeatureRow`` objects into a dense float64 matrix.
+
+    Columns are a constant bias, one indicator per rule factor, a few numeric
+    transforms of amount, history and time, and a one-hot over the category
+    vocabulary seen in training (unseen categories share an "other" column).
+    """
+
+    NUMERIC = ["log_amount", "log_amount_ratio", "log_window_count", "log_recent_count",
+               "is_debit", "hour_sin", "hour_cos"]
+
+    def __init__(self, factor_names: Sequence[str], categories: Sequence[str]):
+        self.factor_names = list(factor_names)
+        self.categories = list(categories)
+        self._factor_index = {name: i for i, name in enumerate(self.factor_names)}
+        self._category_index = {name: i for i, name in enumerate(self.categories)}
+        self.feature_names = (
+            ["bias"]
+            + [f"factor:{name}" for name in self.factor_names]
+            + self.NUMERIC
+            + [f"category:{name}" for name in self.categories]
+            + ["category:other"]
+        )
+
+    @staticmethod
+    def normalize_category(category: Optional[str]) -> str:
+        return (category or "").strip().lower()
+
+    def encode(self, rows: Sequence[FeatureRow]) -> np.ndarray:
+        n = len(rows)
+        X = np.zeros((n, len(self.feature_names)), dtype=np.float64)
+        X[:, 0] = 1.0
+        factor_base = 1
+        numeric_base = factor_base + len(self.factor_names)
+        category_base = numeric_base + len(self.NUMERIC)
+        other = category_base + len(self.categories)
+
+        for i, row in enumerate(rows):
+            for factor in row.factors:
+                j = self._factor_index.get(factor)
+                if j is not None:
+                    X[i, factor_base + j] = 1.0
+            amount = abs(row.amount_cents)
+            ratio = 0.0
+            if row.window_count and row.window_cents > 0:
+                ratio = min(MAX_RATIO, amount * row.window_count / row.window_cents)
+            angle = 2 * math.pi * row.hour / 24
+            X[i, numeric_base:category_base] = (
+                math.log1p(amount / 100),
+                math.log1p(ratio),
+                math.log1p(row.window_count),
+                math.log1p(row.recent_count),
+                1.0 if row.amount_cents < 0 else 0.0,
+                math.sin(angle),
+                math.cos(angle)
+            )
+            j = self._category_index.get(self.normalize_category(row.category))
+            X[i, other if j is None else category_base + j] = 1.0
+        return X
+
+
+class FraudModel:
+    """Logistic-regression fraud model read from a memory-mapped weight file.
+
+    The weights are mapped read-only with ``np.memmap``, so every API worker
+    on a host shares the same page-cache copy. Input standardization is
+    folded into the weights when the file is written, so scoring a batch is
+    one dot product followed by the logistic function.
+    """
+
+    def __init__(self, header: Dict[str, Any], weights: np.ndarray, path: Optional[str] = None):
+        self.header = header
+        self.weights = weights
+        self.path = path
+        self.version = header.get("model_version")
+        self.threshold = float(header.get("threshold", 0.5))
+        self.encoder = FeatureEncoder(header["factor_names"], header["categories"])
+        if self.encoder.feature_names != header["feature_names"] or len(weights) != len(header["feature_names"]):
+            raise ValueError(f"Fraud model {path} does not match this feature encoder")
+
+    @classmethod
+    def load(cls, path: str) -> "FraudModel":
+        with open(path, "rb") as f:
+            prefix = f.read(_PREFIX.size)
+            if len(prefix) < _PREFIX.size:
+                raise ValueError(f"{path} is not a fraud model file")
+            magic, format_version, header_length = _PREFIX.unpack(prefix)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a fraud model file")
+            if format_version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported fraud model format version {format_version}")
+            header = json.loads(f.read(header_length).decode("utf-8"))
+        offset = _aligned(_PREFIX.size + header_length)
+        weights = np.memmap(path, dtype="<f8", mode="r", offset=offset, shape=(len(header["feature_names"]),))
+        return cls(header, weights, path)
+
+    def predict_rows(self, rows: Sequence[FeatureRow]) -> np.ndarray:
+        return self.predict(self.encoder.encode(rows))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Fraud probability per row of an encoded feature matrix"""
+        return _sigmoid(X @ self.weights)
+
+
+def save_model(path: str, encoder: FeatureEncoder, weights: np.ndarray, metadata: Dict[str, Any]):
+    """Write a model file atomically (write, then rename over ``path``)"""
+    header = dict(metadata, factor_names=encoder.factor_names, categories=encoder.categories,
+                  feature_names=encoder.feature_names)
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    padding = _aligned(_PREFIX.size + len(header_bytes)) - _PREFIX.size - len(header_bytes)
+    with open(path + ".tmp", "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * padding)
+        f.write(np.asarray(weights, dtype="<f8").tobytes())
+    os.replace(path + ".tmp", path)
+
+
+def train_logistic_regression(X: np.ndarray, y: np.ndarray, l2: float = 1.0, iterations: int = 50,
+                              balanced: bool = True, tolerance: float = 1e-8) -> np.ndarray:
+    """Fit L2-regularized logistic regression by Newton's method.
+
+    Column 0 must be the bias and is not regularized. Columns are
+    standardized internally and the returned weights apply to raw ``X``.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n, d = X.shape
+
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    mean[0], scale[0] = 0.0, 1.0
+    scale[scale == 0] = 1.0  # Constant columns carry no signal; keep them at weight 0
+    Z = (X - mean) / scale
+
+    # Balanced sample weights so a rare class is not ignored
+    sample_weight = np.ones(n)
+    if balanced and 0 < y.sum() < n:
+        positives = y.sum()
+        sample_weight = np.where(y == 1, n / (2 * positives), n / (2 * (n - positives)))
+
+    penalty = np.full(d, l2)
+    penalty[0] = 0.0
+    w = np.zeros(d)
+    for _ in range(iterations):
+        p = _sigmoid(Z @ w)
+        gradient = Z.T @ (sample_weight * (p - y)) + penalty * w
+        curvature = sample_weight * p * (1 - p)
+        hessian = (Z * curvature[:, None]).T @ Z + np.diag(penalty) + 1e-9 * np.eye(d)
+        step = np.linalg.solve(hessian, gradient)
+        w -= step
+        if np.abs(step).max() < tolerance:
+            break
+
+    # Fold the standardization into the weights
+    raw = w / scale
+    raw[0] = w[0] - np.sum(w[1:] * mean[1:] / scale[1:])
+    return raw
+
+
+def build_training_set(db: Session, service, chunk_size: int = 1000):
+    """Point-in-time feature rows and labels for every analyst-labeled transaction alert.
+
+    CONFIRMED_FRAUD alerts are positives and DISMISSED alerts negatives. Each
+    transaction is re-evaluated by ``service`` as of its own timestamp, so the
+    features match what the rules saw when the alert was raised. Returns
+    ``(rows, labels)``.
+    """
+    labels: Dict[Any, int] = {}
+    query = db.query(FraudAlert.transaction_id, FraudAlert.status).filter(
+        FraudAlert.alert_type == FraudAlertType.TRANSACTION,
+        FraudAlert.status.in_([FraudAlertStatus.CONFIRMED_FRAUD, FraudAlertStatus.DISMISSED])
+    )
+    for transaction_id, status in query.yield_per(chunk_size):
+        # A transaction confirmed once counts as fraud, whatever its other alerts say
+        labels[transaction_id] = max(labels.get(transaction_id, 0), int(status == FraudAlertStatus.CONFIRMED_FRAUD))
+
+    rows, targets = [], []
+    transaction_ids = list(labels)
+    for i in range(0, len(transaction_ids), chunk_size):
+        transactions = db.query(Transaction).filter(Transaction.id.in_(transaction_ids[i:i + chunk_size])).all()
+        for transaction in transactions:
+            history = service._get_history(db, [transaction.account_id], transaction.timestamp)
+            positions = service._get_previous_positions(db, [transaction], transaction.timestamp)
+            _, risk_factors, _ = service._score_transaction(
+                transaction, history[transaction.account_id], positions.get(transaction.id)
+            )
+            rows.append(service.feature_row(transaction, history[transaction.account_id], risk_factors))
+            targets.append(labels[transaction.id])
+    return rows, np.array(targets, dtype=np.float64)
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * z))  # Numerically stable for large |z|
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) // 8 * 8
+
+
+def category_vocabulary(rows: Sequence[FeatureRow], min_count: int = 5, max_size: int = 50) -> List[str]:
+    """Most frequent training categories, for the one-hot encoding table"""
+    counts: Dict[str, int] = {}
+    for row in rows:
+        key = FeatureEncoder.normalize_category(row.category)
+        if key:
+            counts[key] = counts.get(key, 0) + 1
+    frequent = sorted((name for name, count in counts.items() if count >= min_count),
+                      key=lambda name: (-counts[name], name))
+    return frequent[:max_size]
@@ -0,0 +1,144 @@
+from typing import Dict, Any, List
+from datetime import datetime
+from sqlalchemy.orm import Session
+import json
+import os
+import time
+import uuid
+
+from ..database import SessionLocal, engine
+from ..models.account import Account
+from ..models.transaction import Transaction
+from ..models.fraud_alert import FraudAlert, FraudAlertFactor, FraudAlertStatus, FraudAlertType
+from ..crud import crud_fraud_rollup
+from .fraud_detection_service import FraudDetectionService, FACTOR_REASONS, FACTOR_CODES, format_reason
+from .vectorized_scoring import VectorizedFraudScorer, load_transaction_columns, FACTORS
+
+
+def shard_of(account_id: uuid.UUID, num_shards: int) -> int:
+    """Stable shard assignment, so checkpoints stay valid as accounts are added"""
+    return account_id.int % num_shards
+
+
+def plan_shards(db: Session, num_shards: int) -> List[List[uuid.UUID]]:
+    """Split every account id into ``num_shards`` lists"""
+    shards = [[] for _ in range(num_shards)]
+    for (account_id,) in db.query(Account.id).yield_per(10000):
+        shards[shard_of(account_id, num_shards)].append(account_id)
+    return shards
+
+
+def init_worker():
+    # Connections inherited from the parent process must not be reused
+    engine.dispose(close=False)
+
+
+def rescore_shard(shard: int, account_ids: List[uuid.UUID], chunk_size: int = 10000) -> Dict[str, Any]:
+    """Rescore every transaction of the given accounts and bulk-insert new alerts.
+
+    Transactions are streamed with a server-side cursor and scored as of their
+    own timestamp. Transactions that already have an alert are skipped, so a
+    shard can safely be run again.
+    """
+    started = time.perf_counter()
+    service = FraudDetectionService()
+    db = SessionLocal()
+    try:
+        columns = load_transaction_columns(db, account_ids, chunk_size=chunk_size)
+        risk_score, factors = VectorizedFraudScorer(service).score(columns)
+
+        already_alerted = set()
+        for i in range(0, len(account_ids), service.batch_query_chunk_size):
+            rows = db.query(FraudAlert.transaction_id).join(
+                Transaction, FraudAlert.transaction_id == Transaction.id
+            ).filter(
+                Transaction.account_id.in_(account_ids[i:i + service.batch_query_chunk_size]),
+                FraudAlert.alert_type == FraudAlertType.TRANSACTION
+            ).yield_per(chunk_size)
+            already_alerted.update(transaction_id for (transaction_id,) in rows)
+
+        now = datetime.utcnow()
+        alerts = []
+        alert_factors = []
+        for i in (risk_score >= service.risk_threshold).nonzero()[0]:
+            transaction_id = columns.transaction_ids[i]
+            if transaction_id in already_alerted:
+                continue
+            alert_id = uuid.uuid4()
+            fired = [factor for j, factor in enumerate(FACTORS) if factors[i, j]]
+            alerts.append({
+                "id": alert_id,
+                "transaction_id": transaction_id,
+                "alert_type": FraudAlertType.TRANSACTION,
+                "risk_score": float(risk_score[i]),
+                "reason": format_reason([FACTOR_REASONS[factor] for factor in fired]),
+                "status": FraudAlertStatus.OPEN,
+                "created_at": now
+            })
+            alert_factors.extend(
+                {"alert_id": alert_id, "factor_code": FACTOR_CODES[factor], "created_at": now}
+                for factor in fired
+            )
+
+        for i in range(0, len(alerts), chunk_size):
+            db.bulk_insert_mappings(FraudAlert, alerts[i:i + chunk_size])
+        for i in range(0, len(alert_factors), chunk_size):
+            db.bulk_insert_mappings(FraudAlertFactor, alert_factors[i:i + chunk_size])
+        crud_fraud_rollup.record_alerts(db, alerts)
+        db.commit()
+    finally:
+        db.close()
+
+    return {
+        "shard": shard,
+        "accounts": len(account_ids),
+        "rows": len(columns),
+        "alerts": len(alerts),
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+class ShardCheckpoints:
+    """One JSON file per completed shard, plus the shard count they were made with"""
+
+    def __init__(self, directory: str, num_shards: int):
+        self.directory = directory
+        self.num_shards = num_shards
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def open(self, restart: bool = False):
+        os.makedirs(self.directory, exist_ok=True)
+        plan_path = self._path("plan.json")
+        if restart:
+            for name in os.listdir(self.directory):
+                if name.startswith("shard-") or name == "plan.json":
+                    os.remove(self._path(name))
+        if os.path.exists(plan_path):
+            with open(plan_path) as f:
+                plan = json.load(f)
+            if plan["num_shards"] != self.num_shards:
+                raise ValueError(
+                    f"Checkpoints in {self.directory} were made with {plan['num_shards']} shards; "
+                    f"rerun with --shards {plan['num_shards']} or --restart"
+                )
+        else:
+            with open(plan_path, "w") as f:
+                json.dump({"num_shards": self.num_shards, "created_at": datetime.utcnow().isoformat()}, f)
+
+    def completed(self) -> Dict[int, Dict[str, Any]]:
+        done = {}
+        for name in os.listdir(self.directory):
+            if name.startswith("shard-") and name.endswith(".json"):
+                with open(self._path(name)) as f:
+                    result = json.load(f)
+                done[result["shard"]] = result
+        return done
+
+    def save(self, result: Dict[str, Any]):
+        # Write then rename so a crash never leaves a half-written checkpoint
+        path = self._path(f"shard-{result['shard']:05d}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(dict(result, completed_at=datetime.utcnow().isoformat()), f)
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,229 @@
+from typing import Dict, Any, List, NamedTuple, Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
+import numpy as np
+import uuid
+
+from ..models.transaction import Transaction
+from .velocity_tracker import minute_of
+from .vectorized_scoring import to_microseconds
+
+MERCHANT = 0
+LOCATION = 1
+
+
+class FraudRing(NamedTuple):
+    account_ids: List[uuid.UUID]
+    anchor_transaction_id: uuid.UUID  # Most recent transaction that linked the ring
+    shared_merchant_events: int
+    shared_location_events: int
+
+
+class UnionFind:
+    """Disjoint sets over integer node ids 0..n-1 (union by size, path halving)"""
+
+    def __init__(self):
+        self.parent: List[int] = []
+        self.size: List[int] = []
+
+    def add(self) -> int:
+        node = len(self.parent)
+        self.parent.append(node)
+        self.size.append(1)
+        return node
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def __len__(self):
+        return len(self.parent)
+
+
+class FraudRingDetector:
+    """Offline connected-components job linking accounts that share merchants or locations.
+
+    Two accounts are linked when both transact at the same merchant (or the
+    same location) within the same ``window_minutes`` bucket. Transactions
+    are streamed in timestamp order in chunks; accounts, merchants and
+    locations are mapped to integer codes and each chunk is grouped with
+    NumPy, so no edge list is ever materialized. Groups with more than
+    ``max_group_accounts`` distinct accounts (supermarkets, airports) are
+    treated as hubs and ignored. Components with between ``min_ring_size``
+    and ``max_ring_size`` accounts are reported as rings.
+
+    Memory is bounded by the number of accounts plus one chunk; a single
+    window bucket larger than ``chunk_size`` is held whole until it ends.
+    """
+
+    def __init__(self, window_minutes: int = 10, max_group_accounts: int = 20,
+                 min_ring_size: int = 3, max_ring_size: int = 50, chunk_size: int = 100000):
+        if min_ring_size < 2:
+            raise ValueError("min_ring_size must be at least 2: a ring needs a linking transaction between accounts")
+        self.window_minutes = window_minutes
+        self.max_group_accounts = max_group_accounts
+        self.min_ring_size = min_ring_size
+        self.max_ring_size = max_ring_size
+        self.chunk_size = chunk_size
+
+        self.accounts: List[uuid.UUID] = []
+        self._account_codes: Dict[uuid.UUID, int] = {}
+        self._value_codes = ({}, {})  # Per kind: normalized merchant/location -> code
+        self.sets = UnionFind()
+        # Per account: latest linking transaction (timestamp in microseconds, id)
+        self._last_link_us = np.zeros(0, dtype=np.int64)
+        self._last_link_txn: List[Optional[uuid.UUID]] = []
+        # Per kind and account: linking groups counted against that account (summed per ring)
+        self._link_events = np.zeros((2, 0), dtype=np.int64)
+        self.rows_scanned = 0
+        self.groups_linked = 0
+        self.hub_groups = 0
+
+    def run(self, db: Session, since: Optional[datetime] = None) -> List[FraudRing]:
+        query = db.query(
+            Transaction.id,
+            Transaction.account_id,
+            Transaction.timestamp,
+            Transaction.merchant,
+            Transaction.location
+        )
+        if since is not None:
+            query = query.filter(Transaction.timestamp >= since)
+
+        pending = []
+        pending_bucket = None
+        for row in query.order_by(Transaction.timestamp).yield_per(self.chunk_size):
+            bucket = minute_of(row[2]) // self.window_minutes
+            # Rows arrive in timestamp order, so a new bucket completes every pending one
+            if len(pending) >= self.chunk_size and bucket != pending_bucket:
+                self._process_chunk(pending)
+                pending = []
+            pending.append(row)
+            pending_bucket = bucket
+        self._process_chunk(pending)
+        return self.rings()
+
+    def _account_code(self, account_id: uuid.UUID) -> int:
+        code = self._account_codes.get(account_id)
+        if code is None:
+            code = self._account_codes[account_id] = self.sets.add()
+            self.accounts.append(account_id)
+            self._last_link_txn.append(None)
+        return code
+
+    def _value_code(self, kind: int, value: Optional[str]) -> int:
+        key = (value or "").strip().lower()
+        if not key:
+            return 0
+        codes = self._value_codes[kind]
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(codes) + 1
+        return code
+
+    def _process_chunk(self, rows: List):
+        """Link the window buckets in ``rows``, all of which must be complete"""
+        if not rows:
+            return
+        n = len(rows)
+        self.rows_scanned += n
+        bucket = np.fromiter((minute_of(row[2]) // self.window_minutes for row in rows), dtype=np.int64, count=n)
+        account = np.fromiter((self._account_code(row[1]) for row in rows), dtype=np.int64, count=n)
+        timestamp_us = np.fromiter((to_microseconds(row[2]) for row in rows), dtype=np.int64, count=n)
+        if len(self._last_link_us) < len(self.sets):
+            capacity = max(len(self.sets), 2 * len(self._last_link_us))
+            grown = np.zeros(capacity, dtype=np.int64)
+            grown[:len(self._last_link_us)] = self._last_link_us
+            self._last_link_us = grown
+            grown = np.zeros((2, capacity), dtype=np.int64)
+            grown[:, :self._link_events.shape[1]] = self._link_events
+            self._link_events = grown
+
+        for kind, column in ((MERCHANT, 3), (LOCATION, 4)):
+            value = np.fromiter((self._value_code(kind, row[column]) for row in rows), dtype=np.int64, count=n)
+            self._link(kind, rows, bucket, value, account, timestamp_us)
+
+    def _link(self, kind: int, rows: List, bucket: np.ndarray, value: np.ndarray,
+              account: np.ndarray, timestamp_us: np.ndarray):
+        present = np.nonzero(value)[0]
+        if len(present) == 0:
+            return
+        # Distinct (bucket, value, account) triples, grouped by (bucket, value)
+        order = present[np.lexsort((account[present], value[present], bucket[present]))]
+        b, v, a = bucket[order], value[order], account[order]
+        new_group = np.ones(len(order), dtype=bool)
+        new_group[1:] = (b[1:] != b[:-1]) | (v[1:] != v[:-1])
+        distinct = new_group.copy()
+        distinct[1:] |= a[1:] != a[:-1]
+        group_id = np.cumsum(new_group) - 1
+        accounts_per_group = np.bincount(group_id[distinct])
+
+        valid = (accounts_per_group >= 2) & (accounts_per_group <= self.max_group_accounts)
+        self.hub_groups += int((accounts_per_group > self.max_group_accounts).sum())
+        if not valid.any():
+            return
+        in_valid = valid[group_id]
+        first_account = a[new_group]
+
+        # Union every account of a linking group with the group's first account
+        edges = np.unique(np.stack([first_account[group_id[in_valid]], a[in_valid]], axis=1), axis=0)
+        union = self.sets.union
+        for left, right in edges[edges[:, 0] != edges[:, 1]].tolist():
+            union(left, right)
+        np.add.at(self._link_events[kind], first_account[valid], 1)
+        self.groups_linked += int(valid.sum())
+
+        # Remember each account's latest linking transaction
+        rows_idx = order[in_valid]
+        latest = rows_idx[np.argsort(timestamp_us[rows_idx], kind="stable")]
+        for index in latest.tolist():
+            code = int(account[index])
+            if timestamp_us[index] >= self._last_link_us[code]:
+                self._last_link_us[code] = timestamp_us[index]
+                self._last_link_txn[code] = rows[index][0]
+
+    def rings(self) -> List[FraudRing]:
+        if not len(self.sets):
+            return []
+        roots = np.fromiter((self.sets.find(node) for node in range(len(self.sets))), dtype=np.int64, count=len(self.sets))
+        sizes = np.bincount(roots, minlength=len(self.sets))
+
+        accounts = len(self.sets)
+        merchant_events = np.bincount(roots, weights=self._link_events[MERCHANT, :accounts], minlength=accounts)
+        location_events = np.bincount(roots, weights=self._link_events[LOCATION, :accounts], minlength=accounts)
+
+        rings = []
+        members: Dict[int, List[int]] = {}
+        for node, root in enumerate(roots.tolist()):
+            if self.min_ring_size <= sizes[root] <= self.max_ring_size:
+                members.setdefault(root, []).append(node)
+        for root, nodes in members.items():
+            anchor = max(nodes, key=lambda node: self._last_link_us[node])
+            rings.append(FraudRing(
+                account_ids=sorted((self.accounts[node] for node in nodes), key=str),
+                anchor_transaction_id=self._last_link_txn[anchor],
+                shared_merchant_events=int(merchant_events[root]),
+                shared_location_events=int(location_events[root])
+            ))
+        rings.sort(key=lambda ring: len(ring.account_ids), reverse=True)
+        return rings
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows_scanned": self.rows_scanned,
+            "accounts": len(self.sets),
+            "groups_linked": self.groups_linked,
+            "hub_groups_skipped": self.hub_groups
+        }
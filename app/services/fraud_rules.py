@@ -0,0 +1,184 @@
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from datetime import datetime
+import bisect
+import json
+import logging
+import random
+import threading
+import time
+
+from ..config import FRAUD_RULE_TRACE_PATH, FRAUD_RULE_TRACE_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds in microseconds; the last bucket is open-ended
+LATENCY_BUCKETS_US = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class RuleMetrics:
+    """Invocation, hit and latency counters for one rule (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.invocations = 0
+            self.hits = 0
+            self.total_ns = 0
+            self.max_ns = 0
+            self.histogram = [0] * (len(LATENCY_BUCKETS_US) + 1)
+
+    def record(self, elapsed_ns: int, hit: bool):
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_US, elapsed_ns / 1000)
+        with self._lock:
+            self.invocations += 1
+            self.hits += hit
+            self.total_ns += elapsed_ns
+            if elapsed_ns > self.max_ns:
+                self.max_ns = elapsed_ns
+            self.histogram[bucket] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            invocations, hits, total_ns, max_ns = self.invocations, self.hits, self.total_ns, self.max_ns
+            histogram = list(self.histogram)
+        labels = [f"<={bound}us" for bound in LATENCY_BUCKETS_US] + [f">{LATENCY_BUCKETS_US[-1]}us"]
+        return {
+            "invocations": invocations,
+            "hits": hits,
+            "hit_rate": round(hits / invocations, 4) if invocations else 0.0,
+            "total_ms": round(total_ns / 1e6, 3),
+            "mean_us": round(total_ns / invocations / 1000, 3) if invocations else 0.0,
+            "p50_us": _histogram_quantile(histogram, 0.5),
+            "p99_us": _histogram_quantile(histogram, 0.99),
+            "max_us": round(max_ns / 1000, 3),
+            "histogram": dict(zip(labels, histogram))
+        }
+
+
+def _histogram_quantile(histogram: List[int], q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the ``q`` quantile (``None`` if it is the open-ended bucket)"""
+    total = sum(histogram)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS_US, histogram):
+        seen += count
+        if seen >= rank:
+            return float(bound)
+    return None
+
+
+class Rule:
+    """A named risk factor: a check, its score weight and its alert reason.
+
+    ``check`` receives ``(transaction, history, previous_position)`` and
+    returns a truthy value when the factor fires; a list is taken as the
+    matched risk keywords.
+    """
+    __slots__ = ("name", "check", "weight", "reason", "metrics")
+
+    def __init__(self, name: str, check: Callable, weight: float, reason: str, metrics: RuleMetrics):
+        self.name = name
+        self.check = check
+        self.weight = weight
+        self.reason = reason
+        self.metrics = metrics
+
+
+class RuleTracer:
+    """Appends a sample of rule evaluations to a JSON-lines file.
+
+    Each sampled transaction becomes one line with every rule's result and
+    latency. Sampling is per transaction, at ``sample_rate``.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 0.01, rng: Optional[random.Random] = None):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self.lines = 0
+
+    def sample(self) -> bool:
+        return self._rng.random() < self.sample_rate
+
+    def write(self, transaction_id, evaluations: List[Tuple[str, bool, int]]):
+        line = json.dumps({
+            "at": datetime.utcnow().isoformat(),
+            "transaction_id": str(transaction_id),
+            "rules": [
+                {"rule": name, "hit": hit, "latency_us": round(elapsed_ns / 1000, 3)}
+                for name, hit, elapsed_ns in evaluations
+            ]
+        })
+        try:
+            with self._lock, open(self.path, "a") as f:
+                f.write(line + "\n")
+                self.lines += 1
+        except OSError:
+            # Tracing must never break scoring
+            logger.exception("Could not write rule trace to %s", self.path)
+
+
+class RuleRegistry:
+    """Ordered rules, evaluated with built-in instrumentation.
+
+    Every evaluation counts towards its rule's ``RuleMetrics``. Metrics live
+    in a ``metrics`` dict keyed by rule name, by default the process-wide
+    ``fraud_rule_metrics``, so all scorers in a process report together.
+    """
+
+    def __init__(self, metrics: Optional[Dict[str, RuleMetrics]] = None, tracer: Optional[RuleTracer] = None):
+        self.rules: List[Rule] = []
+        self.metrics = fraud_rule_metrics if metrics is None else metrics
+        self.tracer = tracer
+
+    def register(self, name: str, check: Callable, weight: float, reason: str) -> Rule:
+        if any(rule.name == name for rule in self.rules):
+            raise ValueError(f"Rule {name!r} is already registered")
+        metrics = self.metrics.setdefault(name, RuleMetrics())
+        rule = Rule(name, check, weight, reason, metrics)
+        self.rules.append(rule)
+        return rule
+
+    def evaluate(self, transaction, history, previous_position) -> List[Tuple[Rule, Any]]:
+        """Run every rule in order; returns ``(rule, result)`` for the rules that fired"""
+        fired = []
+        trace = [] if self.tracer is not None and self.tracer.sample() else None
+        for rule in self.rules:
+            started = time.perf_counter_ns()
+            result = rule.check(transaction, history, previous_position)
+            elapsed = time.perf_counter_ns() - started
+            hit = bool(result)
+            rule.metrics.record(elapsed, hit)
+            if trace is not None:
+                trace.append((rule.name, hit, elapsed))
+            if hit:
+                fired.append((rule, result))
+        if trace is not None:
+            self.tracer.write(transaction.id, trace)
+        return fired
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {rule.name: rule.metrics.snapshot() for rule in self.rules}
+
+
+def metrics_snapshot(metrics: Optional[Dict[str, RuleMetrics]] = None) -> Dict[str, Dict[str, Any]]:
+    metrics = fraud_rule_metrics if metrics is None else metrics
+    return {name: rule_metrics.snapshot() for name, rule_metrics in list(metrics.items())}
+
+
+def reset_metrics(metrics: Optional[Dict[str, RuleMetrics]] = None):
+    for rule_metrics in list((fraud_rule_metrics if metrics is None else metrics).values()):
+        rule_metrics.reset()
+
+
+# Process-wide rule metrics, shared by every FraudDetectionService
+fraud_rule_metrics: Dict[str, RuleMetrics] = {}
+
+# Optional trace file shared by every FraudDetectionService
+fraud_rule_tracer = RuleTracer(FRAUD_RULE_TRACE_PATH, FRAUD_RULE_TRACE_SAMPLE_RATE) if FRAUD_RULE_TRACE_PATH else None
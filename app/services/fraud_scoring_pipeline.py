@@ -0,0 +1,148 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+from collections import deque
+import logging
+import threading
+
+from ..database import SessionLocal
+from ..models.transaction import Transaction
+from ..crud import crud_fraud_outbox
+from .fraud_detection_service import FraudDetectionService
+from ..config import (
+    FRAUD_PIPELINE_WORKERS,
+    FRAUD_PIPELINE_BATCH_SIZE,
+    FRAUD_PIPELINE_POLL_SECONDS,
+    FRAUD_PIPELINE_LEASE_SECONDS,
+    FRAUD_PIPELINE_MAX_ATTEMPTS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FraudScoringPipeline:
+    """Thread workers that drain ``fraud_scoring_outbox`` in micro-batches.
+
+    Each worker leases a batch of outbox rows, scores the transactions with
+    ``FraudDetectionService.analyze_transactions`` and deletes the rows in the
+    same commit as the alerts. Failed batches are released and retried up to
+    ``max_attempts`` times, after which they stay in the table as dead letters.
+    """
+
+    def __init__(self, num_workers: int = 2, batch_size: int = FRAUD_PIPELINE_BATCH_SIZE,
+                 poll_seconds: float = FRAUD_PIPELINE_POLL_SECONDS,
+                 lease_seconds: float = FRAUD_PIPELINE_LEASE_SECONDS,
+                 max_attempts: int = FRAUD_PIPELINE_MAX_ATTEMPTS,
+                 session_factory=None, service: Optional[FraudDetectionService] = None):
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.session_factory = session_factory or SessionLocal
+        self.service = service or FraudDetectionService()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        # Seconds from enqueue to scored, for the most recent transactions
+        self._lags = deque(maxlen=1000)
+        self.scored = 0
+        self.alerts = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.lost_leases = 0
+
+    def start(self):
+        self._stop.clear()
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._run, name=f"fraud-pipeline-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.process_batch()
+            except Exception:
+                logger.exception("Fraud scoring pipeline batch failed")
+                processed = 0
+            if processed < self.batch_size:
+                # Queue drained (or erroring): wait before polling again
+                self._stop.wait(self.poll_seconds)
+
+    def process_batch(self) -> int:
+        """Claim and score one batch; returns the number of outbox rows handled"""
+        db = self.session_factory()
+        try:
+            rows = crud_fraud_outbox.claim_batch(db, self.batch_size, self.lease_seconds, self.max_attempts)
+            if not rows:
+                return 0
+            # One claim token per batch; captured now because a rollback expires the rows
+            row_ids, claimed_by = [row.id for row in rows], rows[0].claimed_by
+            try:
+                return self._score(db, rows)
+            except Exception as error:
+                db.rollback()
+                crud_fraud_outbox.release(db, row_ids, claimed_by, f"{type(error).__name__}: {error}")
+                with self._lock:
+                    self.failed_batches += 1
+                raise
+        finally:
+            db.close()
+
+    def _score(self, db, rows) -> int:
+        enqueued_at = {row.transaction_id: row.created_at for row in rows}
+        transaction_ids = list(enqueued_at)
+        transactions = db.query(Transaction).filter(Transaction.id.in_(transaction_ids)).all()
+
+        # Deleting first makes the alerts and the dequeue a single commit
+        if not crud_fraud_outbox.complete(db, rows):
+            db.rollback()
+            with self._lock:
+                self.lost_leases += 1
+            return 0
+        results = self.service.analyze_transactions(transactions, db)
+        db.commit()
+
+        now = datetime.utcnow()
+        with self._lock:
+            self.batches += 1
+            self.scored += len(transactions)
+            self.alerts += sum(1 for result in results if result["is_fraud_risk"])
+            self._lags.extend((now - enqueued_at[t]).total_seconds() for t in transaction_ids)
+        return len(rows)
+
+    def metrics(self, db=None) -> Dict[str, Any]:
+        """Worker counters plus, given a session, the outbox backlog"""
+        with self._lock:
+            lags = sorted(self._lags)
+            metrics = {
+                "workers": len(self._threads),
+                "running": self.running,
+                "scored": self.scored,
+                "alerts": self.alerts,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "lost_leases": self.lost_leases,
+                "lag_seconds": {
+                    "p50": round(lags[len(lags) // 2], 3) if lags else 0,
+                    "p99": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))], 3) if lags else 0,
+                    "max": round(lags[-1], 3) if lags else 0
+                }
+            }
+        if db is not None:
+            metrics.update(crud_fraud_outbox.get_queue_metrics(db, self.max_attempts))
+        return metrics
+
+
+# In-process workers, started by the API when FRAUD_PIPELINE_WORKERS > 0
+fraud_pipeline = FraudScoringPipeline(num_workers=FRAUD_PIPELINE_WORKERS)
@@ -0,0 +1,180 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+import json
+import math
+import os
+import re
+import sys
+import threading
+import uuid
+
+from ..config import FRAUD_GAZETTEER_PATH, FRAUD_GEO_VELOCITY_ENABLED, GEO_VELOCITY_MAX_ACCOUNTS
+
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "gazetteer.json")
+
+EARTH_RADIUS_KM = 6371.0
+# Longest possible great-circle distance (antipodal places)
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+class Place(NamedTuple):
+    name: str
+    lat: float
+    lon: float
+
+
+class Position(NamedTuple):
+    """Where an account last transacted"""
+    timestamp: datetime
+    transaction_id: uuid.UUID
+    place: Place
+
+
+def normalize_location(text: str) -> str:
+    """Lowercase, punctuation-free, single-spaced form used as gazetteer key"""
+    return " ".join(_NON_ALNUM.split(text.lower())).strip()
+
+
+def distance_km(a: Place, b: Place) -> float:
+    """Great-circle (haversine) distance between two places"""
+    lat1, lat2 = math.radians(a.lat), math.radians(b.lat)
+    dlat = lat2 - lat1
+    dlon = math.radians(b.lon - a.lon)
+    h = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+class Gazetteer:
+    """In-memory index from normalized place names to coordinates.
+
+    Keys are interned, so the dictionary probes compare by identity. A
+    location resolves by its whole normalized text first, then by the longest
+    token run that is a known name ("Foreign - Lagos" resolves to Lagos).
+    Results for raw strings are memoized, since the same few location
+    strings repeat across most transactions.
+    """
+
+    MEMO_SIZE = 10000
+
+    def __init__(self, version: int, places: List[Dict]):
+        self.version = version
+        self._index: Dict[str, Place] = {}
+        self._memo: Dict[str, Optional[Place]] = {}
+        self.max_key_tokens = 1
+        for entry in places:
+            place = Place(entry["name"], float(entry["lat"]), float(entry["lon"]))
+            for name in [entry["name"], *entry.get("aliases", [])]:
+                key = normalize_location(name)
+                if key:
+                    self._index[sys.intern(key)] = place
+                    self.max_key_tokens = max(self.max_key_tokens, key.count(" ") + 1)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "Gazetteer":
+        with open(path or DEFAULT_GAZETTEER_PATH) as f:
+            data = json.load(f)
+        if "version" not in data:
+            raise ValueError(f"Gazetteer file {path or DEFAULT_GAZETTEER_PATH} has no version")
+        return cls(data["version"], data.get("places", []))
+
+    def resolve(self, location: Optional[str]) -> Optional[Place]:
+        if not location:
+            return None
+        try:
+            return self._memo[location]
+        except KeyError:
+            pass
+        place = self._lookup(normalize_location(location))
+        if len(self._memo) >= self.MEMO_SIZE:
+            self._memo.clear()
+        self._memo[location] = place
+        return place
+
+    def _lookup(self, key: str) -> Optional[Place]:
+        place = self._index.get(key)
+        if place is not None or not key:
+            return place
+        tokens = key.split(" ")
+        for size in range(min(self.max_key_tokens, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                place = self._index.get(" ".join(tokens[start:start + size]))
+                if place is not None:
+                    return place
+        return None
+
+    def __len__(self):
+        return len(self._index)
+
+
+class LastPositionTracker:
+    """In-process LRU of each account's most recent known positions.
+
+    Keeps the last ``depth`` resolved positions per account so a transaction
+    that was already recorded at write time can still find the one before it.
+    Like the velocity tracker it only sees writes made through this process;
+    ``previous`` returns ``None`` when it has nothing to offer and the caller
+    falls back to SQL.
+    """
+
+    def __init__(self, max_accounts: int = 100000, depth: int = 4, enabled: bool = True,
+                 gazetteer: Optional[Gazetteer] = None):
+        self.max_accounts = max_accounts
+        self.depth = depth
+        self.enabled = enabled
+        self.gazetteer = gazetteer
+        self._positions: "OrderedDict[uuid.UUID, List[Position]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, account_id: uuid.UUID, position: Position):
+        if not self.enabled:
+            return
+        with self._lock:
+            positions = self._positions.get(account_id)
+            if positions is None:
+                positions = self._positions[account_id] = []
+                while len(self._positions) > self.max_accounts:
+                    self._positions.popitem(last=False)
+            else:
+                self._positions.move_to_end(account_id)
+            if any(p.transaction_id == position.transaction_id for p in positions):
+                return
+            positions.append(position)
+            positions.sort(key=lambda p: p.timestamp)
+            del positions[:-self.depth]
+
+    def record_location(self, account_id: uuid.UUID, transaction_id: uuid.UUID, timestamp: datetime,
+                        location: Optional[str]):
+        """Record a committed transaction if its location resolves"""
+        if not self.enabled or self.gazetteer is None:
+            return
+        place = self.gazetteer.resolve(location)
+        if place is not None:
+            self.record(account_id, Position(timestamp, transaction_id, place))
+
+    def previous(self, account_id: uuid.UUID, transaction_id: uuid.UUID, timestamp: datetime) -> Optional[Position]:
+        """Latest known position at or before ``timestamp``, other than the transaction itself"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            positions = self._positions.get(account_id)
+            if not positions:
+                return None
+            self._positions.move_to_end(account_id)
+            for position in reversed(positions):
+                if position.timestamp <= timestamp and position.transaction_id != transaction_id:
+                    return position
+        return None
+
+    def __len__(self):
+        return len(self._positions)
+
+
+# Shared tracker fed by the transaction write path
+last_position_tracker = LastPositionTracker(
+    max_accounts=GEO_VELOCITY_MAX_ACCOUNTS,
+    enabled=FRAUD_GEO_VELOCITY_ENABLED,
+    gazetteer=Gazetteer.load(FRAUD_GAZETTEER_PATH) if FRAUD_GEO_VELOCITY_ENABLED else None
+)
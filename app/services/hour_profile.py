@@ -0,0 +1,13 @@
+from ..crud.crud_hour_profile import HOURS, HourCounts
+
+
+def is_unusual_hour(counts: HourCounts, hour: int, min_share: float) -> bool:
+    """True if the account rarely transacts around ``hour``.
+
+    The hour and its two neighbours are pooled so a habit of 21:55 does not
+    make 22:05 look unusual. ``counts`` must not include the transaction
+    being judged, or it always counts towards its own hour.
+    """
+    total = sum(counts)
+    around = counts[(hour - 1) % HOURS] + counts[hour] + counts[(hour + 1) % HOURS]
+    return around < total * min_share
@@ -0,0 +1,73 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import re
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+class Intent(NamedTuple):
+    """One row of an intent table: keywords or phrases with their weights"""
+    name: str
+    keywords: Dict[str, float]
+
+
+def normalize_token(token: str) -> str:
+    # Fold simple plurals so "balances" and "transactions" match their keyword
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [normalize_token(token) for token in _TOKEN_SPLIT.split(text.lower()) if token]
+
+
+class IntentRouter:
+    """Scores every intent in one pass over the message tokens.
+
+    The intent table is compiled once into an inverted index from a phrase's
+    first token to ``(intent, remaining tokens, weight)`` entries. Routing
+    looks each message token up once, so the cost depends on the message
+    length and the handful of entries per token, not on the number of
+    intents. Each phrase counts once per message; the intent with the
+    highest total weight wins, and ties go to the intent listed first.
+    """
+
+    def __init__(self, intents: Sequence[Intent]):
+        self.intents = list(intents)
+        self._index: Dict[str, List[Tuple[int, Tuple[str, ...], float, int]]] = {}
+        phrase_id = 0
+        for position, intent in enumerate(self.intents):
+            for phrase, weight in intent.keywords.items():
+                tokens = tokenize(phrase)
+                if not tokens:
+                    continue
+                self._index.setdefault(tokens[0], []).append((position, tuple(tokens[1:]), weight, phrase_id))
+                phrase_id += 1
+
+    def scores(self, message: str) -> Dict[str, float]:
+        """Total matched weight per intent (intents without a match are left out)"""
+        return {self.intents[position].name: score for position, score in self._score(tokenize(message)).items()}
+
+    def route(self, message: str) -> Optional[str]:
+        """Name of the best-scoring intent, or ``None`` when nothing matches"""
+        scores = self._score(tokenize(message))
+        if not scores:
+            return None
+        best = min(scores, key=lambda position: (-scores[position], position))
+        return self.intents[best].name
+
+    def _score(self, tokens: List[str]) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        matched = set()
+        for i, token in enumerate(tokens):
+            for position, tail, weight, phrase_id in self._index.get(token, ()):
+                if phrase_id in matched:
+                    continue
+                if tail and tuple(tokens[i + 1:i + 1 + len(tail)]) != tail:
+                    continue
+                matched.add(phrase_id)
+                scores[position] = scores.get(position, 0.0) + weight
+        return scores
+
+    def __len__(self):
+        return len(self.intents)
@@ -0,0 +1,112 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+import json
+import os
+import re
+
+DEFAULT_KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "fraud_keywords.json")
+
+_TOKEN_SPLIT = re.compile(r"[^0-9A-Za-z]+")
+
+
+class KeywordMatcher:
+    """Case-insensitive multi-substring matcher (Aho-Corasick).
+
+    The automaton is built once; a lookup walks the text a single time, so its
+    cost depends on the text length and not on the number of keywords.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for keyword in dict.fromkeys(k.lower() for k in keywords if k):
+            self._add(keyword)
+        self._build_fail_links()
+
+    def _add(self, keyword: str):
+        node = 0
+        for char in keyword:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = nxt
+        self._output[node].append(len(self.keywords))
+        self.keywords.append(keyword)
+
+    def _build_fail_links(self):
+        # Breadth-first from the root's children, whose fail link is the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                # Inherit the matches of the longest proper suffix
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def find(self, text: Optional[str]) -> List[str]:
+        """Keywords contained in ``text``, in order of first occurrence"""
+        if not text or not self.keywords:
+            return []
+        found = {}
+        node = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in output[node]:
+                found.setdefault(index, None)
+        return [self.keywords[index] for index in found]
+
+    def __len__(self):
+        return len(self.keywords)
+
+
+class RiskKeywords:
+    """Versioned merchant and location keyword lists, compiled for lookup"""
+
+    def __init__(self, version: int, merchant_keywords: Iterable[str], location_keywords: Iterable[str],
+                 location_codes: Iterable[str] = ()):
+        self.version = version
+        self.merchant_matcher = KeywordMatcher(merchant_keywords)
+        self.location_matcher = KeywordMatcher(location_keywords)
+        # Country codes match whole tokens only, so "NG" does not match "Washington"
+        self.location_codes = frozenset(code.upper() for code in location_codes if code)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "RiskKeywords":
+        with open(path or DEFAULT_KEYWORDS_PATH) as f:
+            data = json.load(f)
+        if "version" not in data:
+            raise ValueError(f"Keyword file {path or DEFAULT_KEYWORDS_PATH} has no version")
+        return cls(
+            version=data["version"],
+            merchant_keywords=data.get("merchant_keywords", []),
+            location_keywords=data.get("location_keywords", []),
+            location_codes=data.get("location_codes", [])
+        )
+
+    def match_merchant(self, merchant: Optional[str]) -> List[str]:
+        return self.merchant_matcher.find(merchant)
+
+    def match_location(self, location: Optional[str]) -> List[str]:
+        if not location:
+            return []
+        matches = self.location_matcher.find(location)
+        if self.location_codes:
+            for token in _TOKEN_SPLIT.split(location):
+                code = token.upper()
+                if code in self.location_codes and code not in matches:
+                    matches.append(code)
+        return matches
@@ -0,0 +1,157 @@
+from typing import Dict, Any, List, Optional
+from concurrent.futures import Future
+from collections import deque
+import logging
+import threading
+import time
+import uuid
+
+from ..database import SessionLocal
+from ..models.transaction import Transaction
+from .fraud_detection_service import FraudDetectionService
+from ..config import FRAUD_MICROBATCH_MAX_ITEMS, FRAUD_MICROBATCH_MAX_WAIT_MS
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesces single-transaction scoring requests into small batches.
+
+    ``submit`` returns a future immediately. A background thread collects
+    requests until ``max_items`` are waiting or ``max_wait_ms`` have passed
+    since the first one, then scores them with one ``analyze_transactions``
+    call (grouped history queries and a single alert commit) and resolves
+    each caller's future with its own result.
+    """
+
+    def __init__(self, service: Optional[FraudDetectionService] = None,
+                 max_items: int = FRAUD_MICROBATCH_MAX_ITEMS,
+                 max_wait_ms: float = FRAUD_MICROBATCH_MAX_WAIT_MS,
+                 session_factory=None):
+        self.service = service or FraudDetectionService()
+        self.max_items = max_items
+        self.max_wait_ms = max_wait_ms
+        self.session_factory = session_factory or SessionLocal
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        # Per-request milliseconds, for the most recent requests
+        self._queue_ms = deque(maxlen=10000)
+        self._total_ms = deque(maxlen=10000)
+        self._batch_sizes = deque(maxlen=1000)
+        self.requests = 0
+        self.batches = 0
+
+    def submit(self, transaction_id: uuid.UUID) -> Future:
+        """Queue a transaction for scoring; the future resolves to its result dict"""
+        future = Future()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Micro-batcher is stopped")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="fraud-micro-batcher", daemon=True)
+                self._thread.start()
+            self._pending.append((transaction_id, future, time.perf_counter()))
+            self.requests += 1
+            # Wake the worker to open a window, or to close a full one early
+            if len(self._pending) == 1 or len(self._pending) >= self.max_items:
+                self._cond.notify()
+        return future
+
+    def score(self, transaction_id: uuid.UUID, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Submit and wait for the result"""
+        return self.submit(transaction_id).result(timeout)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _next_batch(self) -> List:
+        with self._cond:
+            while not self._pending and not self._stopped:
+                self._cond.wait()
+            if not self._pending:
+                return []
+            # The window opens with the oldest waiting request
+            deadline = self._pending[0][2] + self.max_wait_ms / 1000
+            while len(self._pending) < self.max_items and not self._stopped:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._pending.popleft() for _ in range(min(self.max_items, len(self._pending)))]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            try:
+                self._score(batch)
+            except Exception as error:
+                logger.exception("Micro-batch scoring failed")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    def _score(self, batch: List):
+        dispatched = time.perf_counter()
+        # Score each transaction once even if several callers asked for it
+        unique_ids = list(dict.fromkeys(transaction_id for transaction_id, _, _ in batch))
+        db = self.session_factory()
+        try:
+            transactions = {
+                transaction.id: transaction
+                for transaction in db.query(Transaction).filter(Transaction.id.in_(unique_ids)).all()
+            }
+            found = [transaction_id for transaction_id in unique_ids if transaction_id in transactions]
+            results = dict(zip(found, self.service.analyze_transactions([transactions[t] for t in found], db)))
+        finally:
+            db.close()
+
+        finished = time.perf_counter()
+        for transaction_id, future, submitted in batch:
+            if transaction_id in results:
+                future.set_result(dict(results[transaction_id], transaction_id=str(transaction_id)))
+            else:
+                future.set_exception(KeyError(transaction_id))
+        with self._cond:
+            self.batches += 1
+            self._batch_sizes.append(len(batch))
+            self._queue_ms.extend((dispatched - submitted) * 1000 for _, _, submitted in batch)
+            self._total_ms.extend((finished - submitted) * 1000 for _, _, submitted in batch)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Added queueing latency and end-to-end latency percentiles, in milliseconds"""
+        with self._cond:
+            queue_ms = sorted(self._queue_ms)
+            total_ms = sorted(self._total_ms)
+            batch_sizes = list(self._batch_sizes)
+            return {
+                "max_items": self.max_items,
+                "max_wait_ms": self.max_wait_ms,
+                "requests": self.requests,
+                "batches": self.batches,
+                "pending": len(self._pending),
+                "avg_batch_size": round(sum(batch_sizes) / len(batch_sizes), 2) if batch_sizes else 0,
+                "added_latency_ms": _percentiles(queue_ms),
+                "total_latency_ms": _percentiles(total_ms)
+            }
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0, "p99": 0, "max": 0}
+    return {
+        "p50": round(values[len(values) // 2], 3),
+        "p99": round(values[min(len(values) - 1, int(len(values) * 0.99))], 3),
+        "max": round(values[-1], 3)
+    }
+
+
+# Shared batcher for the real-time scoring endpoint
+fraud_micro_batcher = MicroBatcher()
@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, Optional
+import math
+
+# Format version 1: relative accuracy 1%, at most 128 buckets
+SKETCH_VERSION = 1
+RELATIVE_ACCURACY = 0.01
+MAX_BUCKETS = 128
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+def bucket_index(value: int) -> int:
+    """Log-bucket of a positive integer value"""
+    return math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch over non-negative integers (DDSketch-style).
+
+    Values fall into logarithmic buckets, so any quantile is estimated within
+    1% relative error. Bucket counts simply add, which makes merging exact:
+    merging sketches of two sets gives the same bytes as sketching their
+    union. Memory is bounded by folding the lowest buckets into each other
+    once there are more than ``MAX_BUCKETS``; the fold depends only on the
+    combined histogram, so merges stay exact and only low quantiles lose
+    accuracy.
+    """
+    __slots__ = ("zero_count", "buckets")
+
+    def __init__(self):
+        self.zero_count = 0
+        self.buckets: Dict[int, int] = {}
+
+    @classmethod
+    def of(cls, values: Iterable[int]) -> "QuantileSketch":
+        sketch = cls()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.buckets.values())
+
+    def add(self, value: int, count: int = 1):
+        if value < 0:
+            raise ValueError("QuantileSketch only holds non-negative values")
+        if value == 0:
+            self.zero_count += count
+            return
+        index = bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self._collapse()
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add another sketch's counts into this one"""
+        self.zero_count += other.zero_count
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self._collapse()
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated ``q`` quantile, or ``None`` for an empty sketch"""
+        total = self.count
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket, within the relative accuracy of every value in it
+                return 2 * _GAMMA ** index / (_GAMMA + 1)
+        return 2 * _GAMMA ** max(self.buckets) / (_GAMMA + 1)
+
+    def _collapse(self):
+        if len(self.buckets) <= MAX_BUCKETS:
+            return
+        indexes = sorted(self.buckets)
+        floor = indexes[-MAX_BUCKETS]
+        for index in indexes[:-MAX_BUCKETS]:
+            self.buckets[floor] += self.buckets.pop(index)
+
+    def to_bytes(self) -> bytes:
+        """Compact encoding: version, zero count, then delta-encoded (index, count) varints"""
+        out = bytearray([SKETCH_VERSION])
+        _write_varint(out, self.zero_count)
+        _write_varint(out, len(self.buckets))
+        previous = 0
+        for index in sorted(self.buckets):
+            _write_varint(out, _zigzag(index - previous))
+            _write_varint(out, self.buckets[index])
+            previous = index
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes]) -> "QuantileSketch":
+        sketch = cls()
+        if not data:
+            return sketch
+        if data[0] != SKETCH_VERSION:
+            raise ValueError(f"Unsupported quantile sketch version {data[0]}")
+        position = 1
+        sketch.zero_count, position = _read_varint(data, position)
+        size, position = _read_varint(data, position)
+        index = 0
+        for _ in range(size):
+            delta, position = _read_varint(data, position)
+            count, position = _read_varint(data, position)
+            index += _unzigzag(delta)
+            sketch.buckets[index] = count
+        return sketch
+
+    def __eq__(self, other):
+        return isinstance(other, QuantileSketch) and self.zero_count == other.zero_count and self.buckets == other.buckets
+
+    def __repr__(self):
+        return f"QuantileSketch(count={self.count}, buckets={len(self.buckets)})"
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, position: int):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
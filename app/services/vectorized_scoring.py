@@ -0,0 +1,222 @@
+from typing import Dict, Any, List, Optional, Iterable
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+import numpy as np
+import uuid
+
+from ..models.transaction import Transaction
+from ..crud.crud_account_stats import to_cents, ACCOUNT_CHUNK_SIZE
+from .velocity_tracker import EPOCH
+from .fraud_detection_service import (
+    FraudDetectionService,
+    AMOUNT_WINDOW_DAYS,
+    HIGH_AMOUNT_MULTIPLIER,
+    NORMAL_HOURS_START,
+    NORMAL_HOURS_END,
+    FREQUENCY_WINDOW_MINUTES,
+    HIGH_FREQUENCY_THRESHOLD,
+    FACTOR_WEIGHTS,
+    FACTOR_REASONS
+)
+
+# Factor columns in the factor matrix, in scalar evaluation order. The
+# impossible-travel factor depends on transaction order, not windows, and
+# is not vectorized.
+FACTORS = [factor for factor in FACTOR_WEIGHTS if factor != "travel"]
+
+MICROSECOND = timedelta(microseconds=1)
+MINUTE_US = 60 * 1000000
+
+
+def to_microseconds(timestamp: datetime) -> int:
+    """Microseconds since the epoch for a naive UTC timestamp"""
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+class TransactionColumns:
+    """Columnar view of a set of transactions.
+
+    Merchants and locations are dictionary-encoded: ``merchant_code`` indexes
+    into ``merchants`` (code 0 is "no merchant"), and likewise for locations.
+    """
+
+    def __init__(self):
+        self.transaction_ids: List[uuid.UUID] = []
+        self.accounts: List[uuid.UUID] = []
+        self.merchants: List[Optional[str]] = [None]
+        self.locations: List[Optional[str]] = [None]
+        self.account_index = np.empty(0, dtype=np.int32)
+        self.amount_cents = np.empty(0, dtype=np.int64)
+        self.timestamp_us = np.empty(0, dtype=np.int64)
+        self.hour = np.empty(0, dtype=np.int8)
+        self.merchant_code = np.empty(0, dtype=np.int32)
+        self.location_code = np.empty(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.transaction_ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "TransactionColumns":
+        """Build columns from ``(id, account_id, amount, timestamp, merchant, location)`` rows"""
+        columns = cls()
+        account_codes: Dict[uuid.UUID, int] = {}
+        merchant_codes: Dict[Optional[str], int] = {None: 0}
+        location_codes: Dict[Optional[str], int] = {None: 0}
+        account_index, amount_cents, timestamp_us, hour, merchant_code, location_code = [], [], [], [], [], []
+
+        for txn_id, account_id, amount, timestamp, merchant, location in rows:
+            columns.transaction_ids.append(txn_id)
+            code = account_codes.get(account_id)
+            if code is None:
+                code = account_codes[account_id] = len(columns.accounts)
+                columns.accounts.append(account_id)
+            account_index.append(code)
+            amount_cents.append(to_cents(amount))
+            timestamp_us.append(to_microseconds(timestamp))
+            hour.append(timestamp.hour)
+
+            code = merchant_codes.get(merchant)
+            if code is None:
+                code = merchant_codes[merchant] = len(columns.merchants)
+                columns.merchants.append(merchant)
+            merchant_code.append(code)
+
+            code = location_codes.get(location)
+            if code is None:
+                code = location_codes[location] = len(columns.locations)
+                columns.locations.append(location)
+            location_code.append(code)
+
+        columns.account_index = np.array(account_index, dtype=np.int32)
+        columns.amount_cents = np.array(amount_cents, dtype=np.int64)
+        columns.timestamp_us = np.array(timestamp_us, dtype=np.int64)
+        columns.hour = np.array(hour, dtype=np.int8)
+        columns.merchant_code = np.array(merchant_code, dtype=np.int32)
+        columns.location_code = np.array(location_code, dtype=np.int32)
+        return columns
+
+
+def load_transaction_columns(db: Session, account_ids: Optional[List[uuid.UUID]] = None,
+                             chunk_size: int = 10000) -> TransactionColumns:
+    """Stream transactions (optionally for some accounts) into columns without ORM hydration"""
+    query = db.query(
+        Transaction.id,
+        Transaction.account_id,
+        Transaction.amount,
+        Transaction.timestamp,
+        Transaction.merchant,
+        Transaction.location
+    )
+    if account_ids is None:
+        return TransactionColumns.from_rows(query.yield_per(chunk_size))
+
+    def rows():
+        for i in range(0, len(account_ids), ACCOUNT_CHUNK_SIZE):
+            chunk = account_ids[i:i + ACCOUNT_CHUNK_SIZE]
+            yield from query.filter(Transaction.account_id.in_(chunk)).yield_per(chunk_size)
+    return TransactionColumns.from_rows(rows())
+
+
+class VectorizedFraudScorer:
+    """Columnar implementation of ``FraudDetectionService`` scoring for backfills.
+
+    Every transaction is scored as of its own timestamp, i.e. it produces the
+    same scores and factors as ``analyze_transaction(txn, db, as_of=txn.timestamp)``.
+    All transactions of an account must be present in the columns, otherwise
+    its window statistics are incomplete.
+    """
+
+    def __init__(self, service: Optional[FraudDetectionService] = None):
+        self.service = service or FraudDetectionService()
+        if self.service.amount_rule != "mean":
+            # Per-row point-in-time quantiles have no columnar implementation yet
+            raise ValueError(f"Vectorized scoring only supports the mean amount rule, not {self.service.amount_rule!r}")
+        if self.service.time_rule != "fixed":
+            raise ValueError(f"Vectorized scoring only supports the fixed time rule, not {self.service.time_rule!r}")
+        if self.service.geo_velocity_enabled:
+            raise ValueError("Vectorized scoring does not support the impossible-travel rule")
+        if self.service.model is not None:
+            raise ValueError("Vectorized scoring only supports the classic scorer")
+
+    def score(self, columns: TransactionColumns):
+        """Return ``(risk_score, factors)``: a float array and an ``(n, 5)`` bool matrix"""
+        n = len(columns)
+        factors = np.zeros((n, len(FACTORS)), dtype=bool)
+        if n == 0:
+            return np.zeros(0, dtype=np.float64), factors
+
+        window_count, window_cents, recent_count = self._window_aggregates(columns)
+
+        # Factor 1: amount > 5x the window average, in integer cents
+        factors[:, 0] = columns.amount_cents * window_count > window_cents * HIGH_AMOUNT_MULTIPLIER
+        # Factor 2: off-hours
+        factors[:, 1] = (columns.hour < NORMAL_HOURS_START) | (columns.hour > NORMAL_HOURS_END)
+        # Factor 3: foreign location, evaluated once per distinct location
+        keywords = self.service.risk_keywords
+        foreign = np.array([bool(keywords.match_location(location)) for location in columns.locations], dtype=bool)
+        factors[:, 2] = foreign[columns.location_code]
+        # Factor 4: frequency
+        factors[:, 3] = recent_count > HIGH_FREQUENCY_THRESHOLD
+        # Factor 5: high-risk merchant, evaluated once per distinct merchant
+        risky = np.array([bool(keywords.match_merchant(merchant)) for merchant in columns.merchants], dtype=bool)
+        factors[:, 4] = risky[columns.merchant_code]
+
+        # Accumulate in the scalar order so float sums are bit-identical
+        risk_score = np.zeros(n, dtype=np.float64)
+        for i, factor in enumerate(FACTORS):
+            risk_score += np.where(factors[:, i], FACTOR_WEIGHTS[factor], 0.0)
+        return np.minimum(risk_score, 1.0), factors
+
+    def results(self, columns: TransactionColumns, risk_score: np.ndarray, factors: np.ndarray) -> List[Dict[str, Any]]:
+        """Per-transaction results shaped like ``analyze_transaction`` (without alert ids)"""
+        results = []
+        for i in range(len(columns)):
+            risk_factors = [FACTOR_REASONS[factor] for j, factor in enumerate(FACTORS) if factors[i, j]]
+            results.append({
+                "transaction_id": str(columns.transaction_ids[i]),
+                "is_fraud_risk": bool(risk_score[i] >= self.service.risk_threshold),
+                "risk_score": float(risk_score[i]),
+                "risk_factors": risk_factors
+            })
+        return results
+
+    def _window_aggregates(self, columns: TransactionColumns):
+        """Per-row amount window (count, cents) and frequency window count, as of each row"""
+        n = len(columns)
+        amount_window_us = AMOUNT_WINDOW_DAYS * 24 * 60 * MINUTE_US
+        frequency_window_us = (FREQUENCY_WINDOW_MINUTES - 1) * MINUTE_US
+
+        order = np.lexsort((columns.timestamp_us, columns.account_index))
+        account = columns.account_index[order].astype(np.int64)
+        timestamp = columns.timestamp_us[order]
+        cumulative_cents = np.concatenate(([0], np.cumsum(columns.amount_cents[order])))
+
+        amount_start = timestamp - amount_window_us
+        frequency_start = timestamp - timestamp % MINUTE_US - frequency_window_us
+
+        # Search (account, timestamp) pairs through a single int64 key. Accounts
+        # are processed in groups small enough that the key cannot overflow.
+        base = int(min(amount_start.min(), frequency_start.min()))
+        span = int(timestamp.max()) - base + 1
+        accounts_per_group = max(1, (2 ** 62) // span)
+
+        upper = np.empty(n, dtype=np.int64)
+        amount_lower = np.empty(n, dtype=np.int64)
+        frequency_lower = np.empty(n, dtype=np.int64)
+        group_bounds = np.searchsorted(account, np.arange(0, int(account.max()) + accounts_per_group + 1, accounts_per_group))
+        for lo, hi in zip(group_bounds[:-1], group_bounds[1:]):
+            if lo == hi:
+                continue
+            offset = (account[lo:hi] - account[lo]) * span - base
+            key = offset + timestamp[lo:hi]
+            upper[lo:hi] = lo + np.searchsorted(key, key, side="right")
+            amount_lower[lo:hi] = lo + np.searchsorted(key, offset + amount_start[lo:hi], side="left")
+            frequency_lower[lo:hi] = lo + np.searchsorted(key, offset + frequency_start[lo:hi], side="left")
+
+        window_count = np.empty(n, dtype=np.int64)
+        window_cents = np.empty(n, dtype=np.int64)
+        recent_count = np.empty(n, dtype=np.int64)
+        window_count[order] = upper - amount_lower
+        window_cents[order] = cumulative_cents[upper] - cumulative_cents[amount_lower]
+        recent_count[order] = upper - frequency_lower
+        return window_count, window_cents, recent_count
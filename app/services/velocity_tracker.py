@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+import threading
+import uuid
+
+from ..models.transaction import Transaction
+from ..config import VELOCITY_TRACKER_ENABLED, VELOCITY_TRACKER_MAX_ACCOUNTS
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def minute_of(timestamp: datetime) -> int:
+    """Minutes since the epoch for a naive UTC timestamp"""
+    return int((timestamp - EPOCH) // timedelta(minutes=1))
+
+
+def minute_floor(timestamp: datetime) -> datetime:
+    return timestamp.replace(second=0, microsecond=0)
+
+
+class _AccountBuckets:
+    """Ring buffer of per-minute transaction counts for one account"""
+    __slots__ = ("counts", "minutes", "last_minute")
+
+    def __init__(self, horizon: int):
+        self.counts = [0] * horizon
+        self.minutes = [-1] * horizon
+        self.last_minute = -1
+
+
+class VelocityTracker:
+    """In-process per-account transaction velocity counters.
+
+    Each account keeps a ring of ``horizon_minutes`` minute buckets, so memory
+    per account is fixed and "transactions in the last N minutes" reads at most
+    N buckets. At most ``max_accounts`` accounts are tracked; the least recently
+    active ones are evicted first.
+
+    Counts only cover writes made through this process (plus whatever ``warm``
+    loaded), so ``count_recent`` returns ``None`` whenever it cannot answer
+    exactly and the caller should fall back to SQL.
+    """
+
+    def __init__(self, horizon_minutes: int = 60, max_accounts: int = 100000, enabled: bool = True):
+        self.horizon_minutes = horizon_minutes
+        self.max_accounts = max_accounts
+        self.enabled = enabled
+        self._accounts = OrderedDict()
+        self._lock = threading.Lock()
+        self._warmed = False
+        # False once an account with counts still inside the horizon has been evicted
+        self._lossless = True
+
+    def record(self, account_id: uuid.UUID, timestamp: datetime):
+        """Count one transaction for an account"""
+        if not self.enabled:
+            return
+        minute = minute_of(timestamp)
+        with self._lock:
+            buckets = self._accounts.get(account_id)
+            if buckets is None:
+                self._make_room(minute)
+                buckets = self._accounts[account_id] = _AccountBuckets(self.horizon_minutes)
+            else:
+                self._accounts.move_to_end(account_id)
+
+            if minute <= buckets.last_minute - self.horizon_minutes:
+                return  # Already outside the window
+            slot = minute % self.horizon_minutes
+            if buckets.minutes[slot] != minute:
+                if buckets.minutes[slot] > minute:
+                    return  # Slot already reused by a newer minute
+                buckets.minutes[slot] = minute
+                buckets.counts[slot] = 0
+            buckets.counts[slot] += 1
+            buckets.last_minute = max(buckets.last_minute, minute)
+
+    def count_recent(self, account_id: uuid.UUID, minutes: int, now: Optional[datetime] = None) -> Optional[int]:
+        """Transactions in the current minute and the ``minutes - 1`` before it.
+
+        Returns ``None`` when the tracker cannot answer exactly (disabled, not
+        warmed, window longer than the horizon, or the account was evicted).
+        """
+        if not self.enabled or not self._warmed or minutes > self.horizon_minutes:
+            return None
+        now_minute = minute_of(now or datetime.utcnow())
+        with self._lock:
+            buckets = self._accounts.get(account_id)
+            if buckets is None:
+                return 0 if self._lossless else None
+            total = 0
+            for offset in range(minutes):
+                minute = now_minute - offset
+                slot = minute % self.horizon_minutes
+                if buckets.minutes[slot] == minute:
+                    total += buckets.counts[slot]
+            return total
+
+    def warm(self, db: Session, now: Optional[datetime] = None):
+        """Reset the tracker and load the last ``horizon_minutes`` of transactions"""
+        if not self.enabled:
+            return
+        now = now or datetime.utcnow()
+        since = minute_floor(now) - timedelta(minutes=self.horizon_minutes - 1)
+        with self._lock:
+            self._accounts.clear()
+            self._lossless = True
+            self._warmed = False
+
+        rows = db.query(Transaction.account_id, Transaction.timestamp).filter(
+            Transaction.timestamp >= since
+        ).order_by(Transaction.timestamp).yield_per(10000)
+        for account_id, timestamp in rows:
+            self.record(account_id, timestamp)
+
+        with self._lock:
+            self._warmed = True
+
+    def _make_room(self, minute: int):
+        # Drop idle accounts from the LRU end, then evict if still full
+        while self._accounts:
+            account_id, buckets = next(iter(self._accounts.items()))
+            if buckets.last_minute > minute - self.horizon_minutes and len(self._accounts) < self.max_accounts:
+                break
+            self._accounts.popitem(last=False)
+            if buckets.last_minute > minute - self.horizon_minutes:
+                self._lossless = False
+
+    def __len__(self):
+        return len(self._accounts)
+
+
+# Shared tracker fed by the transaction write path
+velocity_tracker = VelocityTracker(
+    max_accounts=VELOCITY_TRACKER_MAX_ACCOUNTS,
+    enabled=VELOCITY_TRACKER_ENABLED
+)
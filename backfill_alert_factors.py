@@ -0,0 +1,21 @@
+"""
+Script to backfill fraud_alert_factors for alerts created before factor codes were stored
+"""
+from app.database import SessionLocal, engine, Base
+from app.crud import crud_fraud_alert
+from app.services.fraud_detection_service import REASON_CODES
+
+def backfill_alert_factors():
+    # Make sure the factor table exists
+    Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    try:
+        print("Backfilling fraud alert factors from fraud_alerts.reason...")
+        rows = crud_fraud_alert.backfill_alert_factors(db, REASON_CODES)
+        print(f"Inserted {rows} factor rows")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_alert_factors()
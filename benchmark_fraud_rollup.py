@@ -0,0 +1,92 @@
+"""
+Benchmark fraud insights read from the daily rollup against a raw fraud_alerts scan
+
+Builds a standalone SQLite database with synthetic alerts (10M by default),
+backfills the rollup and times both ways of computing the dashboard counts.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.fraud_alert import FraudAlert, FraudAlertStatus
+from app.models.fraud_rollup import FraudAlertDailyRollup
+from app.crud import crud_fraud_rollup
+from app.services.fraud_detection_service import FACTOR_REASONS
+
+def generate_alerts(engine, num_alerts: int, chunk_size: int = 50000):
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    statuses = [FraudAlertStatus.OPEN, FraudAlertStatus.DISMISSED, FraudAlertStatus.CONFIRMED_FRAUD]
+    reasons = list(FACTOR_REASONS.values())
+    
+    with engine.begin() as connection:
+        for start in range(0, num_alerts, chunk_size):
+            rows = []
+            for _ in range(min(chunk_size, num_alerts - start)):
+                rows.append({
+                    "id": uuid.uuid4(),
+                    "transaction_id": uuid.uuid4(),
+                    "risk_score": round(rng.uniform(0.3, 1.0), 2),
+                    "reason": "; ".join(rng.sample(reasons, rng.randint(1, 3))),
+                    "status": rng.choices(statuses, weights=[3, 5, 2])[0],
+                    "created_at": now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+                })
+            connection.execute(insert(FraudAlert.__table__), rows)
+            print(f"  inserted {start + len(rows):,} alerts", end="\r")
+    print()
+
+def time_call(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rollup reads against raw alert scans")
+    parser.add_argument("--alerts", type=int, default=10000000, help="number of synthetic alerts")
+    parser.add_argument("--days", type=int, default=30, help="insights window in days")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per query (best is reported)")
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "bfsi_rollup_benchmark.db"),
+                        help="SQLite file to build (reused if it already has the requested alerts)")
+    args = parser.parse_args()
+    
+    engine = create_engine(f"sqlite:///{args.db}")
+    Base.metadata.create_all(bind=engine, tables=[FraudAlert.__table__, FraudAlertDailyRollup.__table__])
+    db = sessionmaker(bind=engine)()
+    
+    print("\n=== FRAUD ROLLUP BENCHMARK ===\n")
+    existing = db.query(FraudAlert).count()
+    if existing != args.alerts:
+        print(f"Generating {args.alerts:,} alerts in {args.db}...")
+        db.query(FraudAlert).delete()
+        db.commit()
+        generate_alerts(engine, args.alerts)
+        
+        started = time.perf_counter()
+        rows = crud_fraud_rollup.rebuild_rollup(db)
+        print(f"Backfilled {rows:,} rollup rows in {time.perf_counter() - started:.1f}s")
+    else:
+        print(f"Reusing {existing:,} alerts in {args.db}")
+    
+    start = datetime.utcnow() - timedelta(days=args.days)
+    raw = time_call(lambda: crud_fraud_rollup.scan_counts(db, start), args.repeat)
+    rollup = time_call(lambda: crud_fraud_rollup.get_counts(db, start.date()), args.repeat)
+    
+    print(f"\nWindow: last {args.days} days")
+    print(f"Raw scan of fraud_alerts: {raw * 1000:,.1f} ms")
+    print(f"Rollup read:              {rollup * 1000:,.1f} ms")
+    print(f"Speedup:                  {raw / rollup if rollup else float('inf'):,.0f}x")
+    db.close()
+
+if __name__ == "__main__":
+    main()
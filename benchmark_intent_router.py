@@ -0,0 +1,73 @@
+"""
+Benchmark chat intent routing as the number of intents grows
+
+Builds synthetic intent tables (4 to 500 intents, a few keywords and phrases
+each) and times routing the same messages through the indexed IntentRouter
+and through the original first-match chain of substring scans.
+"""
+import argparse
+import random
+import time
+
+from app.services.intent_router import Intent, IntentRouter
+
+def make_intents(num_intents: int, rng: random.Random):
+    intents = []
+    for i in range(num_intents):
+        keywords = {f"topic{i}w{k}": rng.choice([1.0, 1.5, 2.0]) for k in range(4)}
+        keywords[f"phrase{i} start{i}"] = 3.0
+        intents.append(Intent(f"intent{i}", keywords))
+    return intents
+
+def make_messages(intents, num_messages: int, rng: random.Random):
+    filler = ["please", "show", "me", "my", "the", "for", "last", "month", "can", "you", "what", "is"]
+    messages = []
+    for _ in range(num_messages):
+        words = rng.sample(filler, 8)
+        # Most messages name one intent; some match nothing
+        if rng.random() < 0.8:
+            words.insert(rng.randint(0, len(words)), rng.choice(list(rng.choice(intents).keywords)))
+        messages.append(" ".join(words))
+    return messages
+
+def scan_chain(intents, message: str):
+    """The original routing: first intent with any keyword contained in the message"""
+    message_lower = message.lower()
+    for intent in intents:
+        if any(word in message_lower for word in intent.keywords):
+            return intent.name
+    return None
+
+def time_per_message(route, messages, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for message in messages:
+            route(message)
+        best = min(best, time.perf_counter() - started)
+    return best / len(messages) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the indexed chat intent router")
+    parser.add_argument("--sizes", default="4,16,64,128,250,500", help="comma-separated intent counts")
+    parser.add_argument("--messages", type=int, default=2000, help="messages routed per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    print("\n=== INTENT ROUTER BENCHMARK ===\n")
+    print(f"{'intents':>8} {'build ms':>9} {'index us/msg':>13} {'scan us/msg':>12}")
+    for size in [int(value) for value in args.sizes.split(",")]:
+        rng = random.Random(size)
+        intents = make_intents(size, rng)
+        messages = make_messages(intents, args.messages, rng)
+
+        started = time.perf_counter()
+        router = IntentRouter(intents)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        indexed = time_per_message(router.route, messages, args.repeat)
+        scanned = time_per_message(lambda message: scan_chain(intents, message), messages, args.repeat)
+        print(f"{size:>8} {build_ms:>9.2f} {indexed:>13.2f} {scanned:>12.2f}")
+
+if __name__ == "__main__":
+    main()
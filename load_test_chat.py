@@ -0,0 +1,201 @@
+"""
+Load test of the chat endpoint, sync vs async backend
+
+For each backend the API is started with uvicorn (CHAT_BACKEND=sync / async)
+on a seeded SQLite database, then --sessions concurrent chat sessions each
+send --messages messages (balance, history and "more" pages, account info).
+Meanwhile a probe calls GET /api/v1/auth/me to show whether other routes
+queue behind the chat traffic. Reports requests/sec and latency percentiles.
+
+The snapshot cache is disabled by default so every message reaches the
+database; pass --cache to measure with it. Point --url at a running server
+(with --email of an existing user) to load-test a real deployment instead.
+Needs httpx and aiosqlite.
+
+Measured on SQLite with the defaults (100 users x 200 transactions, 10
+messages per session, cache off), one uvicorn worker:
+
+    sessions  backend  requests  errors  req/s  p50 ms  p99 ms  /me p99 ms
+         100  sync          865     135   11.5    1116   61114       61135
+         100  async        1000       0   67.4    1120    5334        5334
+         500  sync            0    5000    0.0       -       -       62475
+         500  async        4995       5   42.4    7854   43472       21563
+
+At 500 sessions every sync request failed. Threadpool workers queued on the
+default engine pool (5 + 10 overflow, 30 s checkout timeout), so requests
+either got a QueuePool TimeoutError (500) or hit the client's 120 s timeout.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.api.auth import create_access_token
+from app.database import Base
+from app.models.account import AccountType
+from app.models.user import UserRole
+
+MESSAGES = ["What's my balance?", "Show recent transactions", "Show more", "Account information", "Next page"]
+
+def seed_database(path: str, num_users: int, transactions_per_user: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    emails = []
+    for i in range(num_users):
+        user = models.User(username=f"load{i}", email=f"load{i}@example.com", hashed_password="x", role=UserRole.CUSTOMER)
+        db.add(user)
+        db.flush()
+        accounts = [
+            models.Account(user_id=user.id, account_number=f"9{i:06d}{k}", account_type=AccountType.CHECKING, balance=Decimal("1000"))
+            for k in range(2)
+        ]
+        db.add_all(accounts)
+        db.flush()
+        for _ in range(transactions_per_user):
+            db.add(models.Transaction(
+                account_id=rng.choice(accounts).id, amount=Decimal(rng.randint(-50000, 50000)) / 100,
+                description="Load test", category="General", timestamp=now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+            ))
+        emails.append(user.email)
+    db.commit()
+    db.close()
+    engine.dispose()
+    return emails
+
+def start_server(backend: str, path: str, port: int, cache: bool):
+    env = dict(
+        os.environ,
+        CHAT_BACKEND=backend,
+        DATABASE_URL=f"sqlite:///{path}",
+        ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{path}",
+        FRAUD_PIPELINE_WORKERS="0"
+    )
+    if not cache:
+        env["CHAT_SNAPSHOT_CACHE_TTL_SECONDS"] = "0"
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+
+async def wait_until_up(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url + "/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+async def chat_session(client, url: str, token: str, num_messages: int, latencies, errors):
+    headers = {"Authorization": f"Bearer {token}"}
+    cursor = None
+    for i in range(num_messages):
+        message = MESSAGES[i % len(MESSAGES)]
+        started = time.perf_counter()
+        try:
+            response = await client.post(url + "/api/v1/chat/message", json={"message": message, "cursor": cursor}, headers=headers)
+            response.raise_for_status()
+            data = response.json().get("data") or {}
+            cursor = data.get("next_cursor", cursor)
+            latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError:
+            errors.append(message)
+
+async def probe(client, url: str, token: str, latencies, stop: asyncio.Event):
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get(url + "/api/v1/auth/me", headers=headers)
+            latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.05)
+
+async def run_load(url: str, emails, sessions: int, num_messages: int):
+    tokens = [create_access_token({"sub": email}) for email in emails]
+    latencies, errors, probe_latencies = [], [], []
+    limits = httpx.Limits(max_connections=sessions + 1, max_keepalive_connections=sessions + 1)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, url, tokens[0], probe_latencies, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            chat_session(client, url, tokens[i % len(tokens)], num_messages, latencies, errors)
+            for i in range(sessions)
+        ])
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "probe_p99_ms": percentile(probe_latencies, 0.99) * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chat endpoint with the sync and async backends")
+    parser.add_argument("--sessions", type=int, default=500, help="concurrent chat sessions")
+    parser.add_argument("--messages", type=int, default=10, help="messages per session")
+    parser.add_argument("--users", type=int, default=100, help="seeded users the sessions are spread over")
+    parser.add_argument("--transactions", type=int, default=200, help="seeded transactions per user")
+    parser.add_argument("--backends", default="sync,async", help="comma-separated CHAT_BACKEND values to compare")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache", action="store_true", help="keep the chat snapshot cache enabled")
+    parser.add_argument("--url", help="load-test a running server instead of starting one")
+    parser.add_argument("--email", help="existing user for --url")
+    args = parser.parse_args()
+
+    results = {}
+    if args.url:
+        if not args.email:
+            parser.error("--url needs --email")
+        results[args.url] = asyncio.run(run_load(args.url.rstrip("/"), [args.email], args.sessions, args.messages))
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "chat_load.db")
+        print(f"Seeding {args.users} users x {args.transactions} transactions into {path}...")
+        emails = seed_database(path, args.users, args.transactions)
+        url = f"http://127.0.0.1:{args.port}"
+        for backend in args.backends.split(","):
+            print(f"Running {args.sessions} sessions against CHAT_BACKEND={backend}...")
+            server = start_server(backend, path, args.port, args.cache)
+            try:
+                asyncio.run(wait_until_up(url))
+                results[backend] = asyncio.run(run_load(url, emails, args.sessions, args.messages))
+            finally:
+                server.terminate()
+                server.wait()
+
+    print("\n=== CHAT LOAD TEST ===\n")
+    print(f"{'backend':<10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'/me p99 ms':>11}")
+    for name, result in results.items():
+        print(f"{name:<10} {result['requests']:>9} {result['errors']:>7} {result['rps']:>8.1f} "
+              f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['probe_p99_ms']:>11.1f}")
+
+if __name__ == "__main__":
+    main()
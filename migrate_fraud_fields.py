@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Migration script to add new fraud scoring columns to existing tables
+"""
+
+import pymysql
+from app.database import MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST, MYSQL_PORT, MYSQL_DATABASE
+
+# (table, column definition); new tables are created by Base.metadata.create_all
+NEW_COLUMNS = [
+    # Per-day amount quantile sketch; fill with: python rebuild_account_stats.py
+    ("account_daily_stats", "ADD COLUMN amount_sketch BLOB"),
+    # Distinguishes fraud ring alerts from per-transaction alerts
+    ("fraud_alerts", "ADD COLUMN alert_type ENUM('TRANSACTION', 'FRAUD_RING') NOT NULL DEFAULT 'TRANSACTION'"),
+    # Keyset pages over an account's history
+    ("transactions", "ADD INDEX ix_transactions_account_timestamp (account_id, timestamp, id)"),
+]
+
+def add_fraud_fields():
+    """Add the fraud scoring columns that create_all cannot add to existing tables."""
+    try:
+        connection = pymysql.connect(
+            host=MYSQL_HOST,
+            port=int(MYSQL_PORT),
+            user=MYSQL_USER,
+            password=MYSQL_PASSWORD,
+            database=MYSQL_DATABASE,
+            charset='utf8mb4'
+        )
+        
+        with connection.cursor() as cursor:
+            print("🚀 Adding fraud scoring fields...")
+            
+            for table, column in NEW_COLUMNS:
+                try:
+                    sql = f"ALTER TABLE {table} {column}"
+                    cursor.execute(sql)
+                    print(f"✅ {table}: {column}")
+                except Exception as e:
+                    if "Duplicate column name" in str(e) or "Duplicate key name" in str(e):
+                        print(f"⚠️  Already exists: {table} {column}")
+                    else:
+                        print(f"❌ Error on {table} {column}: {e}")
+            
+            connection.commit()
+            print("\n✅ Migration completed successfully!")
+            
+        connection.close()
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+
+if __name__ == "__main__":
+    add_fraud_fields()
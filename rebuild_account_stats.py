@@ -0,0 +1,55 @@
+"""
+Script to rebuild the per-account statistics used by fraud scoring:
+daily transaction buckets and the account feature store (which holds the
+hour-of-day profiles)
+"""
+import sys
+from app.database import SessionLocal, engine, Base
+from app.crud import crud_account_stats, crud_account_features
+
+def rebuild_account_stats():
+    # Make sure the stats table exists
+    Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    try:
+        print("Rebuilding account daily stats from transactions...")
+        buckets = crud_account_stats.rebuild_account_stats(db)
+        print(f"Rebuilt {buckets} daily buckets")
+        print("Rebuilding account features from transactions...")
+        features = crud_account_features.rebuild_account_features(db)
+        print(f"Rebuilt features for {features} accounts (schema version {crud_account_features.FEATURE_SCHEMA_VERSION})")
+    finally:
+        db.close()
+
+def check_account_stats() -> bool:
+    db = SessionLocal()
+    try:
+        print("Checking account daily stats against transactions...")
+        mismatches = crud_account_stats.check_account_stats(db)
+        feature_mismatches = crud_account_features.check_account_features(db)
+        if not mismatches and not feature_mismatches:
+            print("✅ Account daily stats and features are consistent")
+            return True
+        
+        if mismatches:
+            print(f"❌ {len(mismatches)} inconsistent buckets:")
+            for mismatch in mismatches[:20]:
+                print(f"  {mismatch['account_id']} {mismatch['day']}: expected {mismatch['expected']}, found {mismatch['actual']}")
+            if len(mismatches) > 20:
+                print(f"  ... and {len(mismatches) - 20} more")
+        if feature_mismatches:
+            print(f"❌ {len(feature_mismatches)} inconsistent account features:")
+            for mismatch in feature_mismatches[:20]:
+                print(f"  {mismatch['account_id']}: expected {mismatch['expected']}, found {mismatch['actual']}")
+            if len(feature_mismatches) > 20:
+                print(f"  ... and {len(feature_mismatches) - 20} more")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python rebuild_account_stats.py [--check]
+    if "--check" in sys.argv:
+        sys.exit(0 if check_account_stats() else 1)
+    rebuild_account_stats()
@@ -0,0 +1,46 @@
+"""
+Script to backfill the daily fraud alert rollup used by the insights dashboard
+"""
+import sys
+from datetime import date, datetime
+from app.database import SessionLocal, engine, Base
+from app.crud import crud_fraud_rollup
+
+def rebuild_fraud_rollup():
+    # Make sure the rollup table exists
+    Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    try:
+        print("Rebuilding fraud alert daily rollup from fraud_alerts...")
+        rows = crud_fraud_rollup.rebuild_rollup(db)
+        print(f"Rebuilt {rows} rollup rows")
+    finally:
+        db.close()
+
+def check_fraud_rollup() -> bool:
+    db = SessionLocal()
+    try:
+        print("Checking fraud alert daily rollup against fraud_alerts...")
+        expected = crud_fraud_rollup.scan_counts(db, datetime.min)
+        actual = crud_fraud_rollup.get_counts(db, date.min)
+        
+        consistent = True
+        for dimension in expected:
+            for value in expected[dimension].keys() | actual.get(dimension, {}).keys():
+                want = expected[dimension].get(value, 0)
+                got = actual.get(dimension, {}).get(value, 0)
+                if want != got:
+                    consistent = False
+                    print(f"❌ {dimension} {value!r}: expected {want}, found {got}")
+        if consistent:
+            print("✅ Fraud alert rollup is consistent")
+        return consistent
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python rebuild_fraud_rollup.py [--check]
+    if "--check" in sys.argv:
+        sys.exit(0 if check_fraud_rollup() else 1)
+    rebuild_fraud_rollup()
@@ -0,0 +1,75 @@
+"""
+Script to backtest the fraud rules against historical transactions
+
+Replays transactions in timestamp order through FraudDetectionService, each
+scored as of its own timestamp, without writing alerts. Alerts that analysts
+resolved (CONFIRMED_FRAUD / DISMISSED) are the ground truth. Prints precision,
+recall, false-positive rate, throughput and per-rule latency, so a rule
+change can ship with its quality and performance report.
+
+Point it at a snapshot rather than production, e.g.
+    python run_fraud_backtest.py --database-url sqlite:///snapshot.db --rebuild-stats
+Rule settings come from the usual FRAUD_* environment variables.
+"""
+import argparse
+import json
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import SQLALCHEMY_DATABASE_URL, Base
+from app.crud import crud_account_stats
+from app.services.fraud_backtest import FraudBacktest
+
+def parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+def run_backtest(database_url: str, start, end, limit, page_size: int, rebuild_stats: bool, output):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        if rebuild_stats:
+            print("Rebuilding daily stats in the snapshot...")
+            crud_account_stats.rebuild_account_stats(db)
+
+        print("Replaying transactions...")
+        report = FraudBacktest(page_size=page_size).run(db, start=start, end=end, limit=limit)
+    finally:
+        db.close()
+        engine.dispose()
+
+    print("\n=== FRAUD BACKTEST ===\n")
+    print(f"Config: {report['config']}")
+    print(f"Transactions: {report['transactions']} ({report['flagged']} flagged, rate {report['flag_rate']})")
+    print(f"Labeled: {report['labeled']} {report['confusion']}")
+    print(f"Precision: {report['precision']}  Recall: {report['recall']}  FPR: {report['false_positive_rate']}")
+    print(f"Throughput: {report['throughput_per_second']} txn/s over {report['seconds']}s")
+    latency = report["latency"]
+    print(f"Latency per transaction: p50 {latency['p50_us']}us, p99 {latency['p99_us']}us, max {latency['max_us']}us")
+    print("Per-rule latency and hit rate:")
+    for factor, stats in report["rules"].items():
+        print(f"  {factor:<10} mean {stats['mean_us']}us  p50 <={stats['p50_us']}us  p99 <={stats['p99_us']}us  "
+              f"hits {stats['hits']}/{stats['invocations']} ({stats['hit_rate']})")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Report written to {output}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest fraud rules on historical transactions")
+    parser.add_argument("--database-url", default=SQLALCHEMY_DATABASE_URL, help="snapshot database to replay (default: the app database)")
+    parser.add_argument("--start", type=parse_date, help="first transaction timestamp (ISO format)")
+    parser.add_argument("--end", type=parse_date, help="stop before this timestamp (ISO format)")
+    parser.add_argument("--limit", type=int, help="maximum transactions to replay")
+    parser.add_argument("--page-size", type=int, default=1000, help="transactions read per query")
+    parser.add_argument("--rebuild-stats", action="store_true", help="rebuild daily stats first")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    run_backtest(args.database_url, args.start, args.end, args.limit, args.page_size, args.rebuild_stats, args.output)
+
+if __name__ == "__main__":
+    main()
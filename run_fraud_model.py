@@ -1,9 +1,20 @@
 """
-Script to run the fraud detection model and generate sample alerts
+Script to run the fraud detection model over the transaction history
+
+Accounts are split into shards that are rescored in parallel worker processes.
+Each finished shard writes a checkpoint, so an interrupted run resumes where it
+stopped. Use --samples to print the demo alerts instead.
 """
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app.database import SessionLocal, engine, Base
 from app.services.fraud_detection_service_fixed import FraudDetectionService
+from app.services.fraud_rescoring import ShardCheckpoints, plan_shards, rescore_shard, init_worker
 
-def main():
+def print_sample_alerts():
     # Initialize the fraud detection service
     fraud_service = FraudDetectionService()
     
@@ -26,5 +37,60 @@ def main():
         print(f"  Timestamp: {alert['timestamp']}")
         print()
 
+def rescore_history(workers: int, shards: int, checkpoint_dir: str, chunk_size: int, restart: bool):
+    Base.metadata.create_all(bind=engine)
+    
+    checkpoints = ShardCheckpoints(checkpoint_dir, shards)
+    checkpoints.open(restart=restart)
+    completed = checkpoints.completed()
+    
+    db = SessionLocal()
+    try:
+        plan = plan_shards(db, shards)
+    finally:
+        db.close()
+    # Workers open their own connections
+    engine.dispose()
+    
+    pending = [shard for shard in range(shards) if shard not in completed and plan[shard]]
+    print("\n=== FRAUD HISTORY RESCORE ===\n")
+    print(f"Shards: {shards} ({len(completed)} already checkpointed, {len(pending)} to run)")
+    print(f"Workers: {workers}\n")
+    
+    started = time.perf_counter()
+    rows = alerts = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        futures = [executor.submit(rescore_shard, shard, plan[shard], chunk_size) for shard in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            checkpoints.save(result)
+            rows += result["rows"]
+            alerts += result["alerts"]
+            rate = result["rows"] / result["seconds"] if result["seconds"] else 0
+            print(f"[{done}/{len(pending)}] shard {result['shard']}: {result['rows']:,} rows, "
+                  f"{result['alerts']:,} new alerts, {rate:,.0f} rows/sec")
+    
+    elapsed = time.perf_counter() - started
+    print("\n=== SUMMARY ===\n")
+    print(f"Rows scored: {rows:,}")
+    print(f"New alerts: {alerts:,}")
+    print(f"Elapsed: {elapsed:.1f}s")
+    print(f"Throughput: {rows / elapsed if elapsed else 0:,.0f} rows/sec")
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore the full transaction history with the fraud rules")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--shards", type=int, default=64, help="account shards (keep the same value when resuming)")
+    parser.add_argument("--checkpoint-dir", default="fraud_rescore_checkpoints", help="where shard checkpoints are kept")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="rows fetched per server-side cursor batch")
+    parser.add_argument("--restart", action="store_true", help="discard checkpoints and rescore every shard")
+    parser.add_argument("--samples", action="store_true", help="only print the demo sample alerts")
+    args = parser.parse_args()
+    
+    if args.samples:
+        print_sample_alerts()
+        return
+    rescore_history(args.workers, args.shards, args.checkpoint_dir, args.chunk_size, args.restart)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,52 @@
+"""
+Script to run the asynchronous fraud scoring workers
+
+Drains fraud_scoring_outbox, which the transaction write path fills, and
+prints queue depth and scoring lag every few seconds. Several copies can run
+side by side; rows are leased so each transaction is scored once.
+"""
+import argparse
+import time
+
+from app.database import SessionLocal, engine, Base
+from app.services.fraud_scoring_pipeline import FraudScoringPipeline
+
+def run_pipeline(workers: int, batch_size: int, report_seconds: float, drain: bool):
+    Base.metadata.create_all(bind=engine)
+    
+    pipeline = FraudScoringPipeline(num_workers=workers, batch_size=batch_size)
+    pipeline.start()
+    print(f"Fraud scoring pipeline started with {workers} workers (batch size {batch_size})")
+    
+    try:
+        while True:
+            time.sleep(report_seconds)
+            db = SessionLocal()
+            try:
+                metrics = pipeline.metrics(db)
+            finally:
+                db.close()
+            print(f"depth={metrics['queue_depth']} in_flight={metrics['in_flight']} "
+                  f"dead={metrics['dead_letters']} oldest={metrics['oldest_pending_seconds']}s "
+                  f"scored={metrics['scored']} alerts={metrics['alerts']} "
+                  f"lag_p50={metrics['lag_seconds']['p50']}s lag_p99={metrics['lag_seconds']['p99']}s")
+            if drain and metrics["queue_depth"] == 0:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.stop()
+        print("Fraud scoring pipeline stopped")
+
+def main():
+    parser = argparse.ArgumentParser(description="Score new transactions from the fraud scoring outbox")
+    parser.add_argument("--workers", type=int, default=2, help="worker threads")
+    parser.add_argument("--batch-size", type=int, default=200, help="outbox rows per micro-batch")
+    parser.add_argument("--report-seconds", type=float, default=5, help="seconds between metric lines")
+    parser.add_argument("--drain", action="store_true", help="exit once the outbox is empty")
+    args = parser.parse_args()
+    
+    run_pipeline(args.workers, args.batch_size, args.report_seconds, args.drain)
+
+if __name__ == "__main__":
+    main()
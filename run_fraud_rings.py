@@ -0,0 +1,66 @@
+"""
+Script to detect fraud rings across accounts
+
+Links accounts that transact at the same merchant or location within the same
+time window, finds the connected groups and raises one FRAUD_RING alert per
+new group. Merchants or locations shared by too many accounts at once (a busy
+supermarket, an airport) are ignored.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal, engine, Base
+from app.crud import crud_fraud_alert
+from app.services.fraud_rings import FraudRingDetector
+
+def run_fraud_rings(window_minutes: int, max_group_accounts: int, min_size: int, max_size: int,
+                    days: int, chunk_size: int, dry_run: bool):
+    Base.metadata.create_all(bind=engine)
+
+    detector = FraudRingDetector(
+        window_minutes=window_minutes,
+        max_group_accounts=max_group_accounts,
+        min_ring_size=min_size,
+        max_ring_size=max_size,
+        chunk_size=chunk_size
+    )
+    since = datetime.utcnow() - timedelta(days=days) if days else None
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rings = detector.run(db, since=since)
+        elapsed = time.perf_counter() - started
+        stats = detector.stats()
+        print(f"Scanned {stats['rows_scanned']} transactions across {stats['accounts']} accounts in {elapsed:.2f}s")
+        print(f"Linking groups: {stats['groups_linked']} (hub groups skipped: {stats['hub_groups_skipped']})")
+        print(f"Rings found: {len(rings)}")
+        for ring in rings[:20]:
+            print(f"  {len(ring.account_ids)} accounts, {ring.shared_merchant_events} shared merchant / "
+                  f"{ring.shared_location_events} shared location events, anchor {ring.anchor_transaction_id}")
+
+        if dry_run:
+            print("Dry run: no alerts created")
+            return
+        created = crud_fraud_alert.create_ring_alerts(db, rings)
+        print(f"✅ Created {len(created)} fraud ring alerts ({len(rings) - len(created)} already alerted)")
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect fraud rings over shared merchants and locations")
+    parser.add_argument("--window-minutes", type=int, default=10, help="accounts must share a merchant/location within this window")
+    parser.add_argument("--max-group-accounts", type=int, default=20, help="ignore merchant/location windows shared by more accounts")
+    parser.add_argument("--min-size", type=int, default=3, help="smallest ring to report")
+    parser.add_argument("--max-size", type=int, default=50, help="largest ring to report")
+    parser.add_argument("--days", type=int, default=0, help="only scan the last N days (0 = all history)")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="transactions per processing chunk")
+    parser.add_argument("--dry-run", action="store_true", help="report rings without creating alerts")
+    args = parser.parse_args()
+
+    run_fraud_rings(args.window_minutes, args.max_group_accounts, args.min_size, args.max_size,
+                    args.days, args.chunk_size, args.dry_run)
+
+if __name__ == "__main__":
+    main()
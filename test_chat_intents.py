@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test chat intent routing and transaction history paging with keyset cursors
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app import models
+from app.models.user import UserRole
+from app.models.account import AccountType
+from app.services.ai_chat_service import AIBankingAssistant, HISTORY_PAGE_SIZE, intent_router
+
+ROUTES = {
+    "What's my balance?": "balance",
+    "last balance": "balance",
+    "how do I get more money": "balance",
+    "Show recent transactions": "transactions",
+    "how much did I spend": "spending_insights",
+    "Tell me more about my account": "account_info",
+    "more info please": "account_info",
+    "I need more help": "help",
+    "Show more": "more_transactions",
+    "show more transactions": "more_transactions",
+    "next page": "more_transactions",
+    "older transactions": "more_transactions",
+    "hello there": None,
+}
+
+def test_intent_routing():
+    """Topic words win over modifiers; only explicit paging phrases ask for more"""
+
+    print("🧭 Testing chat intent routing...")
+    failures = 0
+    for message, expected in ROUTES.items():
+        routed = intent_router.route(message)
+        if routed != expected:
+            failures += 1
+            print(f"❌ {message!r}: expected {expected}, got {routed}")
+    assert failures == 0, f"{failures} messages routed to the wrong intent"
+    print(f"✅ {len(ROUTES)} messages routed as expected")
+
+def create_test_db():
+    """A user with two accounts and 25 transactions, five of them at the same timestamp"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    user = models.User(username="pager", email="pager@example.com", hashed_password="x", role=UserRole.CUSTOMER)
+    db.add(user)
+    db.flush()
+    accounts = [
+        models.Account(user_id=user.id, account_number=f"920000000{i}", account_type=AccountType.CHECKING,
+                       balance=Decimal("100.00"))
+        for i in range(2)
+    ]
+    db.add_all(accounts)
+    db.flush()
+
+    start = datetime(2024, 5, 1, 12, 0)
+    for i in range(20):
+        db.add(models.Transaction(account_id=accounts[i % 2].id, amount=Decimal("-10.00"),
+                                  description=f"Purchase {i}", timestamp=start + timedelta(hours=i)))
+    # Ties on timestamp must be split by id across page boundaries
+    for i in range(5):
+        db.add(models.Transaction(account_id=accounts[i % 2].id, amount=Decimal("-1.00"),
+                                  description=f"Tie {i}", timestamp=start + timedelta(hours=9, minutes=30)))
+    db.commit()
+    return db, user
+
+def test_history_paging():
+    """Following next_cursor visits every transaction once, newest first"""
+
+    print("📄 Testing transaction history paging...")
+    db, user = create_test_db()
+    assistant = AIBankingAssistant()
+
+    response = assistant.process_message("Show recent transactions", user, db)
+    seen = []
+    pages = 0
+    while True:
+        pages += 1
+        transactions = response["data"]["transactions"]
+        assert len(transactions) <= HISTORY_PAGE_SIZE
+        seen += transactions
+        cursor = response["data"]["next_cursor"]
+        if cursor is None:
+            break
+        response = assistant.process_message("Show more", user, db, cursor=cursor)
+
+    ids = [transaction["id"] for transaction in seen]
+    assert len(ids) == len(set(ids)) == 25, f"Expected 25 distinct transactions, got {len(ids)}"
+    timestamps = [transaction["timestamp"] for transaction in seen]
+    assert timestamps == sorted(timestamps, reverse=True), "Pages are not newest first"
+    print(f"✅ {len(ids)} transactions over {pages} pages, none repeated")
+
+    response = assistant.process_message("next page", user, db, cursor="not-a-cursor")
+    assert response["type"] == "info", "A malformed cursor should be answered, not raise"
+    print("✅ Malformed cursor answered with an info message")
+
+    db.close()
+
+if __name__ == "__main__":
+    test_intent_routing()
+    test_history_paging()
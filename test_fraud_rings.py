@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test fraud ring detection across chunk boundaries, including a window bucket larger than a chunk
+"""
+
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app import models
+from app.models.user import UserRole
+from app.models.account import AccountType
+from app.services.fraud_rings import FraudRingDetector
+
+CHUNK_SIZE = 50
+
+def create_test_db():
+    """Random background traffic plus one busy 10-minute bucket holding several chunks of rows"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    rng = random.Random(16)
+    user = models.User(username="rings", email="rings@example.com", hashed_password="x", role=UserRole.CUSTOMER)
+    db.add(user)
+    db.flush()
+    accounts = [
+        models.Account(user_id=user.id, account_number=f"930000{i:04d}", account_type=AccountType.CHECKING,
+                       balance=Decimal("100.00"))
+        for i in range(60)
+    ]
+    db.add_all(accounts)
+    db.flush()
+
+    start = datetime(2024, 3, 1)
+    merchants = [None, "Corner Deli", "Fuel Stop", "Book Nook", "Pawn Shop", "Gift Cards R Us"]
+    locations = [None, "Springfield", "Shelbyville", "Capital City"]
+    for _ in range(400):
+        db.add(models.Transaction(account_id=rng.choice(accounts[4:]).id, amount=Decimal("-5.00"),
+                                  timestamp=start + timedelta(minutes=rng.randint(0, 3 * 24 * 60)),
+                                  merchant=rng.choice(merchants), location=rng.choice(locations)))
+    # One bucket of 4 x CHUNK_SIZE rows: a hub merchant every account visits, and a ring inside it
+    busy = start + timedelta(days=2, minutes=1)
+    for i in range(4 * CHUNK_SIZE):
+        db.add(models.Transaction(account_id=accounts[i % len(accounts)].id, amount=Decimal("-5.00"),
+                                  timestamp=busy + timedelta(seconds=i), merchant="Mega Mall"))
+    for account in accounts[:4]:
+        db.add(models.Transaction(account_id=account.id, amount=Decimal("-5.00"),
+                                  timestamp=busy + timedelta(minutes=5), location="Back Alley"))
+    db.commit()
+    return db
+
+def summarize(rings):
+    return sorted((tuple(ring.account_ids), ring.shared_merchant_events, ring.shared_location_events) for ring in rings)
+
+def test_chunking_matches_single_pass():
+    """Small chunks give the same rings as one pass, and each row is processed once"""
+
+    print("💍 Testing fraud ring chunking...")
+    db = create_test_db()
+    total = db.query(models.Transaction).count()
+
+    single = FraudRingDetector(chunk_size=10 * total)
+    expected = summarize(single.run(db))
+
+    chunked = FraudRingDetector(chunk_size=CHUNK_SIZE)
+    calls = []
+    process_chunk = chunked._process_chunk
+    chunked._process_chunk = lambda rows: calls.append(len(rows)) or process_chunk(rows)
+    rings = summarize(chunked.run(db))
+
+    assert rings == expected, f"Chunked rings differ:\n{rings}\n{expected}"
+    ring_members = db.query(models.Account.id).order_by(models.Account.account_number).limit(4)
+    ring_accounts = tuple(sorted((row.id for row in ring_members), key=str))
+    assert (ring_accounts, 0, 1) in rings, "The ring inside the busy bucket was not found"
+    assert chunked.rows_scanned == total == sum(calls), f"Rows processed {sum(calls)} times for {total} rows"
+    assert max(calls) >= 4 * CHUNK_SIZE, "The busy bucket should be processed whole"
+    print(f"✅ {len(rings)} rings, {total} rows processed once over {len(calls)} chunks")
+    db.close()
+
+def test_min_ring_size():
+    """A ring needs at least two accounts"""
+
+    print("🔢 Testing min_ring_size validation...")
+    try:
+        FraudRingDetector(min_ring_size=1)
+    except ValueError:
+        print("✅ min_ring_size=1 rejected")
+    else:
+        raise AssertionError("min_ring_size=1 should raise ValueError")
+
+if __name__ == "__main__":
+    test_chunking_matches_single_pass()
+    test_min_ring_size()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test that the hour-profile time rule judges a transaction against the account's other transactions
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app import models
+from app.models.user import UserRole
+from app.models.account import AccountType
+from app.crud import crud_account_stats, crud_account_features
+from app.services.fraud_detection_service import FraudDetectionService, FACTOR_REASONS
+
+def create_test_db():
+    """An account with 40 transactions at 14:00 and one at 03:00, plus a thin account"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    user = models.User(username="hours", email="hours@example.com", hashed_password="x", role=UserRole.CUSTOMER)
+    db.add(user)
+    db.flush()
+    regular = models.Account(user_id=user.id, account_number="9100000001",
+                             account_type=AccountType.CHECKING, balance=Decimal("1000.00"))
+    thin = models.Account(user_id=user.id, account_number="9100000002",
+                          account_type=AccountType.CHECKING, balance=Decimal("1000.00"))
+    db.add_all([regular, thin])
+    db.flush()
+
+    start = datetime(2024, 3, 1, 14, 0)
+    transactions = {}
+    for day in range(40):
+        db.add(models.Transaction(account_id=regular.id, amount=Decimal("-20.00"), timestamp=start + timedelta(days=day)))
+    transactions["night"] = models.Transaction(account_id=regular.id, amount=Decimal("-20.00"),
+                                               timestamp=datetime(2024, 4, 15, 3, 0))
+    transactions["afternoon"] = models.Transaction(account_id=regular.id, amount=Decimal("-20.00"),
+                                                   timestamp=datetime(2024, 4, 16, 14, 30))
+    for day in range(5):
+        db.add(models.Transaction(account_id=thin.id, amount=Decimal("-20.00"), timestamp=start + timedelta(days=day)))
+    transactions["thin_night"] = models.Transaction(account_id=thin.id, amount=Decimal("-20.00"),
+                                                    timestamp=datetime(2024, 4, 15, 3, 0))
+    db.add_all(transactions.values())
+    db.commit()
+    crud_account_stats.rebuild_account_stats(db)
+    crud_account_features.rebuild_account_features(db)
+    return db, transactions
+
+def test_hour_profile_rule():
+    """A lone 03:00 transaction on a 14:00 account is unusual, on the live and the as_of path"""
+
+    print("🕒 Testing the hour-profile time rule...")
+
+    db, transactions = create_test_db()
+    service = FraudDetectionService()
+    service.time_rule = "profile"
+    service.risk_threshold = 2.0  # Never create alerts
+
+    expected = {"night": True, "afternoon": False, "thin_night": True}
+    for name, transaction in transactions.items():
+        for as_of in (None, transaction.timestamp):
+            result = service.analyze_transaction(transaction, db, as_of=as_of, persist=False)
+            flagged = FACTOR_REASONS["time"] in result["risk_factors"]
+            path = "live" if as_of is None else "as_of"
+            assert flagged == expected[name], f"{name} ({path}): expected {expected[name]}, got {flagged}"
+            print(f"✅ {name} ({path}): {'flagged' if flagged else 'not flagged'}")
+
+    print("✅ Hour-profile rule excludes the scored transaction")
+    db.close()
+
+if __name__ == "__main__":
+    test_hour_profile_rule()
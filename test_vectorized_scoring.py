@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test that the vectorized scorer matches the scalar FraudDetectionService exactly
+"""
+
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app import models
+from app.models.user import UserRole
+from app.models.account import AccountType
+from app.crud import crud_account_stats
+from app.services.fraud_detection_service import FraudDetectionService
+from app.services.vectorized_scoring import VectorizedFraudScorer, load_transaction_columns
+
+def create_test_db():
+    """Create an in-memory SQLite database with a deterministic transaction history"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    rng = random.Random(42)
+    user = models.User(username="parity", email="parity@example.com", hashed_password="x", role=UserRole.CUSTOMER)
+    db.add(user)
+    db.flush()
+
+    accounts = []
+    for i in range(6):
+        account = models.Account(user_id=user.id, account_number=f"900000{i:04d}",
+                                 account_type=AccountType.CHECKING, balance=Decimal("1000.00"))
+        db.add(account)
+        accounts.append(account)
+    db.flush()
+
+    start = datetime(2024, 1, 1)
+    amounts = ["-12.50", "-45.67", "2500.00", "-89.99", "19.99", "-1200.00", "7500.00", "0.01"]
+    merchants = [None, "", "SuperMart", "Golden Palace Casino", "CryptoBuy Exchange", "Shell", "BITCOIN ATM"]
+    locations = [None, "", "New York, NY", "Foreign - Lagos", "FOREIGN ATM", "London"]
+
+    history = []
+    for _ in range(1500):
+        history.append((rng.choice(accounts), start + timedelta(seconds=rng.randint(0, 90 * 24 * 3600))))
+    # A burst inside one hour, exact 30-day and minute window edges, duplicate timestamps
+    burst = start + timedelta(days=40, hours=2, minutes=30, seconds=17)
+    history += [(accounts[0], burst + timedelta(minutes=m)) for m in range(0, 70, 4)]
+    history += [(accounts[0], burst - timedelta(days=30)), (accounts[0], burst - timedelta(days=30, microseconds=1))]
+    history += [(accounts[0], burst.replace(second=0) - timedelta(minutes=59)), (accounts[0], burst), (accounts[0], burst)]
+    # Exactly five transactions in the frequency window, plus one just before it
+    edge = start + timedelta(days=100, hours=12, minutes=30, seconds=45)
+    history += [(accounts[5], edge - timedelta(minutes=m)) for m in range(4)]
+    history += [(accounts[5], edge.replace(second=0) - timedelta(minutes=59)),
+                (accounts[5], edge.replace(second=30) - timedelta(minutes=60))]
+
+    for account, timestamp in history:
+        db.add(models.Transaction(
+            account_id=account.id,
+            amount=Decimal(rng.choice(amounts)),
+            timestamp=timestamp,
+            merchant=rng.choice(merchants),
+            location=rng.choice(locations)
+        ))
+    db.commit()
+    crud_account_stats.rebuild_account_stats(db)
+    return db
+
+def test_vectorized_scoring_parity():
+    """Vectorized scores and factors must equal the scalar path for every transaction"""
+
+    print("🧮 Testing vectorized scoring parity...")
+
+    db = create_test_db()
+    service = FraudDetectionService()
+    service.risk_threshold = 2.0  # Never create alerts while comparing
+
+    columns = load_transaction_columns(db)
+    scorer = VectorizedFraudScorer(service)
+    risk_score, factors = scorer.score(columns)
+    vectorized = {result["transaction_id"]: result for result in scorer.results(columns, risk_score, factors)}
+
+    transactions = db.query(models.Transaction).all()
+    mismatches = 0
+    for transaction in transactions:
+        scalar = service.analyze_transaction(transaction, db, as_of=transaction.timestamp)
+        result = vectorized[str(transaction.id)]
+        if scalar["risk_score"] != result["risk_score"] or scalar["risk_factors"] != result["risk_factors"]:
+            mismatches += 1
+            print(f"❌ {transaction.id}: scalar {scalar['risk_factors']} vs vectorized {result['risk_factors']}")
+
+    flagged = int((factors.any(axis=1)).sum())
+    print(f"Compared {len(transactions)} transactions, {flagged} with at least one factor")
+    print(f"Factor hits: {dict(zip(['amount', 'time', 'location', 'frequency', 'merchant'], factors.sum(axis=0).tolist()))}")
+    assert mismatches == 0, f"{mismatches} transactions differ between scalar and vectorized scoring"
+    assert factors.any(axis=0).all(), "Every factor should fire at least once in the test data"
+    print("✅ Vectorized scoring matches the scalar path")
+
+    db.close()
+
+if __name__ == "__main__":
+    test_vectorized_scoring_parity()
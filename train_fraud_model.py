@@ -0,0 +1,97 @@
+"""
+Script to train the logistic-regression fraud scorer
+
+Uses fraud alerts that analysts labeled CONFIRMED_FRAUD (positive) or
+DISMISSED (negative), re-evaluates each transaction as of its own timestamp
+and fits a logistic regression with NumPy. The weights and encoding tables are
+written to a versioned binary file that the API memory-maps when
+FRAUD_SCORER=model.
+"""
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from app.database import SessionLocal, engine, Base
+from app.services.fraud_detection_service import FraudDetectionService, FACTOR_WEIGHTS
+from app.services.fraud_model import (
+    DEFAULT_MODEL_PATH,
+    FeatureEncoder,
+    build_training_set,
+    category_vocabulary,
+    save_model,
+    train_logistic_regression
+)
+
+def evaluate(probabilities: np.ndarray, labels: np.ndarray, threshold: float):
+    predicted = probabilities >= threshold
+    true_positives = int((predicted & (labels == 1)).sum())
+    precision = true_positives / max(1, int(predicted.sum()))
+    recall = true_positives / max(1, int((labels == 1).sum()))
+    # AUC as the probability that a random positive outranks a random negative
+    positives, negatives = probabilities[labels == 1], probabilities[labels == 0]
+    auc = None
+    if len(positives) and len(negatives):
+        auc = float((positives[:, None] > negatives[None, :]).mean() + 0.5 * (positives[:, None] == negatives[None, :]).mean())
+    return {"precision": round(precision, 4), "recall": round(recall, 4), "auc": None if auc is None else round(auc, 4)}
+
+def train(output: str, l2: float, holdout: float, threshold: float, min_labels: int, seed: int):
+    Base.metadata.create_all(bind=engine)
+
+    # Features come from the rules themselves, never from a previously trained model
+    service = FraudDetectionService(scorer="classic")
+
+    db = SessionLocal()
+    try:
+        rows, labels = build_training_set(db, service)
+    finally:
+        db.close()
+
+    positives = int(labels.sum())
+    print(f"Labeled transactions: {len(labels)} ({positives} confirmed fraud, {len(labels) - positives} dismissed)")
+    if positives < min_labels or len(labels) - positives < min_labels:
+        print(f"❌ Need at least {min_labels} labels of each class to train")
+        return
+
+    encoder = FeatureEncoder(list(FACTOR_WEIGHTS), category_vocabulary(rows))
+    X = encoder.encode(rows)
+
+    order = np.random.default_rng(seed).permutation(len(labels))
+    split = int(len(order) * (1 - holdout))
+    train_idx, test_idx = order[:split], order[split:]
+    weights = train_logistic_regression(X[train_idx], labels[train_idx], l2=l2)
+
+    metadata = {
+        "model_version": datetime.utcnow().strftime("%Y%m%d%H%M%S"),
+        "trained_at": datetime.utcnow().isoformat(),
+        "threshold": threshold,
+        "l2": l2,
+        "labels": {"positive": positives, "negative": len(labels) - positives},
+        "holdout": None
+    }
+    if len(test_idx):
+        probabilities = 1 / (1 + np.exp(-(X[test_idx] @ weights)))
+        metadata["holdout"] = evaluate(probabilities, labels[test_idx], threshold)
+        print(f"Holdout ({len(test_idx)} rows): {metadata['holdout']}")
+
+    # Refit on every label for the shipped model
+    weights = train_logistic_regression(X, labels, l2=l2)
+    save_model(output, encoder, weights, metadata)
+    print(f"✅ Wrote model {metadata['model_version']} ({len(encoder.feature_names)} features) to {output}")
+    for name, weight in sorted(zip(encoder.feature_names, weights), key=lambda item: -abs(item[1]))[:10]:
+        print(f"  {name:<28} {weight:+.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the logistic-regression fraud scorer from labeled alerts")
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATH, help="model file to write")
+    parser.add_argument("--l2", type=float, default=1.0, help="L2 regularization strength")
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of labels held out for evaluation")
+    parser.add_argument("--threshold", type=float, default=0.5, help="probability at which an alert is raised")
+    parser.add_argument("--min-labels", type=int, default=20, help="minimum labels per class")
+    parser.add_argument("--seed", type=int, default=42, help="holdout split seed")
+    args = parser.parse_args()
+
+    train(args.output, args.l2, args.holdout, args.threshold, args.min_labels, args.seed)
+
+if __name__ == "__main__":
+    main()